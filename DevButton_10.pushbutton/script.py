@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+__title__ = "Dimensionar Condutores"
+__doc__ = """Versão: 1.0
+_____________________________________________________________________
+Descrição:
+Este script recalcula todos os circuitos de força do modelo: corrente de
+projeto, seção do condutor (capacidade de condução e queda de tensão,
+NBR 5410, cobre/PVC, método B1) e queda de tensão percentual.
+O comprimento de cada circuito é a rota pelas paredes do painel até o
+elemento mais distante.
+Os resultados são gravados nos parâmetros "Corrente de Projeto (A)",
+"Seção do Condutor (mm²)" e "Queda de Tensão (%)" dos circuitos.
+_____________________________________________________________________
+Como usar:
+- Clique no botão e informe a temperatura ambiente e o agrupamento.
+_____________________________________________________________________
+Autor: Seu Nome"""
+
+# Manter o motor ativo entre execuções (necessário para o cache das paredes)
+__persistentengine__ = True
+
+# Importações necessárias
+import time
+
+# Importações do pyRevit
+from pyrevit import forms, script
+
+# Bibliotecas compartilhadas da extensão (pasta lib)
+import calculo_circuitos
+import dimensionamento_condutores
+import executor_transacoes
+import rotas_paredes
+
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # type: Document
+
+# Funções auxiliares
+def obter_numero(prompt, titulo, padrao):
+    """Obtém um número do usuário, usando o padrão se a entrada for inválida."""
+    entrada = forms.ask_for_string(prompt=prompt, title=titulo, default=str(padrao))
+    if entrada is None:
+        forms.alert("Operação cancelada.", exitscript=True)
+    try:
+        return float(entrada.replace(',', '.'))
+    except ValueError:
+        forms.alert("Entrada inválida. Usando {}.".format(padrao))
+        return padrao
+
+def dimensionar_condutores():
+    """Função principal para dimensionar os condutores de todos os circuitos."""
+    output = script.get_output()
+    try:
+        circuitos = calculo_circuitos.circuitos_de_forca(doc)
+        if not circuitos:
+            forms.alert("Nenhum circuito de força encontrado no projeto.", exitscript=True)
+
+        temperatura = obter_numero(
+            "Insira a temperatura ambiente em °C:", "Temperatura Ambiente", 30)
+        agrupamento = obter_numero(
+            "Insira o número de circuitos agrupados no mesmo eletroduto:", "Agrupamento", 1)
+        tabela = dimensionamento_condutores.TabelaCondutores(temperatura, int(agrupamento))
+
+        inicio = time.time()
+        resultados, gravados, relatorios = calculo_circuitos.dimensionar_circuitos(
+            doc, circuitos, tabela, rotas_paredes.RotasParedes(doc)
+        )
+        tempo = time.time() - inicio
+        executor_transacoes.imprimir_relatorio(relatorios, "Relatório do Dimensionamento")
+
+        # Listar apenas os circuitos que precisam de atenção
+        acima = [
+            [circuito.CircuitNumber, "{:.0f}".format(dados.carga), "{:.1f}".format(resultado.corrente),
+             "{:.1f}".format(dados.comprimento)]
+            for circuito, dados, resultado in resultados
+            if resultado.secao is None
+        ]
+        if acima:
+            output.print_table(
+                table_data=acima,
+                title="Circuitos Acima da Maior Seção da Tabela",
+                columns=["Circuito", "Carga (VA)", "Corrente (A)", "Comprimento (m)"]
+            )
+
+        secoes = {}
+        for _, _, resultado in resultados:
+            if resultado.secao is not None:
+                secoes[resultado.secao] = secoes.get(resultado.secao, 0) + 1
+        output.print_table(
+            table_data=[[secao, secoes[secao]] for secao in sorted(secoes)],
+            title="Circuitos por Seção",
+            columns=["Seção (mm²)", "Circuitos"]
+        )
+        output.print_md("{} circuitos calculados e {} atualizados em {:.1f} s.".format(
+            len(resultados), gravados, tempo))
+        if not gravados:
+            forms.alert(
+                "Os circuitos não possuem os parâmetros de resultado "
+                "(Corrente de Projeto (A), Seção do Condutor (mm²), Queda de Tensão (%))."
+            )
+
+    except Exception as e:
+        forms.alert("Ocorreu um erro: {}".format(e))
+
+# Executar o script
+if __name__ == "__main__":
+    dimensionar_condutores()
@@ -12,6 +12,9 @@ Como usar:
 _____________________________________________________________________
 Autor: Seu Nome"""
 
+# Manter o motor ativo entre execuções (necessário para o cache de famílias)
+__persistentengine__ = True
+
 # Importações necessárias
 import math  # Importação do módulo math no escopo global
 
@@ -24,6 +27,10 @@ from Autodesk.Revit.DB.Structure import StructuralType
 # Importações do pyRevit
 from pyrevit import revit, forms, script
 
+# Bibliotecas compartilhadas da extensão (pasta lib)
+import catalogo_familias
+import parametros_familia
+
 # Variáveis do documento
 doc = __revit__.ActiveUIDocument.Document  # type: Document
 uidoc = __revit__.ActiveUIDocument
@@ -31,84 +38,8 @@ app = __revit__.Application
 
 # Funções auxiliares
 def selecionar_familia_tomada():
-    # Coletar todos os símbolos de família da categoria "Dispositivos elétricos"
-    collector = FilteredElementCollector(doc) \
-        .OfClass(FamilySymbol) \
-        .OfCategory(BuiltInCategory.OST_ElectricalFixtures)
-
-    tomadas = []
-    for symbol in collector:
-        # Obter o nome da família usando BuiltInParameter
-        family_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-        if family_name_param and family_name_param.HasValue:
-            family_name = family_name_param.AsString()
-        else:
-            family_name = "Sem Família"
-
-        # Obter o nome do símbolo usando BuiltInParameter
-        symbol_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-        if symbol_name_param and symbol_name_param.HasValue:
-            symbol_name = symbol_name_param.AsString()
-        else:
-            symbol_name = "Sem Nome"
-
-        # Filtrar por famílias que contenham "Tomada" no nome
-        if "Tomada" in family_name or "Tomada" in symbol_name:
-            tomadas.append(symbol)
-
-    if not tomadas:
-        forms.alert("Nenhuma família de tomadas encontrada no projeto.", exitscript=True)
-
-    # Criar um dicionário de opções
-    tomadas_dict = {}
-    for tomada in tomadas:
-        try:
-            # Obter o nome da família
-            family_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            if family_name_param and family_name_param.HasValue:
-                family_name = family_name_param.AsString()
-            else:
-                family_name = "Sem Família"
-
-            # Obter o nome do símbolo
-            symbol_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            if symbol_name_param and symbol_name_param.HasValue:
-                symbol_name = symbol_name_param.AsString()
-            else:
-                symbol_name = "Sem Nome"
-
-            display_name = "{} : {}".format(family_name, symbol_name)
-            tomadas_dict[display_name] = tomada
-        except Exception as e:
-            # Se ocorrer um erro, ignorar este elemento
-            pass
-
-    if not tomadas_dict:
-        forms.alert("Nenhuma família de tomadas válida encontrada.", exitscript=True)
-
-    # Ordenar os nomes para exibição
-    tomadas_nomes_ordenados = sorted(tomadas_dict.keys())
-
-    # Permitir que o usuário selecione uma tomada
-    tomada_selecionada_nome = forms.SelectFromList.show(
-        tomadas_nomes_ordenados,
-        title='Selecione uma Tomada',
-        button_name='Selecionar',
-        multiselect=False
-    )
-
-    if not tomada_selecionada_nome:
-        forms.alert("Nenhuma tomada selecionada.", exitscript=True)
-
-    tomada_selecionada = tomadas_dict[tomada_selecionada_nome]
-
-    # Ativar o símbolo da família, se necessário
-    if not tomada_selecionada.IsActive:
-        with revit.Transaction("Ativar Família"):
-            tomada_selecionada.Activate()
-            doc.Regenerate()
-
-    return tomada_selecionada
+    # Selecionar a tomada a partir do catálogo compartilhado de famílias
+    return catalogo_familias.selecionar_familia(doc)
 
 def selecionar_parede():
     # Permitir que o usuário selecione uma parede
@@ -246,32 +177,11 @@ def inserir_tomada(parede, tomada_selecionada, ponto_insercao, altura_pes, rotac
             angulo
         )
 
-        # Definir a altura (elevação) da tomada
-        sucesso = False
-
-        # Lista de possíveis nomes de parâmetros que controlam a altura
-        nomes_parametros_altura = [
-            "Offset",
-            "Deslocamento",
-            "Elevação",
-            "Elevação do Ponto",
-            "Sill Height",
-            "Head Height",
-            "Height",
-            "Base Offset",
-            "Top Offset"
-        ]
-
-        for nome_param in nomes_parametros_altura:
-            offset_param = tomada_instancia.LookupParameter(nome_param)
-            if offset_param and not offset_param.IsReadOnly:
-                try:
-                    offset_param.Set(altura_pes)
-                    sucesso = True
-                    break
-                except Exception as e:
-                    # Ignorar erros e tentar o próximo parâmetro
-                    pass
+        # Definir a altura (elevação) da tomada pelo parâmetro resolvido para a família;
+        # se ele recusar o valor, os demais nomes candidatos são tentados, na ordem
+        sucesso = parametros_familia.ResolvedorParametros().definir(
+            tomada_instancia, 'altura', altura_pes
+        )
 
         if not sucesso:
             # Como último recurso, ajustar a posição Z do ponto
@@ -13,21 +13,20 @@ Como usar:
 _____________________________________________________________________
 Autor: Seu Nome"""
 
+# Manter o motor ativo entre execuções (necessário para o cache de famílias)
+__persistentengine__ = True
+
 # Importações necessárias
 import clr
 import traceback  # Para capturar o traceback completo
 
 # Importar apenas as classes necessárias de Autodesk.Revit.DB
 from Autodesk.Revit.DB import (
-    FilteredElementCollector,
-    FamilySymbol,
-    BuiltInCategory,
     BuiltInParameter,
     XYZ,
     Line,
     Transaction,
     ElementTransformUtils,
-    StorageType,
     Wall,
     LocationCurve  # Importação correta de LocationCurve
 )
@@ -36,13 +35,16 @@ from Autodesk.Revit.DB import (
 from Autodesk.Revit.DB.Structure import StructuralType
 
 # Importações adicionais do Revit
-from Autodesk.Revit.UI import TaskDialog
 from Autodesk.Revit.UI.Selection import ObjectType
 from Autodesk.Revit.Exceptions import InvalidOperationException
 
 # Importações do pyRevit
 from pyrevit import revit, forms, script
 
+# Bibliotecas compartilhadas da extensão (pasta lib)
+import catalogo_familias
+import parametros_familia
+
 # Importar System.Windows.Forms para caixas de diálogo personalizadas
 clr.AddReference('System.Windows.Forms')
 from System.Windows.Forms import DialogResult, MessageBox, MessageBoxButtons, \
@@ -60,82 +62,7 @@ def selecionar_familia_tomada():
     output = script.get_output()
     output.print_md("### Iniciando seleção da família de tomada.")
 
-    # Coletar todos os símbolos de família da categoria "Dispositivos elétricos"
-    collector = FilteredElementCollector(doc) \
-        .OfClass(FamilySymbol) \
-        .OfCategory(BuiltInCategory.OST_ElectricalFixtures)
-
-    tomadas = []
-    for symbol in collector:
-        try:
-            # Obter o nome da família usando BuiltInParameter
-            family_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            family_name = family_name_param.AsString() if family_name_param and family_name_param.HasValue else "Sem Família"
-
-            # Obter o nome do símbolo usando BuiltInParameter
-            symbol_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            symbol_name = symbol_name_param.AsString() if symbol_name_param and symbol_name_param.HasValue else "Sem Nome"
-
-            # Filtrar por famílias que contenham "Tomada" no nome
-            if "Tomada" in family_name or "Tomada" in symbol_name:
-                tomadas.append(symbol)
-        except Exception as e:
-            output.print_md("**Erro ao processar símbolo de família:** {}".format(e))
-            pass
-
-    if not tomadas:
-        forms.alert("Nenhuma família de tomadas encontrada no projeto.", exitscript=True)
-
-    # Criar um dicionário de opções
-    tomadas_dict = {}
-    for tomada in tomadas:
-        try:
-            # Obter o nome da família
-            family_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            family_name = family_name_param.AsString() if family_name_param and family_name_param.HasValue else "Sem Família"
-
-            # Obter o nome do símbolo
-            symbol_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            symbol_name = symbol_name_param.AsString() if symbol_name_param and symbol_name_param.HasValue else "Sem Nome"
-
-            display_name = "{} : {}".format(family_name, symbol_name)
-            tomadas_dict[display_name] = tomada
-        except Exception as e:
-            output.print_md("**Erro ao processar tomada:** {}".format(e))
-            pass
-
-    if not tomadas_dict:
-        forms.alert("Nenhuma família de tomadas válida encontrada.", exitscript=True)
-
-    # Ordenar os nomes para exibição
-    tomadas_nomes_ordenados = sorted(tomadas_dict.keys())
-
-    # Permitir que o usuário selecione uma tomada
-    output.print_md("### Exibindo lista de tomadas para seleção.")
-    tomada_selecionada_nome = forms.SelectFromList.show(
-        tomadas_nomes_ordenados,
-        title='Selecione uma Tomada',
-        button_name='Selecionar',
-        multiselect=False
-    )
-
-    if not tomada_selecionada_nome:
-        forms.alert("Nenhuma tomada selecionada.", exitscript=True)
-
-    tomada_selecionada = tomadas_dict[tomada_selecionada_nome]
-
-    # Adicionar logs para depuração
-    output.print_md("### Tipo de tomada_selecionada: {}".format(type(tomada_selecionada)))
-    output.print_md("### Atributos disponíveis: {}".format(dir(tomada_selecionada)))
-
-    # Ativar o símbolo da família, se necessário
-    if not tomada_selecionada.IsActive:
-        output.print_md("### Ativando o símbolo da família da tomada.")
-        with Transaction(doc, "Ativar Família") as t:
-            t.Start()
-            tomada_selecionada.Activate()
-            doc.Regenerate()
-            t.Commit()
+    tomada_selecionada = catalogo_familias.selecionar_familia(doc)
 
     # Verificar se o parâmetro 'ALL_MODEL_TYPE_NAME' está disponível para obter o nome
     try:
@@ -419,41 +346,22 @@ def inserir_tomada(parede, tomada_selecionada, ponto_insercao, parametros_elec):
             # **Armazenar os parâmetros elétricos na instância da família (se aplicável)**
             # Verifique se a família possui os parâmetros correspondentes antes de tentar defini-los
             try:
-                # Potência Aparente (VA)
-                parametro_S = tomada_instancia.LookupParameter("Potência Aparente (VA)")
-                if parametro_S and parametro_S.StorageType == StorageType.Double:
-                    parametro_S.Set(potencia_aparente)
-                    output.print_md("### Parâmetro 'Potência Aparente (VA)' definido: {}".format(potencia_aparente))
-                else:
-                    output.print_md("### Parâmetro 'Potência Aparente (VA)' não encontrado ou tipo incorreto.")
-
-                # Fator de Potência
-                parametro_cos_phi = tomada_instancia.LookupParameter("Fator de Potência")
-                if parametro_cos_phi and parametro_cos_phi.StorageType == StorageType.Double:
-                    parametro_cos_phi.Set(fator_potencia)
-                    output.print_md("### Parâmetro 'Fator de Potência' definido: {}".format(fator_potencia))
-                else:
-                    output.print_md("### Parâmetro 'Fator de Potência' não encontrado ou tipo incorreto.")
-
-                # Tensão (V)
-                parametro_V = tomada_instancia.LookupParameter("Tensão (V)")
-                if parametro_V and parametro_V.StorageType == StorageType.Double:
-                    parametro_V.Set(tensao)
-                    output.print_md("### Parâmetro 'Tensão (V)' definido: {}".format(tensao))
-                else:
-                    output.print_md("### Parâmetro 'Tensão (V)' não encontrado ou tipo incorreto.")
-
-                # N° de Fases
-                parametro_fases = tomada_instancia.LookupParameter("N° de Fases")
-                if parametro_fases and parametro_fases.StorageType == StorageType.Integer:
-                    parametro_fases.Set(numero_fases)
-                    output.print_md("### Parâmetro 'N° de Fases' definido: {}".format(numero_fases))
-                else:
-                    output.print_md("### Parâmetro 'N° de Fases' não encontrado ou tipo incorreto.")
+                # Parâmetros resolvidos uma vez por tipo de família (acesso direto)
+                resolvedor = parametros_familia.ResolvedorParametros()
+                valores = [
+                    ('potencia_aparente', "Potência Aparente (VA)", potencia_aparente),
+                    ('fator_potencia', "Fator de Potência", fator_potencia),
+                    ('tensao', "Tensão (V)", tensao),
+                    ('numero_fases', "N° de Fases", numero_fases),
+                ]
+                for chave, nome, valor in valores:
+                    if resolvedor.definir(tomada_instancia, chave, valor):
+                        output.print_md("### Parâmetro '{}' definido: {}".format(nome, valor))
+                    else:
+                        output.print_md("### Parâmetro '{}' não encontrado ou tipo incorreto.".format(nome))
 
                 # Potência Ativa (W)
-                parametro_P = tomada_instancia.LookupParameter("Potência Ativa (W)")
-                if parametro_P and parametro_P.StorageType == StorageType.Double:
+                if resolvedor.parametro(tomada_instancia, 'potencia_ativa', escrita=True) is None:
                     output.print_md("### Parâmetro 'Potência Ativa (W)' é read-only ou não encontrado.")
             except Exception as e:
                 # Se ocorrer um erro ao definir os parâmetros, exibir uma mensagem e continuar
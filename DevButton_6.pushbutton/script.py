@@ -4,16 +4,24 @@ __doc__ = """Versão: 2.8
 Data: 25.09.2024
 _____________________________________________________________________
 Descrição:
-Este script insere múltiplas tomadas elétricas na parede selecionada,
+Este script insere múltiplas tomadas elétricas nas paredes selecionadas,
 permitindo escolher a quantidade, altura, intervalo e face (frontal/traseira).
+Os mesmos parâmetros são aplicados a todas as paredes (seleção atual ou
+várias paredes escolhidas de uma vez).
 As tomadas inseridas podem ser atribuídas a um circuito elétrico, que
-pode ser conectado a um painel selecionado pelo usuário dentre os disponíveis.
+pode ser conectado a um painel selecionado pelo usuário dentre os disponíveis
+ou, automaticamente, ao painel compatível mais próximo de cada circuito.
+Os condutores dos circuitos conectados são dimensionados (NBR 5410).
+Ao final, mostra a carga atual de cada painel que recebeu os circuitos.
 _____________________________________________________________________
 Como usar:
 - Clique no botão e siga as instruções.
 _____________________________________________________________________
 Autor: Seu Nome"""
 
+# Manter o motor ativo entre execuções (necessário para o cache de famílias)
+__persistentengine__ = True
+
 # Importações necessárias
 import clr
 import math
@@ -25,34 +33,35 @@ clr.AddReference('RevitAPIUI')
 
 # Importar as classes necessárias do Revit API
 from Autodesk.Revit.DB import (
-    FilteredElementCollector,
-    FamilySymbol,
     BuiltInCategory,
     BuiltInParameter,
     XYZ,
-    Line,
-    Transaction,
-    ElementTransformUtils,
     StorageType,
-    Wall,
-    LocationCurve,
-    FamilyInstance,
     LocationPoint,
-    Plane,
-    SketchPlane,
     ElementId,
-    Color,
-    OverrideGraphicSettings,
 )
 from Autodesk.Revit.DB.Electrical import ElectricalSystem, ElectricalSystemType
-from Autodesk.Revit.DB.Structure import StructuralType
 from Autodesk.Revit.UI import TaskDialog
-from Autodesk.Revit.UI.Selection import ObjectType
-from Autodesk.Revit.Exceptions import InvalidOperationException
 
 # Importações do pyRevit
 from pyrevit import revit, forms, script
 
+# Bibliotecas compartilhadas da extensão (pasta lib)
+import calculo_circuitos
+import cargas_paineis
+import catalogo_familias
+import circuitos
+import criacao_tomadas
+import executor_transacoes
+import geometria_paredes
+import layout_tomadas
+import paineis_eletricos
+import parametros_familia
+import preview_tomadas
+import rotas_paredes
+import selecao_paredes
+import tomadas_existentes
+
 # Importar System.Windows.Forms para caixas de diálogo personalizadas
 clr.AddReference('System.Windows.Forms')
 clr.AddReference('System.Drawing')
@@ -91,151 +100,55 @@ def selecionar_familia_tomada():
         BuiltInCategory.OST_GenericModel,  # Adicione outras categorias se necessário
     ]
 
-    all_outlets = []
-    for categoria in categorias:
-        collector = FilteredElementCollector(doc).OfClass(FamilySymbol).OfCategory(categoria)
-        coletados = list(collector)
-        all_outlets.extend(coletados)
-
-        # Mensagens de depuração
-        if coletados:
-            try:
-                nomes_familias = ", ".join([
-                    "{} : {}".format(
-                        symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME).AsString(),
-                        symbol.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME).AsString()
-                    )
-                    for symbol in coletados
-                    if symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME) and symbol.get_Parameter(
-                        BuiltInParameter.ALL_MODEL_TYPE_NAME)
-                ])
-            except Exception:
-                nomes_familias = "Erro ao coletar nomes das famílias."
-
-            forms.alert("Categoria {}: {} símbolos coletados.\nFamílias: {}".format(
-                categoria, len(coletados), nomes_familias))
-        else:
-            forms.alert("Categoria {}: Nenhum símbolo coletado.".format(categoria))
-
-    tomadas = []
-    for symbol in all_outlets:
-        try:
-            # Obter o nome da família usando BuiltInParameter
-            family_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            family_name = (
-                family_name_param.AsString()
-                if family_name_param and family_name_param.HasValue
-                else "Sem Família"
-            )
-
-            # Obter o nome do símbolo usando BuiltInParameter
-            symbol_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            symbol_name = (
-                symbol_name_param.AsString()
-                if symbol_name_param and symbol_name_param.HasValue
-                else "Sem Nome"
-            )
-
-            # Filtrar por famílias que contenham "tomada" ou "outlet" no nome (case-insensitive)
-            if ("tomada" in family_name.lower() or "outlet" in family_name.lower() or
-                    "tomada" in symbol_name.lower() or "outlet" in symbol_name.lower()):
-                tomadas.append(symbol)
-        except Exception as e:
-            # Mensagem de erro para depuração
-            forms.alert("Erro ao processar símbolo: {}".format(e))
-
-    if not tomadas:
-        # Para depuração: listar todas as famílias encontradas
-        try:
-            todas_familias = "\n".join(
-                [
-                    "{} : {}".format(
-                        symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME).AsString(),
-                        symbol.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME).AsString()
-                    )
-                    for symbol in all_outlets
-                    if symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME) and symbol.get_Parameter(
-                    BuiltInParameter.ALL_MODEL_TYPE_NAME)
-                ]
-            )
-        except Exception:
-            todas_familias = "Erro ao coletar nomes das famílias."
-
-        forms.alert(
-            "Nenhuma família de tomadas encontrada no projeto.\n\nFamílias encontradas:\n{}".format(todas_familias),
-            exitscript=True
-        )
-
-    # Criar um dicionário de opções
-    tomadas_dict = {}
-    for tomada in tomadas:
-        try:
-            # Obter o nome da família
-            family_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            family_name = (
-                family_name_param.AsString()
-                if family_name_param and family_name_param.HasValue
-                else "Sem Família"
-            )
-
-            # Obter o nome do símbolo
-            symbol_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            symbol_name = (
-                symbol_name_param.AsString()
-                if symbol_name_param and symbol_name_param.HasValue
-                else "Sem Nome"
-            )
-
-            display_name = "{} : {}".format(family_name, symbol_name)
-            tomadas_dict[display_name] = tomada
-        except Exception:
-            pass
-
-    if not tomadas_dict:
-        forms.alert("Nenhuma família de tomadas válida encontrada.", exitscript=True)
+    # Filtrar por famílias que contenham "tomada" ou "outlet" no nome (case-insensitive).
+    # As categorias são coletadas em uma única passada; as mensagens de depuração
+    # vão para o log do pyRevit (visível ao executar o botão em modo debug).
+    return catalogo_familias.selecionar_familia(
+        doc,
+        categorias=categorias,
+        palavras_chave=('tomada', 'outlet'),
+    )
 
-    # Ordenar os nomes para exibição
-    tomadas_nomes_ordenados = sorted(tomadas_dict.keys())
 
-    # Permitir que o usuário selecione uma tomada
-    tomada_selecionada_nome = forms.SelectFromList.show(
-        tomadas_nomes_ordenados,
-        title='Selecione uma Tomada',
-        button_name='Selecionar',
-        multiselect=False,
+# Função para selecionar as paredes
+def selecionar_paredes():
+    """Retorna as paredes selecionadas ou permite que o usuário selecione várias."""
+    paredes = selecao_paredes.selecionar_paredes(
+        uidoc,
+        'Selecione as paredes onde as tomadas serão inseridas e clique em Concluir.'
     )
+    if not paredes:
+        forms.alert("Nenhuma parede selecionada.", exitscript=True)
 
-    if not tomada_selecionada_nome:
-        forms.alert("Nenhuma tomada selecionada.", exitscript=True)
-
-    tomada_selecionada = tomadas_dict[tomada_selecionada_nome]
+    return paredes
 
-    # Ativar o símbolo da família, se necessário
-    if not tomada_selecionada.IsActive:
-        with revit.Transaction("Ativar Família"):
-            tomada_selecionada.Activate()
-            doc.Regenerate()
 
-    return tomada_selecionada
+def perguntar_modo_continuo(paredes):
+    """Pergunta se as tomadas devem seguir as paredes unidas como uma só corrida."""
+    if len(paredes) < 2:
+        return False
+    resposta = MessageBox.Show(
+        "Distribuir as tomadas continuamente ao longo das paredes unidas?\n"
+        "(O número de tomadas e o intervalo valem para o comprimento total de cada "
+        "sequência de paredes, sem recomeçar o espaçamento em cada canto.)",
+        "Paredes Unidas",
+        MessageBoxButtons.YesNo,
+        MessageBoxIcon.Question,
+    )
+    return resposta == DialogResult.Yes
 
 
-# Função para selecionar a parede
-def selecionar_parede():
-    """Permite que o usuário selecione uma parede."""
-    sel = uidoc.Selection
-    try:
-        referencia = sel.PickObject(
-            ObjectType.Element,
-            'Selecione a parede onde as tomadas serão inseridas.'
-        )
-        parede = doc.GetElement(referencia.ElementId)
-    except InvalidOperationException:
-        forms.alert("Nenhuma parede selecionada.", exitscript=True)
+# Sistemas de tensão: (tensão fase-neutro, tensão entre fases) em V
+SISTEMAS_TENSAO = [
+    ('220/380 V', (220.0, 380.0)),
+    ('127/220 V', (127.0, 220.0)),
+]
 
-    if not isinstance(parede, Wall):
-        forms.alert("O elemento selecionado não é uma parede.", exitscript=True)
 
-    return parede
+def tensao_do_sistema(sistema_tensao, numero_fases):
+    """Tensão do circuito: fase-neutro se monofásico, entre fases nos demais."""
+    fase_neutro, entre_fases = dict(SISTEMAS_TENSAO)[sistema_tensao]
+    return fase_neutro if numero_fases == 1 else entre_fases
 
 
 # Função para selecionar tensão e fases (mover para fora de obter_parametros_usuario)
@@ -264,8 +177,8 @@ def get_tensao_e_fases():
 
             y += dy
             self.combobox_sistema_tensao = ComboBox()
-            self.combobox_sistema_tensao.Items.Add('220/380 V')
-            self.combobox_sistema_tensao.Items.Add('127/220 V')
+            for sistema, _ in SISTEMAS_TENSAO:
+                self.combobox_sistema_tensao.Items.Add(sistema)
             self.combobox_sistema_tensao.SelectedIndex = 0
             self.combobox_sistema_tensao.Location = Point(10, y)
             self.Controls.Add(self.combobox_sistema_tensao)
@@ -322,24 +235,13 @@ def get_tensao_e_fases():
     numero_fases = form.results['numero_fases']
 
     # Determinar a tensão de acordo com o sistema de tensão e número de fases
-    if sistema_tensao == '220/380 V':
-        if numero_fases == 1:
-            tensao = 220.0  # Tensão fase-neutro
-        else:
-            tensao = 380.0  # Tensão entre fases
-    elif sistema_tensao == '127/220 V':
-        if numero_fases == 1:
-            tensao = 127.0  # Tensão fase-neutro
-        else:
-            tensao = 220.0  # Tensão entre fases
-    else:
-        tensao = 0.0
+    tensao = tensao_do_sistema(sistema_tensao, numero_fases)
 
     return tensao, numero_fases
 
 
-def obter_parametros_usuario(parede):
-    """Obtém todos os parâmetros do usuário para a inserção das tomadas."""
+def obter_parametros_usuario():
+    """Obtém todos os parâmetros do usuário para a inserção das tomadas (aplicados a todas as paredes)."""
 
     class InputForm(Form):
         def __init__(self):
@@ -456,6 +358,12 @@ def obter_parametros_usuario(parede):
             self.button_voltage.Click += self.configure_voltage_phases
             self.Controls.Add(self.button_voltage)
 
+            # Tensão e fases em uso (o padrão vale se o botão não for usado)
+            self.label_tensao = Label()
+            self.label_tensao.Location = Point(200, y + 4)
+            self.label_tensao.Width = 180
+            self.Controls.Add(self.label_tensao)
+
             y += dy + 10
             # OK and Cancel buttons
             self.button_ok = Button()
@@ -470,15 +378,20 @@ def obter_parametros_usuario(parede):
             self.button_cancel.Click += self.cancel_clicked
             self.Controls.Add(self.button_cancel)
 
-            # Variáveis para armazenar tensão e fases
-            self.voltage = 0.0
+            # Variáveis para armazenar tensão e fases (padrão: primeiro sistema, monofásico)
             self.number_of_phases = 1
+            self.voltage = tensao_do_sistema(SISTEMAS_TENSAO[0][0], self.number_of_phases)
+            self.atualizar_label_tensao()
+
+        def atualizar_label_tensao(self):
+            self.label_tensao.Text = '{:.0f} V, {} fase(s)'.format(self.voltage, self.number_of_phases)
 
         def configure_voltage_phases(self, sender, event):
             # Chama a função para selecionar tensão e fases
             voltage, phases = get_tensao_e_fases()
             self.voltage = voltage
             self.number_of_phases = phases
+            self.atualizar_label_tensao()
             MessageBox.Show(
                 "Tensão configurada para {} V com {} fases.".format(self.voltage, self.number_of_phases),
                 "Configuração Concluída",
@@ -524,12 +437,10 @@ def obter_parametros_usuario(parede):
         forms.alert("Entrada inválida para o número de tomadas. Usando 1 tomada.")
         numero_tomadas = 1
 
+    # None indica o comprimento total de cada parede
     intervalo_input = form.results['intervalo']
     if intervalo_input.strip() == '':
-        loc_curve = parede.Location
-        curva = loc_curve.Curve
-        comprimento_parede = curva.Length  # Comprimento em pés
-        intervalo_metros = comprimento_parede / 3.28084  # Converter para metros
+        intervalo_metros = None
     else:
         try:
             intervalo_metros = float(intervalo_input.replace(',', '.'))
@@ -537,10 +448,7 @@ def obter_parametros_usuario(parede):
                 raise ValueError
         except ValueError:
             forms.alert("Entrada inválida para o intervalo. Usando comprimento total da parede.")
-            loc_curve = parede.Location
-            curva = loc_curve.Curve
-            comprimento_parede = curva.Length  # Comprimento em pés
-            intervalo_metros = comprimento_parede / 3.28084  # Converter para metros
+            intervalo_metros = None
 
     face_selecionada = form.results['face']
 
@@ -575,282 +483,306 @@ def obter_parametros_usuario(parede):
 
 
 def calcular_pontos_insercao(
-        parede, altura_metros, numero_tomadas, intervalo_metros, face_selecionada
+        paredes, altura_metros, numero_tomadas, intervalo_metros, face_selecionada, continuo=False
 ):
-    """Calcula os pontos de inserção das tomadas."""
-    # Converter metros para pés
-    altura_pes = altura_metros * 3.28084
-    intervalo_pes = intervalo_metros * 3.28084
-
-    # Obter a localização da parede
-    loc_curve = parede.Location
-    if not isinstance(loc_curve, LocationCurve):
-        forms.alert("Não foi possível obter a localização da parede.", exitscript=True)
-    # Obter a curva (linha) central da parede
-    curva = loc_curve.Curve
-    comprimento_parede = curva.Length
-
-    # Se o intervalo for maior que o comprimento da parede, ajustar
-    if intervalo_pes > comprimento_parede:
-        intervalo_pes = comprimento_parede
-
-    # Definir o ponto inicial para o intervalo (centralizado)
-    direcao_parede = (curva.GetEndPoint(1) - curva.GetEndPoint(0)).Normalize()
-    centro_parede = curva.Evaluate(0.5, True)
-    deslocamento_inicio = (intervalo_pes / 2) * (-direcao_parede)
-    ponto_inicial = centro_parede + deslocamento_inicio
-
-    # Calcular o espaçamento entre as tomadas
-    if numero_tomadas == 1:
-        espacamento = 0
+    """Calcula os pontos de inserção das tomadas em todas as paredes de uma só vez.
+
+    Com continuo, as paredes unidas formam cadeias e o número de tomadas e o
+    intervalo valem para o comprimento total de cada cadeia.
+    """
+    # Obter o quadro de cada parede (origem, direção, normal e espessura)
+    if continuo:
+        # Cadeias de paredes unidas, cada parede no sentido da sua cadeia
+        cadeias, paredes_validas = geometria_paredes.quadros_cadeias(paredes)
     else:
-        espacamento = intervalo_pes / (numero_tomadas - 1)
-
-    # Lista para armazenar os pontos de inserção
-    pontos_insercao = []
-    for i in range(numero_tomadas):
-        distancia = espacamento * i
-        ponto_na_parede = ponto_inicial + direcao_parede * distancia
-        # Ajustar o ponto para a altura desejada
-        ponto_insercao = XYZ(
-            ponto_na_parede.X, ponto_na_parede.Y, ponto_na_parede.Z + altura_pes
-        )
-        pontos_insercao.append(ponto_insercao)
-
-    # Obter a espessura da parede
-    espessura_parede = parede.WallType.Width  # Em pés
-
-    if face_selecionada:
-        # Calcular o vetor normal da parede
-        vetor_normal = XYZ(-direcao_parede.Y, direcao_parede.X, 0).Normalize()
-        # Calcular o deslocamento (metade da espessura da parede)
-        deslocamento = espessura_parede / 2
-        if face_selecionada == 'Frontal':
-            # Deslocar na direção do vetor normal
-            deslocamento_vetor = vetor_normal * deslocamento
-        elif face_selecionada == 'Traseira':
-            # Deslocar na direção oposta ao vetor normal
-            deslocamento_vetor = vetor_normal * (-deslocamento)
-        else:
-            deslocamento_vetor = XYZ(0, 0, 0)
+        paredes_validas = []
+        quadros = []
+        for parede in paredes:
+            quadro = geometria_paredes.quadro_parede(parede)
+            if quadro is not None:
+                paredes_validas.append(parede)
+                quadros.append(quadro)
+    if not paredes_validas:
+        forms.alert("Não foi possível obter a localização da parede.", exitscript=True)
+
+    # Converter metros para pés e planejar os pontos (sem objetos do Revit)
+    regra = layout_tomadas.RegraEspacamento(
+        numero=numero_tomadas,
+        intervalo=intervalo_metros * 3.28084 if intervalo_metros is not None else None,
+        altura=altura_metros * 3.28084,
+        face=face_selecionada,
+    )
+    if continuo:
+        plano = layout_tomadas.planejar_cadeias(cadeias, regra)
     else:
-        deslocamento_vetor = XYZ(0, 0, 0)
+        plano = layout_tomadas.planejar_pontos(quadros, regra)
 
-    # Aplicar o deslocamento a todos os pontos
-    pontos_insercao = [ponto + deslocamento_vetor for ponto in pontos_insercao]
+    # Criar os objetos XYZ uma única vez, a partir das coordenadas planejadas
+    pontos_insercao = [XYZ(x, y, z) for x, y, z in layout_tomadas.iterar_pontos(plano)]
+    # Direção local da parede em cada ponto (tangente, no caso de paredes curvas)
+    direcoes_parede = [XYZ(dx, dy, 0) for dx, dy in layout_tomadas.iterar_direcoes(plano)]
+    # Ângulo de cada ponto, vindo do quadro da parede (usado na rotação)
+    angulos = list(layout_tomadas.iterar_angulos(plano))
+    # Parede hospedeira de cada ponto
+    paredes_hospedeiras = [paredes_validas[i] for i in layout_tomadas.indices_paredes(plano)]
 
-    return pontos_insercao, direcao_parede
+    return pontos_insercao, direcoes_parede, angulos, paredes_hospedeiras
 
 
-def criar_preview(pontos_insercao, direcao_parede):
-    """Cria elementos de pré-visualização das posições das tomadas."""
-    preview_ids = []
-    vetor_perpendicular = XYZ(-direcao_parede.Y, direcao_parede.X, 0).Normalize()
-    with revit.Transaction("Criar Preview"):
-        for ponto in pontos_insercao:
-            # Criar uma pequena linha horizontal perpendicular à direção da parede
-            p1 = ponto - (vetor_perpendicular * 0.2)  # 0.2 pés (~0.06 metros)
-            p2 = ponto + (vetor_perpendicular * 0.2)
-            # Criar um SketchPlane que contém a linha
-            try:
-                plano_normal = XYZ.BasisZ
-                plano = Plane.CreateByNormalAndOrigin(plano_normal, p1)
-                sketch_plane = SketchPlane.Create(doc, plano)
-            except Exception:
-                # Se o plano não puder ser criado, usar um plano padrão (XY)
-                plano = Plane.CreateByNormalAndOrigin(XYZ.BasisZ, p1)
-                sketch_plane = SketchPlane.Create(doc, plano)
-            # Criar a linha de pré-visualização
-            linha_preview = Line.CreateBound(p1, p2)
-            # Criar um ModelCurve para a pré-visualização
-            try:
-                model_line = doc.Create.NewModelCurve(linha_preview, sketch_plane)
-                # Aplicar uma cor diferente para destacar a pré-visualização (opcional)
-                ogs = OverrideGraphicSettings()
-                ogs.SetProjectionLineColor(Color(255, 0, 0))  # Vermelho
-                doc.ActiveView.SetElementOverrides(model_line.Id, ogs)
-                preview_ids.append(model_line.Id)
-            except Exception:
-                pass
-    return preview_ids
-
-
-def remover_preview(preview_ids):
-    """Remove os elementos de pré-visualização."""
-    with revit.Transaction("Remover Preview"):
-        for elem_id in preview_ids:
-            try:
-                doc.Delete(elem_id)
-            except Exception:
-                pass
-
-
-def inserir_tomadas(parede, tomada_selecionada, pontos_insercao, face_selecionada, parametros_elet):
-    """Insere as tomadas nas posições calculadas."""
+def inserir_tomadas(paredes_hospedeiras, tomada_selecionada, pontos_insercao, angulos,
+                    face_selecionada, parametros_elet):
+    """Insere as tomadas nas posições calculadas (lotes de transações em um só grupo)."""
     potencia_aparente, fator_potencia, tensao, numero_fases = parametros_elet
 
-    # Lista para armazenar as instâncias de tomadas inseridas
-    tomadas_inseridas = []
+    # Os ângulos vêm do plano (direção local da parede); a tomada é
+    # rotacionada 180 graus se a face for 'Traseira'
+    if face_selecionada == 'Traseira':
+        angulos = [angulo + math.pi for angulo in angulos]
 
-    with revit.Transaction("Inserir Tomadas"):
-        for ponto_insercao in pontos_insercao:
-            try:
-                # Inserir a tomada usando a parede como host
-                tomada_instancia = doc.Create.NewFamilyInstance(
-                    ponto_insercao,
-                    tomada_selecionada,
-                    parede,
-                    StructuralType.NonStructural,
-                )
+    # Parâmetros resolvidos uma vez por tipo de família (acesso direto)
+    resolvedor = parametros_familia.ResolvedorParametros()
 
-                # Ajustar a orientação da tomada para ficar alinhada com a parede
-                # Obter a direção da parede
-                loc_curve = parede.Location
-                curva = loc_curve.Curve
-                direcao_parede = (
-                        curva.GetEndPoint(1) - curva.GetEndPoint(0)
-                ).Normalize()
-                # Calcular o ângulo entre a direção da parede e o eixo X
-                angulo = XYZ.BasisX.AngleTo(direcao_parede)
-                # Determinar o sentido da rotação
-                cross = XYZ.BasisX.CrossProduct(direcao_parede)
-                if cross.Z < 0:
-                    angulo = -angulo
-
-                # Rotacionar 180 graus se a face for 'Traseira'
-                if face_selecionada == 'Traseira':
-                    angulo += math.pi  # Adicionar 180 graus em radianos
-
-                # Criar o eixo de rotação (linha vertical passando pelo ponto de inserção)
-                eixo_rotacao = Line.CreateBound(
-                    ponto_insercao, ponto_insercao + XYZ.BasisZ
-                )
-                # Rotacionar a tomada
-                ElementTransformUtils.RotateElement(
-                    doc, tomada_instancia.Id, eixo_rotacao, angulo
-                )
+    def definir_parametros(tomadas, erros):
+        """Define a elevação e os parâmetros elétricos das tomadas de um lote.
 
+        As falhas são anotadas no relatório do lote (ver executor_transacoes).
+        """
+        for tomada_instancia in tomadas:
+            try:
                 # Ajustar a altura usando o parâmetro 'Elevação do Ponto'
-                sucesso_altura = False
-                param_elevacao = tomada_instancia.LookupParameter('Elevação do Ponto')
-                if param_elevacao and not param_elevacao.IsReadOnly:
-                    param_elevacao.Set(ponto_insercao.Z)
-                    sucesso_altura = True
-
-                if not sucesso_altura:
-                    # Ajustar diretamente a posição Z
-                    location = tomada_instancia.Location
-                    if isinstance(location, LocationCurve):
-                        pass
-                    elif isinstance(location, LocationPoint):
-                        point = location.Point
-                        new_point = XYZ(point.X, point.Y, ponto_insercao.Z)
-                        location.Point = new_point
+                # (a tomada foi criada na altura do ponto de inserção)
+                location = tomada_instancia.Location
+                if isinstance(location, LocationPoint):
+                    resolvedor.definir(tomada_instancia, 'elevacao_ponto', location.Point.Z)
 
                 # Definir os parâmetros elétricos na instância da família
-                # Potência Aparente (VA)
-                parametro_S = tomada_instancia.LookupParameter('Potência Aparente (VA)')
-                if parametro_S and parametro_S.StorageType == StorageType.Double:
-                    parametro_S.Set(potencia_aparente)
-                # Fator de Potência
-                parametro_cos_phi = tomada_instancia.LookupParameter('Fator de Potência')
-                if parametro_cos_phi and parametro_cos_phi.StorageType == StorageType.Double:
-                    parametro_cos_phi.Set(fator_potencia)
-
-                tomadas_inseridas.append(tomada_instancia)
+                resolvedor.definir(tomada_instancia, 'potencia_aparente', potencia_aparente)
+                resolvedor.definir(tomada_instancia, 'fator_potencia', fator_potencia)
 
             except Exception as e:
-                print("Erro ao inserir tomada: {}".format(e))
-                pass
+                erros.append("Parâmetros da tomada {}: {}".format(tomada_instancia.Id.IntegerValue, e))
+
+    # Criar as tomadas em lotes, já rotacionadas, com uma única entrada de desfazer
+    ids, relatorios = criacao_tomadas.inserir_em_lotes(
+        doc, "Inserir Tomadas", tomada_selecionada, pontos_insercao, angulos,
+        paredes_hospedeiras, ajustar=definir_parametros
+    )
+    executor_transacoes.imprimir_relatorio(relatorios)
+    tomadas_inseridas = [doc.GetElement(elem_id) for elem_id in ids]
 
     return tomadas_inseridas
 
 
 def obter_paineis_eletricos():
-    """Obtém todos os painéis elétricos disponíveis no projeto."""
-    collector = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_ElectricalEquipment).OfClass(
-        FamilyInstance)
+    """Obtém o índice dos painéis elétricos do projeto (em cache, por id)."""
+    return paineis_eletricos.obter_indice(doc)
+
+
+def obter_limite_circuito(tensao, numero_fases):
+    """Obtém do usuário a corrente máxima por circuito e a converte em VA."""
+    corrente_input = forms.ask_for_string(
+        prompt="Insira a corrente máxima por circuito em A (as tomadas serão divididas em circuitos):",
+        title="Limite por Circuito",
+        default="10"
+    )
+    try:
+        corrente = float((corrente_input or "").replace(',', '.'))
+        if corrente <= 0:
+            raise ValueError
+    except ValueError:
+        forms.alert("Entrada inválida. Usando 10 A por circuito.")
+        corrente = 10.0
+    return circuitos.limite_por_corrente(corrente, tensao, numero_fases)
+
+
+def dividir_em_circuitos(tomadas_inseridas, potencia_aparente, limite_va):
+    """Divide as tomadas em grupos compactos com carga até o limite."""
+    resolvedor = parametros_familia.ResolvedorParametros()
+    cargas = []
+    pontos = []
+    for tomada in tomadas_inseridas:
+        # Carga da própria instância, se a família tiver o parâmetro
+        carga = resolvedor.ler(tomada, 'potencia_aparente')
+        cargas.append(carga or potencia_aparente)
+        ponto = tomada.Location.Point
+        pontos.append((ponto.X, ponto.Y))
+
+    grupos = circuitos.particionar(cargas, pontos, limite_va)
+    return [[tomadas_inseridas[i] for i in grupo] for grupo in grupos]
+
+
+# Opção do seletor de painéis para a atribuição automática
+PAINEL_AUTOMATICO = "Automático (painel compatível mais próximo de cada circuito)"
+
+
+def selecionar_painel(indice):
+    """Pergunta se os circuitos devem ser atribuídos a um painel e qual.
+
+    Retorna o id do painel escolhido, PAINEL_AUTOMATICO ou None.
+    """
+    atribuir_painel = MessageBox.Show(
+        "Deseja atribuir os circuitos a um painel?",
+        "Atribuir Painel",
+        MessageBoxButtons.YesNo,
+        MessageBoxIcon.Question,
+    )
+    if atribuir_painel != DialogResult.Yes:
+        forms.alert("Os circuitos não serão atribuídos a nenhum painel.", exitscript=False)
+        return None
+
+    if not len(indice):
+        forms.alert("Nenhum painel elétrico encontrado no projeto.", exitscript=False)
+        return None
+
+    # Painéis com o mesmo nome são distinguidos pelo id
+    opcoes = dict(
+        ("{} [{}]".format(registro.nome, painel_id), painel_id)
+        for painel_id, registro in indice.registros.items()
+    )
+    painel_selecionado = forms.SelectFromList.show(
+        [PAINEL_AUTOMATICO] + sorted(opcoes.keys()),
+        title='Selecione um Painel',
+        button_name='Selecionar',
+        multiselect=False,
+    )
+    if not painel_selecionado:
+        forms.alert("Nenhum painel selecionado. Circuitos não atribuídos.", exitscript=False)
+        return None
+    if painel_selecionado == PAINEL_AUTOMATICO:
+        return PAINEL_AUTOMATICO
+    return opcoes[painel_selecionado]
+
+
+def centro_do_grupo(grupo):
+    """Centroide (x, y, z) das tomadas de um circuito."""
+    pontos = [tomada.Location.Point for tomada in grupo]
+    return (
+        sum(p.X for p in pontos) / len(pontos),
+        sum(p.Y for p in pontos) / len(pontos),
+        sum(p.Z for p in pontos) / len(pontos),
+    )
+
+
+def painel_do_grupo(indice, escolha, grupo, tensao, numero_fases):
+    """Id do painel do circuito: o escolhido ou o compatível mais próximo."""
+    if escolha != PAINEL_AUTOMATICO:
+        return escolha
+    nivel_id = grupo[0].LevelId.IntegerValue
+    return indice.mais_proximo(
+        centro_do_grupo(grupo), tensao, numero_fases,
+        nivel_id if nivel_id > 0 else None,
+    )
+
+
+def definir_parametro_circuito(circuito, bip, valor, tipo_armazenamento):
+    """Define um parâmetro do circuito, se existir e puder ser alterado."""
+    parametro = circuito.get_Parameter(bip)
+    if parametro and not parametro.IsReadOnly and parametro.StorageType == tipo_armazenamento:
+        parametro.Set(valor)
+
+
+def dimensionar_condutores(circuitos_criados):
+    """Dimensiona os condutores dos circuitos e mostra o resultado."""
+    if not circuitos_criados:
+        return
+    resultados, gravados, relatorios = calculo_circuitos.dimensionar_circuitos(
+        doc, circuitos_criados, rotas=rotas_paredes.RotasParedes(doc))
+    executor_transacoes.imprimir_relatorio(relatorios, "Relatório do Dimensionamento")
+    script.get_output().print_table(
+        table_data=[
+            [circuito.CircuitNumber, "{:.1f}".format(dados.comprimento),
+             "{:.1f}".format(resultado.corrente),
+             resultado.secao if resultado.secao is not None else "Acima da tabela",
+             "{:.2f}".format(resultado.queda) if resultado.queda is not None else "-"]
+            for circuito, dados, resultado in resultados
+        ],
+        title="Dimensionamento dos Condutores ({} circuitos atualizados)".format(gravados),
+        columns=["Circuito", "Comprimento (m)", "Corrente (A)", "Seção (mm²)", "Queda (%)"],
+    )
+
+
+def mostrar_cargas_paineis(circuitos_criados):
+    """Mostra a carga atual dos painéis que receberam os circuitos."""
     paineis = {}
-    for painel in collector:
-        try:
-            # Obter o nome do painel
-            painel_nome = painel.Name
-            paineis[painel_nome] = painel
-        except Exception:
-            pass
-    return paineis
+    for circuito in circuitos_criados:
+        painel = circuito.BaseEquipment
+        if painel is not None:
+            paineis[painel.Id.IntegerValue] = painel.Name
+    if not paineis:
+        return
+    # Totais mantidos pelo atualizador de cargas (sem reler o modelo)
+    agregado = cargas_paineis.obter_agregado(doc)
+    script.get_output().print_table(
+        table_data=[
+            [nome, "{:.0f}".format(agregado.painel(painel_id))]
+            for painel_id, nome in sorted(paineis.items(), key=lambda item: item[1])
+        ],
+        title="Carga Atual dos Painéis",
+        columns=["Painel", "Carga (VA)"],
+    )
 
 
 def criar_circuito_eletrico(tomadas_inseridas, tensao, numero_fases, parametros_elet):
-    """Cria um circuito elétrico com as tomadas inseridas e ajusta os parâmetros."""
+    """Divide as tomadas em circuitos pelo limite de carga e cria todos de uma vez."""
     potencia_aparente, fator_potencia, _, _ = parametros_elet
 
+    if tensao <= 0:
+        forms.alert("Tensão do circuito não configurada. Os circuitos não foram criados.",
+                    exitscript=False)
+        return
+
     try:
-        with revit.Transaction("Criar Circuito Elétrico"):
-            # Obter os ElementIds das tomadas
-            tomadas_ids = [t.Id for t in tomadas_inseridas]
-            # Criar uma lista de ElementIds
-            elementos_ids = List[ElementId](tomadas_ids)
+        limite_va = obter_limite_circuito(tensao, numero_fases)
+        grupos = dividir_em_circuitos(tomadas_inseridas, potencia_aparente, limite_va)
+        indice = obter_paineis_eletricos()
+        escolha = selecionar_painel(indice)
+        sem_painel = 0
+
+        circuitos_criados = []
+        with revit.Transaction("Criar Circuitos Elétricos"):
             # Definir o tipo de sistema elétrico (PowerCircuit)
             sistema_tipo = ElectricalSystemType.PowerCircuit
-            # Criar o circuito elétrico
-            circuito = ElectricalSystem.Create(doc, elementos_ids, sistema_tipo)
-            if circuito:
-                forms.alert("Circuito elétrico criado com sucesso.", exitscript=False)
-                # Opcional: Solicitar ao usuário para selecionar um painel
-                # e atribuir o circuito ao painel
-                atribuir_painel = MessageBox.Show(
-                    "Deseja atribuir o circuito a um painel?",
-                    "Atribuir Painel",
-                    MessageBoxButtons.YesNo,
-                    MessageBoxIcon.Question,
-                )
-                if atribuir_painel == DialogResult.Yes:
-                    # Obter os painéis disponíveis
-                    paineis = obter_paineis_eletricos()
-                    if paineis:
-                        painel_selecionado_nome = forms.SelectFromList.show(
-                            sorted(paineis.keys()),
-                            title='Selecione um Painel',
-                            button_name='Selecionar',
-                            multiselect=False,
-                        )
-                        if painel_selecionado_nome:
-                            painel = paineis[painel_selecionado_nome]
-                            circuito.SelectPanel(painel)
-                            forms.alert("Circuito atribuído ao painel selecionado.", exitscript=False)
-
-                            # Definir a tensão e número de fases do circuito com base nos valores fornecidos
-                            voltage_param = circuito.get_Parameter(BuiltInParameter.RBS_ELEC_VOLTAGE)
-                            if voltage_param and voltage_param.StorageType == StorageType.Double:
-                                voltage_param.Set(tensao)
-
-                            number_of_poles_param = circuito.get_Parameter(BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES)
-                            if number_of_poles_param and number_of_poles_param.StorageType == StorageType.Integer:
-                                number_of_poles_param.Set(numero_fases)
-
-                            # Definir a Potência Aparente e o Fator de Potência no circuito
-                            apparent_load_param = circuito.get_Parameter(BuiltInParameter.RBS_ELEC_APPARENT_LOAD)
-                            if apparent_load_param and apparent_load_param.StorageType == StorageType.Double:
-                                apparent_load_param.Set(potencia_aparente)
-
-                            power_factor_param = circuito.get_Parameter(BuiltInParameter.RBS_ELEC_POWER_FACTOR)
-                            if power_factor_param and power_factor_param.StorageType == StorageType.Double:
-                                power_factor_param.Set(fator_potencia)
-
-                            # Regenerar o documento para atualizar parâmetros calculados
-                            doc.Regenerate()
-
-                            # Agora, Revit deve atualizar automaticamente o parâmetro "Dados elétricos"
-
-                        else:
-                            forms.alert("Nenhum painel selecionado. Circuito não atribuído.", exitscript=False)
-                    else:
-                        forms.alert("Nenhum painel elétrico encontrado no projeto.", exitscript=False)
-                else:
-                    forms.alert("Circuito não será atribuído a nenhum painel.", exitscript=False)
-            else:
-                forms.alert("Não foi possível criar o circuito elétrico.", exitscript=False)
+            for grupo in grupos:
+                # Criar o circuito elétrico com os ElementIds das tomadas do grupo
+                elementos_ids = List[ElementId]([t.Id for t in grupo])
+                circuito = ElectricalSystem.Create(doc, elementos_ids, sistema_tipo)
+                if not circuito:
+                    continue
+                circuitos_criados.append(circuito)
+                if escolha is None:
+                    continue
+                painel_id = painel_do_grupo(indice, escolha, grupo, tensao, numero_fases)
+                if painel_id is None:
+                    sem_painel += 1
+                    continue
+                circuito.SelectPanel(doc.GetElement(ElementId(painel_id)))
+                indice.reservar(painel_id, numero_fases)
+
+                # Definir a tensão e número de fases do circuito com base nos valores fornecidos
+                definir_parametro_circuito(
+                    circuito, BuiltInParameter.RBS_ELEC_VOLTAGE, tensao, StorageType.Double)
+                definir_parametro_circuito(
+                    circuito, BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES, numero_fases, StorageType.Integer)
+                # Definir o Fator de Potência no circuito
+                definir_parametro_circuito(
+                    circuito, BuiltInParameter.RBS_ELEC_POWER_FACTOR, fator_potencia, StorageType.Double)
+
+            # Regenerar o documento para atualizar parâmetros calculados
+            doc.Regenerate()
+
+        if circuitos_criados:
+            # Dimensionar os condutores dos circuitos conectados a um painel
+            dimensionar_condutores([c for c in circuitos_criados if c.BaseEquipment is not None])
+            mostrar_cargas_paineis(circuitos_criados)
+            forms.alert(
+                "{} circuitos elétricos criados (limite de {:.0f} VA por circuito).{}".format(
+                    len(circuitos_criados), limite_va,
+                    "\n{} circuitos sem painel compatível não foram atribuídos.".format(sem_painel)
+                    if sem_painel else ""),
+                exitscript=False,
+            )
+        else:
+            forms.alert("Não foi possível criar o circuito elétrico.", exitscript=False)
     except Exception as e:
         tb = traceback.format_exc()
         forms.alert("Erro ao criar circuito elétrico:\n{}".format(tb))
@@ -861,10 +793,10 @@ def inserir_tomadas_na_parede():
     try:
         # Selecionar a família de tomada
         tomada_selecionada = selecionar_familia_tomada()
-        # Selecionar a parede
-        parede = selecionar_parede()
-        # Obter os parâmetros do usuário
-        parametros = obter_parametros_usuario(parede)
+        # Selecionar as paredes (seleção atual ou várias com PickObjects)
+        paredes = selecionar_paredes()
+        # Obter os parâmetros do usuário (os mesmos para todas as paredes)
+        parametros = obter_parametros_usuario()
         if parametros is None:
             forms.alert("Falha ao obter parâmetros do usuário.", exitscript=True)
         (
@@ -874,52 +806,63 @@ def inserir_tomadas_na_parede():
             face_selecionada,
             parametros_elet,
         ) = parametros
-        # Calcular os pontos de inserção e a direção da parede
-        pontos_insercao, direcao_parede = calcular_pontos_insercao(
-            parede, altura_metros, numero_tomadas, intervalo_metros, face_selecionada
+        # Calcular os pontos de inserção, a direção e a parede de cada ponto
+        pontos_insercao, direcoes_parede, angulos, paredes_hospedeiras = calcular_pontos_insercao(
+            paredes, altura_metros, numero_tomadas, intervalo_metros, face_selecionada,
+            perguntar_modo_continuo(paredes)
         )
-        # Criar pré-visualização
-        preview_ids = criar_preview(pontos_insercao, direcao_parede)
-        # Atualizar a vista para garantir que os ModelCurves apareçam
-        uidoc.RefreshActiveView()
-
-        # Perguntar ao usuário se deseja confirmar a inserção
-        resultado = MessageBox.Show(
-            "Deseja inserir as tomadas nas posições marcadas?",
-            "Confirmar Inserção",
-            MessageBoxButtons.YesNo,
-            MessageBoxIcon.Question,
+        # Descartar as posições que já têm uma tomada
+        pontos_insercao, direcoes_parede, angulos, paredes_hospedeiras, descartados = tomadas_existentes.filtrar_livres(
+            doc, pontos_insercao, direcoes_parede, angulos, paredes_hospedeiras
         )
-        # Remover pré-visualização
-        remover_preview(preview_ids)
-        if resultado == DialogResult.Yes:
-            # Inserir as tomadas
-            tomadas_inseridas = inserir_tomadas(
-                parede,
-                tomada_selecionada,
-                pontos_insercao,
-                face_selecionada,
-                parametros_elet,
+        if not pontos_insercao:
+            forms.alert("Todas as posições já possuem tomadas.", exitscript=True)
+        # Toda a sessão (pré-visualização, inserção e circuito) em uma única entrada de desfazer
+        with executor_transacoes.sessao(doc, "Inserir Tomadas"):
+            # Criar pré-visualização
+            preview = preview_tomadas.mostrar_marcadores(doc, uidoc, pontos_insercao, direcoes_parede)
+
+            # Perguntar ao usuário se deseja confirmar a inserção
+            resultado = MessageBox.Show(
+                "Deseja inserir as tomadas nas posições marcadas?{}".format(
+                    "\n({} posições já possuem tomadas e foram ignoradas.)".format(descartados)
+                    if descartados else ""
+                ),
+                "Confirmar Inserção",
+                MessageBoxButtons.YesNo,
+                MessageBoxIcon.Question,
             )
-
-            # Perguntar ao usuário se deseja criar um circuito
-            if tomadas_inseridas:
-                criar_circuito = MessageBox.Show(
-                    "Deseja criar um circuito elétrico para as tomadas inseridas?",
-                    "Criar Circuito",
-                    MessageBoxButtons.YesNo,
-                    MessageBoxIcon.Question,
+            # Remover pré-visualização (desfeita, sem apagar elementos)
+            preview.remover()
+            if resultado == DialogResult.Yes:
+                # Inserir as tomadas
+                tomadas_inseridas = inserir_tomadas(
+                    paredes_hospedeiras,
+                    tomada_selecionada,
+                    pontos_insercao,
+                    angulos,
+                    face_selecionada,
+                    parametros_elet,
                 )
 
-                if criar_circuito == DialogResult.Yes:
-                    # Criar o circuito elétrico
-                    criar_circuito_eletrico(tomadas_inseridas, parametros_elet[2], parametros_elet[3], parametros_elet)
+                # Perguntar ao usuário se deseja criar um circuito
+                if tomadas_inseridas:
+                    criar_circuito = MessageBox.Show(
+                        "Deseja criar um circuito elétrico para as tomadas inseridas?",
+                        "Criar Circuito",
+                        MessageBoxButtons.YesNo,
+                        MessageBoxIcon.Question,
+                    )
+
+                    if criar_circuito == DialogResult.Yes:
+                        # Criar o circuito elétrico
+                        criar_circuito_eletrico(tomadas_inseridas, parametros_elet[2], parametros_elet[3], parametros_elet)
+                    else:
+                        forms.alert("Circuito não será criado.", exitscript=False)
                 else:
-                    forms.alert("Circuito não será criado.", exitscript=False)
+                    forms.alert("Nenhuma tomada foi inserida.", exitscript=False)
             else:
-                forms.alert("Nenhuma tomada foi inserida.", exitscript=False)
-        else:
-            forms.alert("Inserção cancelada pelo usuário.")
+                forms.alert("Inserção cancelada pelo usuário.")
     except Exception as e:
         tb = traceback.format_exc()
         forms.alert("Ocorreu um erro:\n{}".format(tb))
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__ = "Listar Parâmetros da Família"
-__doc__ = """Script para listar todos os parâmetros de uma instância de família selecionada, incluindo parâmetros de instância e de tipo."""
+__doc__ = """Script para listar todos os parâmetros de uma instância de família selecionada, incluindo parâmetros de instância e de tipo.
+Também exporta os parâmetros de todas as instâncias de uma categoria para CSV ou JSON Lines, gravando o arquivo aos poucos."""
 
 import clr
 import traceback
@@ -17,6 +18,10 @@ from pyrevit import revit, forms, script
 clr.AddReference('System.Windows.Forms')
 from System.Windows.Forms import DialogResult, MessageBox, MessageBoxButtons, MessageBoxIcon
 
+# Bibliotecas compartilhadas da extensão (pasta lib)
+import escrita_em_blocos
+import parametros_categoria
+
 
 def listar_parametros():
     output = script.get_output()
@@ -203,8 +208,67 @@ def listar_parametros():
         output.print_md("### Erro no Script:\n{}".format(tb))
 
 
+def exportar_categoria():
+    output = script.get_output()
+    try:
+        categorias = parametros_categoria.categorias_modelo(revit.doc)
+        rotulos = parametros_categoria.rotulos_categorias(categorias)
+        rotulo = forms.SelectFromList.show(
+            sorted(rotulos.keys()),
+            title="Selecione a categoria a exportar",
+            multiselect=False,
+        )
+        if not rotulo:
+            forms.alert("Nenhuma categoria selecionada.", exitscript=True)
+        categoria_nome, categoria_id = categorias[rotulos[rotulo]]
+
+        # Contar sem carregar os elementos
+        quantidade = parametros_categoria.coletor_categoria(revit.doc, categoria_id).GetElementCount()
+        if not quantidade:
+            forms.alert("Nenhuma instância da categoria {}.".format(categoria_nome), exitscript=True)
+
+        caminho = forms.save_file(
+            file_ext="csv",
+            default_name="parametros_{}".format(categoria_nome),
+            files_filter="CSV (*.csv)|*.csv|JSON Lines (*.jsonl)|*.jsonl",
+            title="Salvar parâmetros da categoria",
+        )
+        if not caminho:
+            return
+        formato = "jsonl" if caminho.lower().endswith(".jsonl") else "csv"
+
+        output.print_md("## Exportação da Categoria {}".format(categoria_nome))
+        output.print_md("### Instâncias: {}".format(quantidade))
+
+        def relatar(linhas, por_segundo):
+            output.print_md("{} linhas ({:.0f} linhas/s)".format(linhas, por_segundo))
+
+        total, tempo = escrita_em_blocos.exportar(
+            parametros_categoria.linhas_categoria(revit.doc, categoria_id),
+            caminho,
+            parametros_categoria.COLUNAS,
+            formato=formato,
+            relatar=relatar,
+        )
+        forms.alert("{} linhas exportadas em {:.1f} s para:\n{}".format(total, tempo, caminho))
+    except Exception as e:
+        tb = traceback.format_exc()
+        forms.alert("Ocorreu um erro:\n{}".format(tb))
+        output.print_md("### Erro no Script:\n{}".format(tb))
+
+
 def main():
-    listar_parametros()
+    resposta = MessageBox.Show(
+        "Deseja exportar os parâmetros de todas as instâncias de uma categoria?\n"
+        "(Não: listar os parâmetros de uma instância selecionada)",
+        "Listar Parâmetros",
+        MessageBoxButtons.YesNo,
+        MessageBoxIcon.Question
+    )
+    if resposta == DialogResult.Yes:
+        exportar_categoria()
+    else:
+        listar_parametros()
 
 
 if __name__ == "__main__":
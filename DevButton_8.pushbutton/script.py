@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+__title__ = "Tomadas por Cômodo"
+__doc__ = """Versão: 1.0
+_____________________________________________________________________
+Descrição:
+Este script insere as tomadas de uso geral no perímetro de todos os
+cômodos de um nível, seguindo as quantidades mínimas da NBR 5410
+(uma a cada 5 m de perímetro, uma a cada 3,5 m em cozinhas e áreas de
+serviço, pelo menos uma em banheiros e cômodos de até 6 m²).
+As tomadas são espaçadas uniformemente ao longo das paredes do contorno,
+fora das portas e janelas, e inseridas de uma só vez, após a pré-visualização.
+_____________________________________________________________________
+Como usar:
+- Clique no botão, escolha a família, o nível e a altura das tomadas.
+_____________________________________________________________________
+Autor: Seu Nome"""
+
+# Manter o motor ativo entre execuções (necessário para o cache de famílias)
+__persistentengine__ = True
+
+# Importações necessárias
+import clr
+clr.AddReference('System.Windows.Forms')
+from System.Windows.Forms import DialogResult, MessageBox, MessageBoxButtons, MessageBoxIcon
+
+from Autodesk.Revit.DB import *
+from Autodesk.Revit.UI import *
+
+# Importações do pyRevit
+from pyrevit import forms, script
+
+# Bibliotecas compartilhadas da extensão (pasta lib)
+import catalogo_familias
+import criacao_tomadas
+import executor_transacoes
+import geometria_paredes
+import perimetro_comodos
+import preview_tomadas
+import tomadas_existentes
+
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # type: Document
+uidoc = __revit__.ActiveUIDocument
+app = __revit__.Application
+
+# Fator de conversão de metros para pés
+PES_POR_METRO = 3.28084
+
+# Funções auxiliares
+def selecionar_familia_tomada():
+    """Permite que o usuário selecione uma família de tomada elétrica."""
+    return catalogo_familias.selecionar_familia(doc)
+
+def selecionar_nivel():
+    """Permite que o usuário selecione o nível dos cômodos."""
+    niveis = FilteredElementCollector(doc).OfClass(Level).ToElements()
+    niveis_dict = {nivel.Name: nivel for nivel in niveis}
+    if not niveis_dict:
+        forms.alert("Nenhum nível encontrado no projeto.", exitscript=True)
+
+    nivel_nome = forms.SelectFromList.show(
+        sorted(niveis_dict.keys(), key=lambda nome: niveis_dict[nome].Elevation),
+        title='Selecione o Nível dos Cômodos',
+        button_name='Selecionar',
+        multiselect=False
+    )
+    if not nivel_nome:
+        forms.alert("Nenhum nível selecionado.", exitscript=True)
+
+    return niveis_dict[nivel_nome]
+
+def obter_altura_usuario():
+    """Obtém a altura das tomadas em metros."""
+    altura_metros_input = forms.ask_for_string(
+        prompt="Insira a altura das tomadas em metros:",
+        title="Altura das Tomadas",
+        default="0.30"
+    )
+    if altura_metros_input is None:
+        forms.alert("Operação cancelada.", exitscript=True)
+    try:
+        altura_metros = float(altura_metros_input.replace(',', '.'))
+    except ValueError:
+        forms.alert("Entrada inválida. Usando altura padrão de 0.30 metros.")
+        altura_metros = 0.30
+
+    return altura_metros
+
+def obter_comodos(nivel):
+    """Retorna os cômodos colocados (com área) do nível."""
+    comodos = FilteredElementCollector(doc)\
+        .OfCategory(BuiltInCategory.OST_Rooms)\
+        .WhereElementIsNotElementType()
+    return [
+        comodo for comodo in comodos
+        if comodo.LevelId == nivel.Id and comodo.Area > 0
+    ]
+
+def nome_comodo(comodo):
+    """Retorna o nome do cômodo (sem o número)."""
+    parametro = comodo.get_Parameter(BuiltInParameter.ROOM_NAME)
+    return parametro.AsString() if parametro else ""
+
+def calcular_pontos_insercao(comodos, altura_metros):
+    """Calcula os pontos de inserção de todos os cômodos de uma só vez."""
+    opcoes = geometria_paredes.opcoes_contorno()
+    # Aberturas lidas uma vez por parede, mesmo que ela limite vários cômodos
+    cache_aberturas = {}
+
+    resumo = []
+    planejados = []
+    paredes_trechos = []
+    for comodo in comodos:
+        # Ler o contorno uma única vez (perímetro e trechos com parede)
+        perimetro, trechos = geometria_paredes.trechos_comodo(
+            comodo, opcoes, cache_aberturas
+        )
+        nome = nome_comodo(comodo)
+        area_m2 = comodo.Area / (PES_POR_METRO ** 2)
+        perimetro_m = perimetro / PES_POR_METRO
+        numero = perimetro_comodos.numero_tomadas(nome, area_m2, perimetro_m)
+        if not trechos:
+            numero = 0
+
+        planejados.append(([quadro for _, quadro in trechos], numero))
+        paredes_trechos.extend(parede for parede, _ in trechos)
+        resumo.append([nome, "{:.2f}".format(area_m2), "{:.2f}".format(perimetro_m), numero])
+
+    # Planejar os pontos (sem objetos do Revit)
+    plano = perimetro_comodos.planejar_comodos(planejados, altura_metros * PES_POR_METRO)
+
+    pontos_insercao = [XYZ(x, y, z) for x, y, z in zip(plano.xs, plano.ys, plano.zs)]
+    # Direção do contorno em cada ponto: o interior do cômodo fica à esquerda
+    direcoes_contorno = [XYZ(dx, dy, 0) for dx, dy in zip(plano.dxs, plano.dys)]
+    # Ângulo de cada ponto, vindo do quadro do trecho (usado na rotação)
+    angulos = list(plano.angulos)
+    paredes_hospedeiras = [paredes_trechos[i] for i in plano.paredes]
+
+    return pontos_insercao, direcoes_contorno, angulos, paredes_hospedeiras, resumo
+
+def inserir_tomadas(paredes_hospedeiras, tomada_selecionada, pontos_insercao, angulos):
+    """Insere as tomadas de todos os cômodos (lotes de transações em um só grupo).
+
+    Os ângulos alinham a tomada ao contorno; como o cômodo fica à esquerda do
+    contorno, a tomada fica voltada para dentro do cômodo.
+    """
+    # Criar as tomadas em lotes, já rotacionadas, com uma única entrada de desfazer
+    ids, relatorios = criacao_tomadas.inserir_em_lotes(
+        doc, "Inserir Tomadas por Cômodo", tomada_selecionada,
+        pontos_insercao, angulos, paredes_hospedeiras
+    )
+    executor_transacoes.imprimir_relatorio(relatorios)
+    return len(ids)
+
+def inserir_tomadas_nos_comodos():
+    """Função principal para inserir as tomadas no perímetro dos cômodos."""
+    output = script.get_output()
+    try:
+        tomada_selecionada = selecionar_familia_tomada()
+        nivel = selecionar_nivel()
+        altura_metros = obter_altura_usuario()
+
+        comodos = obter_comodos(nivel)
+        if not comodos:
+            forms.alert("Nenhum cômodo encontrado no nível '{}'.".format(nivel.Name), exitscript=True)
+
+        pontos_insercao, direcoes_contorno, angulos, paredes_hospedeiras, resumo = calcular_pontos_insercao(
+            comodos, altura_metros
+        )
+        if not pontos_insercao:
+            forms.alert("Nenhum cômodo com paredes para receber tomadas.", exitscript=True)
+        # Descartar as posições que já têm uma tomada
+        pontos_insercao, direcoes_contorno, angulos, paredes_hospedeiras, descartados = tomadas_existentes.filtrar_livres(
+            doc, pontos_insercao, direcoes_contorno, angulos, paredes_hospedeiras
+        )
+        if not pontos_insercao:
+            forms.alert("Todas as posições já possuem tomadas.", exitscript=True)
+
+        output.print_table(
+            table_data=resumo,
+            title="Tomadas por Cômodo - {}".format(nivel.Name),
+            columns=["Cômodo", "Área (m²)", "Perímetro (m)", "Tomadas"]
+        )
+
+        # Toda a sessão (pré-visualização e inserção) em uma única entrada de desfazer
+        with executor_transacoes.sessao(doc, "Inserir Tomadas por Cômodo"):
+            # Criar pré-visualização: pequena linha perpendicular à parede,
+            # voltada para o cômodo (~0.12 metros)
+            preview = preview_tomadas.mostrar_marcadores(
+                doc, uidoc, pontos_insercao, direcoes_contorno, antes=0.0, depois=0.4
+            )
+
+            resultado = MessageBox.Show(
+                "Deseja inserir {} tomadas em {} cômodos?{}".format(
+                    len(pontos_insercao), len(comodos),
+                    "\n({} posições já possuem tomadas e foram ignoradas.)".format(descartados)
+                    if descartados else ""
+                ),
+                "Confirmar Inserção",
+                MessageBoxButtons.YesNo,
+                MessageBoxIcon.Question
+            )
+
+            # Remover pré-visualização (desfeita, sem apagar elementos)
+            preview.remover()
+
+            if resultado == DialogResult.Yes:
+                inseridas = inserir_tomadas(
+                    paredes_hospedeiras, tomada_selecionada, pontos_insercao, angulos
+                )
+                forms.alert("{} tomadas inseridas com sucesso!".format(inseridas))
+            else:
+                forms.alert("Inserção cancelada pelo usuário.")
+
+    except Exception as e:
+        forms.alert("Ocorreu um erro: {}".format(e))
+
+# Executar o script
+if __name__ == "__main__":
+    inserir_tomadas_nos_comodos()
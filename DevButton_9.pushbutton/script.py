@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+__title__ = "Balancear Fases"
+__doc__ = """Versão: 1.0
+_____________________________________________________________________
+Descrição:
+Este script distribui os circuitos de um polo de um painel trifásico
+entre as fases A, B e C, minimizando o desequilíbrio de carga.
+Os circuitos de dois ou três polos permanecem nas suas posições.
+O resultado é mostrado antes de ser gravado; os circuitos são movidos
+de posição na tabela do painel em uma única transação.
+_____________________________________________________________________
+Como usar:
+- Selecione um painel (ou escolha na lista) e clique no botão.
+- O painel precisa ter uma tabela de painel (Panel Schedule).
+_____________________________________________________________________
+Autor: Seu Nome"""
+
+# Manter o motor ativo entre execuções (necessário para o cache de painéis)
+__persistentengine__ = True
+
+# Importações necessárias
+import clr
+import time
+clr.AddReference('System.Windows.Forms')
+from System.Windows.Forms import DialogResult, MessageBox, MessageBoxButtons, MessageBoxIcon
+
+from Autodesk.Revit.DB import BuiltInCategory, ElementId
+
+# Importações do pyRevit
+from pyrevit import forms, script
+
+# Bibliotecas compartilhadas da extensão (pasta lib)
+import balanceamento_fases
+import fases_paineis
+import paineis_eletricos
+
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # type: Document
+uidoc = __revit__.ActiveUIDocument
+
+# Funções auxiliares
+def selecionar_painel(indice):
+    """Retorna o painel selecionado no modelo ou escolhido na lista."""
+    for elem_id in uidoc.Selection.GetElementIds():
+        elemento = doc.GetElement(elem_id)
+        categoria = elemento.Category if elemento else None
+        if categoria and categoria.Id.IntegerValue == int(BuiltInCategory.OST_ElectricalEquipment):
+            return elemento
+
+    # Painéis trifásicos (ou sem sistema de distribuição), distinguidos pelo id
+    opcoes = dict(
+        ("{} [{}]".format(registro.nome, painel_id), painel_id)
+        for painel_id, registro in indice.registros.items()
+        if registro.fases != 1
+    )
+    if not opcoes:
+        forms.alert("Nenhum painel trifásico encontrado no projeto.", exitscript=True)
+
+    painel_nome = forms.SelectFromList.show(
+        sorted(opcoes.keys()),
+        title='Selecione o Painel',
+        button_name='Selecionar',
+        multiselect=False
+    )
+    if not painel_nome:
+        forms.alert("Nenhum painel selecionado.", exitscript=True)
+    return doc.GetElement(ElementId(opcoes[painel_nome]))
+
+def formatar_totais(totais):
+    """Cargas por fase em VA, para a tabela de resumo."""
+    return ["{:.0f}".format(total) for total in totais]
+
+def mostrar_resultado(output, quadro, circuitos, resultado, movimentos, pendentes, tempo):
+    """Mostra as fases antes e depois do balanceamento."""
+    fases = balanceamento_fases.FASES
+    atuais = [quadro.fase_do_slot[c.slot] for c in circuitos]
+    totais_atuais = balanceamento_fases.totais_por_fase(
+        [c.carga for c in circuitos], atuais, quadro.base()
+    )
+    output.print_table(
+        table_data=[
+            ["Atual"] + formatar_totais(totais_atuais)
+            + ["{:.1f}".format(100 * balanceamento_fases.desequilibrio(totais_atuais))],
+            ["Balanceado" if not pendentes else "Alcançável"] + formatar_totais(resultado.totais)
+            + ["{:.1f}".format(100 * resultado.desequilibrio)],
+        ],
+        title="Carga por Fase (VA)",
+        columns=["Distribuição", "Fase A", "Fase B", "Fase C", "Desequilíbrio (%)"]
+    )
+
+    alterados = [
+        [c.numero, "{:.0f}".format(c.carga), fases[atual], fases[nova]]
+        for c, atual, nova in zip(circuitos, atuais, resultado.fases)
+        if atual != nova
+    ]
+    if alterados:
+        output.print_table(
+            table_data=alterados,
+            title="Circuitos que Mudam de Fase",
+            columns=["Circuito", "Carga (VA)", "Fase Atual", "Nova Fase"]
+        )
+    if pendentes:
+        output.print_md(
+            "**{} circuitos não podem mudar de fase por falta de posições livres no painel; "
+            "os totais acima são os que os movimentos possíveis alcançam.**".format(len(pendentes)))
+    output.print_md("{} circuitos lidos, {} movimentos planejados em {:.0f} ms.".format(
+        len(quadro.circuitos), len(movimentos), tempo * 1000))
+
+def balancear_fases():
+    """Função principal para balancear as fases de um painel."""
+    output = script.get_output()
+    try:
+        indice = paineis_eletricos.obter_indice(doc)
+        painel = selecionar_painel(indice)
+        vista = fases_paineis.vista_do_painel(doc, painel)
+        if vista is None:
+            forms.alert("O painel '{}' não possui tabela de painel.".format(painel.Name), exitscript=True)
+
+        inicio = time.time()
+        quadro = fases_paineis.QuadroFases(vista)
+        circuitos, resultado, movimentos, pendentes = quadro.balancear()
+        tempo = time.time() - inicio
+
+        if not circuitos:
+            forms.alert("O painel não possui circuitos de um polo.", exitscript=True)
+
+        mostrar_resultado(output, quadro, circuitos, resultado, movimentos, pendentes, tempo)
+        if not movimentos and pendentes:
+            forms.alert(
+                "Não há posições livres suficientes no painel para melhorar o balanceamento "
+                "({} circuitos precisariam mudar de fase).".format(len(pendentes)),
+                exitscript=True)
+        if not movimentos:
+            forms.alert("As fases do painel já estão balanceadas.", exitscript=True)
+
+        aviso = ""
+        if pendentes:
+            aviso = ("\n\nAtenção: {} circuitos não podem mudar de fase por falta de posições "
+                     "livres; o resultado é parcial.".format(len(pendentes)))
+        confirmar = MessageBox.Show(
+            "Deseja aplicar o balanceamento ({} movimentos, desequilíbrio de {:.1f}%)?{}".format(
+                len(movimentos), 100 * resultado.desequilibrio, aviso),
+            "Confirmar Balanceamento",
+            MessageBoxButtons.YesNo,
+            MessageBoxIcon.Question
+        )
+        if confirmar != DialogResult.Yes:
+            forms.alert("Balanceamento cancelado pelo usuário.")
+            return
+
+        quadro.aplicar(movimentos)
+        forms.alert("Fases do painel '{}' balanceadas.".format(painel.Name))
+
+    except Exception as e:
+        forms.alert("Ocorreu um erro: {}".format(e))
+
+# Executar o script
+if __name__ == "__main__":
+    balancear_fases()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Totais de carga por circuito e por painel, mantidos por diferenças.
+
+A carga de um circuito é a soma das potências aparentes declaradas pelos
+seus elementos (tomadas, luminárias); se nenhum elemento declara a
+potência, vale a carga calculada pelo próprio Revit para o circuito. A carga
+de um painel é a soma das cargas dos seus circuitos.
+
+Cada alteração (carga de um elemento, elementos ou painel de um circuito,
+remoção) ajusta apenas os totais afetados, pela diferença entre o valor
+antigo e o novo; as leituras são consultas diretas a dicionários, O(1).
+
+Este módulo não depende do Revit.
+"""
+
+
+class AgregadoCargas(object):
+    """Cargas (VA) por elemento, circuito e painel, identificados por ids inteiros."""
+
+    def __init__(self):
+        # elemento -> carga declarada (None se o elemento não declara)
+        self.carga_elemento = {}
+        self.circuito_do_elemento = {}
+        self.elementos_circuito = {}
+        self.painel_do_circuito = {}
+        # circuito -> carga calculada pelo Revit (usada se nada for declarado)
+        self.carga_propria = {}
+        # circuito -> [soma das cargas declaradas, elementos que declaram]
+        self._declaradas = {}
+        self.carga_circuito = {}
+        self.carga_painel = {}
+
+    # Leituras
+
+    def circuito(self, circuito_id):
+        """Carga atual do circuito (VA)."""
+        return self.carga_circuito.get(circuito_id, 0.0)
+
+    def painel(self, painel_id):
+        """Carga atual do painel (VA)."""
+        return self.carga_painel.get(painel_id, 0.0)
+
+    def conhece(self, elemento_id):
+        """Verifica se o id é de um elemento ou circuito acompanhado."""
+        return elemento_id in self.carga_elemento or elemento_id in self.elementos_circuito
+
+    # Alterações
+
+    def _somar_declarada(self, circuito_id, carga, sinal):
+        if carga is None:
+            return
+        declaradas = self._declaradas.setdefault(circuito_id, [0.0, 0])
+        declaradas[0] += sinal * carga
+        declaradas[1] += sinal
+
+    def _recalcular(self, circuito_id):
+        """Atualiza o total do circuito e aplica a diferença ao painel."""
+        soma, quantidade = self._declaradas.get(circuito_id, (0.0, 0))
+        novo = soma if quantidade else self.carga_propria.get(circuito_id, 0.0)
+        diferenca = novo - self.carga_circuito.get(circuito_id, 0.0)
+        self.carga_circuito[circuito_id] = novo
+        painel_id = self.painel_do_circuito.get(circuito_id)
+        if painel_id is not None and diferenca:
+            self.carga_painel[painel_id] = self.carga_painel.get(painel_id, 0.0) + diferenca
+
+    def _desligar(self, elemento_id):
+        """Retira o elemento do circuito em que estava, se houver."""
+        circuito_id = self.circuito_do_elemento.pop(elemento_id, None)
+        if circuito_id is None:
+            return None
+        self.elementos_circuito[circuito_id].discard(elemento_id)
+        self._somar_declarada(circuito_id, self.carga_elemento.get(elemento_id), -1)
+        return circuito_id
+
+    def definir_elemento(self, elemento_id, carga):
+        """Define a carga declarada de um elemento (None se não declara)."""
+        antiga = self.carga_elemento.get(elemento_id)
+        self.carga_elemento[elemento_id] = carga
+        circuito_id = self.circuito_do_elemento.get(elemento_id)
+        if circuito_id is not None and antiga != carga:
+            self._somar_declarada(circuito_id, antiga, -1)
+            self._somar_declarada(circuito_id, carga, +1)
+            self._recalcular(circuito_id)
+
+    def definir_circuito(self, circuito_id, painel_id, elementos, carga_propria=0.0):
+        """Define o painel, os elementos e a carga calculada de um circuito."""
+        novos = set(elementos)
+        atuais = self.elementos_circuito.setdefault(circuito_id, set())
+        for elemento_id in atuais - novos:
+            self._desligar(elemento_id)
+        for elemento_id in novos - atuais:
+            anterior = self._desligar(elemento_id)
+            if anterior is not None:
+                self._recalcular(anterior)
+            self.circuito_do_elemento[elemento_id] = circuito_id
+            atuais.add(elemento_id)
+            self._somar_declarada(circuito_id, self.carga_elemento.get(elemento_id), +1)
+
+        # Troca de painel: a carga atual sai do antigo e entra no novo
+        painel_antigo = self.painel_do_circuito.get(circuito_id)
+        if painel_antigo != painel_id:
+            carga = self.carga_circuito.get(circuito_id, 0.0)
+            if painel_antigo is not None:
+                self.carga_painel[painel_antigo] = self.carga_painel.get(painel_antigo, 0.0) - carga
+            if painel_id is not None:
+                self.carga_painel[painel_id] = self.carga_painel.get(painel_id, 0.0) + carga
+            self.painel_do_circuito[circuito_id] = painel_id
+
+        self.carga_propria[circuito_id] = carga_propria
+        self._recalcular(circuito_id)
+
+    def remover(self, elemento_id):
+        """Remove um elemento ou um circuito, descontando a sua carga."""
+        if elemento_id in self.elementos_circuito:
+            circuito_id = elemento_id
+            for membro in list(self.elementos_circuito[circuito_id]):
+                self._desligar(membro)
+            painel_id = self.painel_do_circuito.pop(circuito_id, None)
+            carga = self.carga_circuito.pop(circuito_id, 0.0)
+            if painel_id is not None:
+                self.carga_painel[painel_id] = self.carga_painel.get(painel_id, 0.0) - carga
+            del self.elementos_circuito[circuito_id]
+            self.carga_propria.pop(circuito_id, None)
+            self._declaradas.pop(circuito_id, None)
+            return
+        circuito_id = self._desligar(elemento_id)
+        self.carga_elemento.pop(elemento_id, None)
+        if circuito_id is not None:
+            self._recalcular(circuito_id)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Árvore k-d estática para consultas de vizinho mais próximo.
+
+A árvore é montada uma vez a partir de pontos (tuplas de mesma dimensão)
+com um valor associado a cada ponto, dividindo pela mediana do eixo de maior
+extensão. A consulta desce até a folha do ponto procurado e só visita o outro
+lado de uma divisão se ele puder conter um ponto mais próximo, o que dá
+O(log n) em média.
+
+Um filtro opcional (aceitar) descarta valores incompatíveis durante a
+consulta, sem remontar a árvore; os nós recusados continuam servindo para a
+navegação.
+
+Este módulo não depende do Revit.
+"""
+
+
+class _No(object):
+    __slots__ = ('ponto', 'valor', 'eixo', 'esquerda', 'direita')
+
+    def __init__(self, ponto, valor, eixo):
+        self.ponto = ponto
+        self.valor = valor
+        self.eixo = eixo
+        self.esquerda = None
+        self.direita = None
+
+
+def _distancia2(a, b):
+    """Quadrado da distância euclidiana entre dois pontos."""
+    return sum((x - y) * (x - y) for x, y in zip(a, b))
+
+
+def _eixo_maior(itens, dimensao):
+    """Eixo em que os pontos dos itens têm a maior extensão."""
+    melhor = 0
+    extensao = -1.0
+    for eixo in range(dimensao):
+        valores = [item[0][eixo] for item in itens]
+        atual = max(valores) - min(valores)
+        if atual > extensao:
+            melhor = eixo
+            extensao = atual
+    return melhor
+
+
+def _montar(itens, dimensao):
+    """Monta a subárvore dos itens (ponto, valor) pela mediana."""
+    if not itens:
+        return None
+    eixo = _eixo_maior(itens, dimensao)
+    itens = sorted(itens, key=lambda item: item[0][eixo])
+    meio = len(itens) // 2
+    no = _No(itens[meio][0], itens[meio][1], eixo)
+    no.esquerda = _montar(itens[:meio], dimensao)
+    no.direita = _montar(itens[meio + 1:], dimensao)
+    return no
+
+
+class ArvoreKD(object):
+    """Índice espacial de pontos com um valor associado a cada um."""
+
+    def __init__(self, pontos, valores):
+        itens = [(tuple(float(c) for c in p), v) for p, v in zip(pontos, valores)]
+        self.dimensao = len(itens[0][0]) if itens else 0
+        self.tamanho = len(itens)
+        self._raiz = _montar(itens, self.dimensao)
+
+    def __len__(self):
+        return self.tamanho
+
+    def mais_proximo(self, ponto, aceitar=None, distancia_maxima=None):
+        """Valor aceito mais próximo do ponto e a sua distância.
+
+        aceitar(valor), se informado, descarta os valores incompatíveis.
+        Retorna (valor, distancia) ou None se nenhum valor for aceito dentro
+        da distância máxima.
+        """
+        if self._raiz is None:
+            return None
+        ponto = tuple(float(c) for c in ponto)
+        melhor = [None, float('inf') if distancia_maxima is None else distancia_maxima ** 2]
+
+        # Pilha de (nó, distância² mínima até a região do nó)
+        pilha = [(self._raiz, 0.0)]
+        while pilha:
+            no, minimo = pilha.pop()
+            if no is None or minimo > melhor[1]:
+                continue
+            d2 = _distancia2(ponto, no.ponto)
+            if d2 <= melhor[1] and (aceitar is None or aceitar(no.valor)):
+                melhor[0] = no
+                melhor[1] = d2
+            diferenca = ponto[no.eixo] - no.ponto[no.eixo]
+            perto, longe = (no.esquerda, no.direita) if diferenca < 0 else (no.direita, no.esquerda)
+            # O lado distante entra primeiro na pilha: o próximo é visitado antes
+            pilha.append((longe, max(minimo, diferenca * diferenca)))
+            pilha.append((perto, minimo))
+
+        if melhor[0] is None:
+            return None
+        return melhor[0].valor, melhor[1] ** 0.5
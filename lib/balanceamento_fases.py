@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""Balanceamento das cargas monofásicas entre as fases de um painel.
+
+A distribuição é um particionamento em três partes: primeiro a heurística
+LPT (maior carga primeiro, sempre na fase menos carregada), depois uma busca
+local que, entre duas fases, move uma carga ou troca duas cargas de lugar
+sempre que a diferença entre elas diminui. A melhor troca é encontrada por
+busca binária nas cargas ordenadas da fase mais carregada, então cada passo
+custa O(n log n).
+
+Circuitos de dois ou três polos não são movidos: as suas cargas entram como
+carga fixa (base) de cada fase. O número de posições (slots) disponíveis em
+cada fase limita quantos circuitos ela pode receber.
+
+planejar_movimentos converte as fases escolhidas em uma sequência de
+mudanças de slot que só usa posições livres. Sem posições livres suficientes
+parte das mudanças fica pendente; resultado_alcancavel recalcula então as
+fases e os totais que os movimentos planejados realmente produzem.
+
+Este módulo não depende do Revit.
+"""
+from bisect import bisect_left
+from collections import namedtuple
+
+
+# Nomes das fases, na ordem dos índices
+FASES = ('A', 'B', 'C')
+
+# Diferença mínima (VA) considerada uma melhora
+TOLERANCIA = 1e-6
+
+# Resultado: fase (0 a 2) de cada carga, total por fase e desequilíbrio
+ResultadoBalanceamento = namedtuple(
+    'ResultadoBalanceamento', ['fases', 'totais', 'desequilibrio']
+)
+
+
+def desequilibrio(totais):
+    """Desequilíbrio entre as fases: (maior - menor) / maior."""
+    maior = max(totais)
+    if maior <= 0:
+        return 0.0
+    return (maior - min(totais)) / float(maior)
+
+
+def totais_por_fase(cargas, fases, base=(0.0, 0.0, 0.0)):
+    """Carga total de cada fase, somando a base fixa."""
+    totais = list(base)
+    for carga, fase in zip(cargas, fases):
+        totais[fase] += carga
+    return totais
+
+
+def melhora(totais, totais_atuais):
+    """Verifica se os totais reduzem a diferença entre as fases e o desequilíbrio.
+
+    Uma diferença menor com uma fase mais carregada menor pode ter um
+    desequilíbrio maior; só as distribuições que melhoram as duas medidas
+    substituem a atual.
+    """
+    amplitude = max(totais) - min(totais)
+    amplitude_atual = max(totais_atuais) - min(totais_atuais)
+    return (amplitude < amplitude_atual - TOLERANCIA
+            and desequilibrio(totais) < desequilibrio(totais_atuais))
+
+
+def _distribuir_lpt(cargas, base, capacidades):
+    """Maior carga primeiro, sempre na fase menos carregada com vaga."""
+    fases = [None] * len(cargas)
+    totais = list(base)
+    contagem = [0] * len(base)
+    for i in sorted(range(len(cargas)), key=lambda i: -cargas[i]):
+        candidatas = [
+            f for f in range(len(totais))
+            if capacidades is None or contagem[f] < capacidades[f]
+        ]
+        if not candidatas:
+            raise ValueError("Não há posições suficientes no painel para todas as cargas.")
+        fase = min(candidatas, key=lambda f: (totais[f], f))
+        fases[i] = fase
+        totais[fase] += cargas[i]
+        contagem[fase] += 1
+    return fases, totais, contagem
+
+
+def _melhor_passo(cargas, membros_alta, membros_baixa, diferenca, pode_mover):
+    """Melhor movimento ou troca entre uma fase alta e uma baixa.
+
+    Retorna (ganho, i, j) em que i sai da fase alta e j (ou None) sai da
+    baixa; o ganho é a redução da diferença entre as duas fases.
+    """
+    alvo = diferenca / 2.0
+    melhor = None
+
+    # Cargas da fase alta em ordem crescente, para a busca binária
+    ordenados = sorted(membros_alta, key=cargas.__getitem__)
+    valores = [cargas[i] for i in ordenados]
+
+    # Mover i sozinho (referência 0) ou trocar i por j (referência carga de j)
+    opcoes = [(cargas[j], j) for j in membros_baixa]
+    if pode_mover:
+        opcoes.append((0.0, None))
+    for referencia, j in opcoes:
+        posicao = bisect_left(valores, referencia + alvo)
+        for k in (posicao - 1, posicao):
+            if not 0 <= k < len(valores):
+                continue
+            # Passar delta de uma fase para a outra: nova diferença |d - 2·delta|
+            delta = valores[k] - referencia
+            if delta <= TOLERANCIA or delta >= diferenca - TOLERANCIA:
+                continue
+            ganho = diferenca - abs(diferenca - 2.0 * delta)
+            if melhor is None or ganho > melhor[0] + TOLERANCIA:
+                melhor = (ganho, ordenados[k], j)
+    return melhor
+
+
+def balancear(cargas, base=(0.0, 0.0, 0.0), capacidades=None, atuais=None,
+              max_iteracoes=None):
+    """Escolhe a fase de cada carga monofásica minimizando o desequilíbrio.
+
+    base é a carga fixa de cada fase (circuitos de vários polos) e
+    capacidades, se informado, o número máximo de cargas em cada fase.
+    Se atuais (a fase atual de cada carga) for informado, a distribuição
+    atual é mantida a menos que a encontrada a melhore (ver melhora).
+    Retorna um ResultadoBalanceamento.
+    """
+    cargas = [float(c) for c in cargas]
+    base = [float(b) for b in base]
+    fases, totais, contagem = _distribuir_lpt(cargas, base, capacidades)
+
+    membros = [set() for _ in base]
+    for i, fase in enumerate(fases):
+        membros[fase].add(i)
+
+    limite = max_iteracoes if max_iteracoes is not None else 10 * len(cargas) + 10
+    for _ in range(limite):
+        ordem = sorted(range(len(base)), key=lambda f: totais[f])
+        baixa, media, alta = ordem[0], ordem[1], ordem[-1]
+        passo = None
+        # Primeiro o par de maior diferença; depois os pares com a fase média
+        for f_alta, f_baixa in ((alta, baixa), (alta, media), (media, baixa)):
+            diferenca = totais[f_alta] - totais[f_baixa]
+            if diferenca <= TOLERANCIA:
+                continue
+            pode_mover = capacidades is None or contagem[f_baixa] < capacidades[f_baixa]
+            passo = _melhor_passo(cargas, membros[f_alta], membros[f_baixa], diferenca, pode_mover)
+            if passo is not None:
+                break
+        if passo is None:
+            break
+
+        _, i, j = passo
+        membros[f_alta].remove(i)
+        membros[f_baixa].add(i)
+        fases[i] = f_baixa
+        totais[f_alta] -= cargas[i]
+        totais[f_baixa] += cargas[i]
+        if j is None:
+            contagem[f_alta] -= 1
+            contagem[f_baixa] += 1
+        else:
+            membros[f_baixa].remove(j)
+            membros[f_alta].add(j)
+            fases[j] = f_alta
+            totais[f_baixa] -= cargas[j]
+            totais[f_alta] += cargas[j]
+
+    if atuais is not None and None not in atuais:
+        totais_atuais = totais_por_fase(cargas, atuais, base)
+        if not melhora(totais, totais_atuais):
+            return ResultadoBalanceamento(list(atuais), totais_atuais, desequilibrio(totais_atuais))
+
+    return ResultadoBalanceamento(fases, totais, desequilibrio(totais))
+
+
+def planejar_movimentos(slots, alvos, fase_do_slot, livres):
+    """Sequência de mudanças de slot que leva cada circuito à fase alvo.
+
+    slots é o slot atual de cada circuito, alvos a fase desejada,
+    fase_do_slot um dicionário slot -> fase e livres os slots vazios.
+    Cada circuito vai para um slot livre da fase alvo, liberando o seu; se
+    os circuitos restantes formarem um ciclo, um deles passa
+    temporariamente por um slot livre de outra fase.
+    Retorna a lista de movimentos (circuito, slot de origem, slot de destino)
+    e a lista dos circuitos que não puderam ser movidos.
+    """
+    slots = list(slots)
+    livres_por_fase = {}
+    for slot in livres:
+        livres_por_fase.setdefault(fase_do_slot[slot], []).append(slot)
+    for lista in livres_por_fase.values():
+        lista.sort(reverse=True)
+
+    def liberar(slot):
+        lista = livres_por_fase.setdefault(fase_do_slot[slot], [])
+        lista.append(slot)
+        lista.sort(reverse=True)
+
+    movimentos = []
+    pendentes = [i for i, alvo in enumerate(alvos) if fase_do_slot[slots[i]] != alvo]
+    desvios = 0
+    while pendentes:
+        restantes = []
+        for i in pendentes:
+            lista = livres_por_fase.get(alvos[i])
+            if lista:
+                destino = lista.pop()
+                movimentos.append((i, slots[i], destino))
+                liberar(slots[i])
+                slots[i] = destino
+            else:
+                restantes.append(i)
+        if len(restantes) < len(pendentes):
+            pendentes = restantes
+            continue
+
+        # Ciclo: desviar um circuito por um slot livre de uma terceira fase
+        if desvios >= len(alvos):
+            break
+        desvio = None
+        for i in pendentes:
+            atual = fase_do_slot[slots[i]]
+            for fase, lista in livres_por_fase.items():
+                if lista and fase not in (atual, alvos[i]):
+                    desvio = (i, lista)
+                    break
+            if desvio:
+                break
+        if desvio is None:
+            break
+        i, lista = desvio
+        destino = lista.pop()
+        movimentos.append((i, slots[i], destino))
+        liberar(slots[i])
+        slots[i] = destino
+        desvios += 1
+
+    return movimentos, pendentes
+
+
+def fases_apos_movimentos(slots, movimentos, fase_do_slot):
+    """Fase de cada circuito depois de aplicar os movimentos planejados."""
+    slots = list(slots)
+    for i, _, destino in movimentos:
+        slots[i] = destino
+    return [fase_do_slot[slot] for slot in slots]
+
+
+def resultado_alcancavel(cargas, slots, movimentos, fase_do_slot, base=(0.0, 0.0, 0.0)):
+    """ResultadoBalanceamento que os movimentos planejados produzem de fato."""
+    fases = fases_apos_movimentos(slots, movimentos, fase_do_slot)
+    totais = totais_por_fase(cargas, fases, base)
+    return ResultadoBalanceamento(fases, totais, desequilibrio(totais))
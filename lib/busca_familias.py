@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""Índice de busca incremental para o seletor de famílias.
+
+Os nomes são normalizados (minúsculas, sem acentos) e quebrados em palavras.
+As palavras distintas ficam em uma lista ordenada, de modo que todas as
+palavras que começam com um prefixo formam uma faixa contínua encontrada por
+busca binária. Cada palavra aponta para a lista (ordenada) das entradas que a
+contêm. Quando o usuário continua digitando a mesma consulta, o resultado
+anterior é apenas refinado, sem voltar ao índice.
+
+As palavras da consulta são intersectadas em ordem, saltando (busca binária)
+nas listas de entradas: cada palavra avança até a maior entrada candidata
+das outras, e só as entradas comuns a todas são geradas. A faixa de menos
+entradas é sempre uma das intersectadas; palavras cuja faixa cobre muitas
+palavras curtas são apenas conferidas nas entradas encontradas (uma busca
+de subtexto). Se a seletividade estimada da consulta indicar que percorrer
+as entradas na ordem de exibição enche a página antes, a busca percorre as
+entradas diretamente. Em ambos os casos a busca para assim que a página
+visível está cheia.
+
+Este módulo não depende do Revit e pode ser usado fora dele.
+"""
+import re
+from bisect import bisect_left
+from itertools import islice
+
+try:
+    import unicodedata
+except ImportError:
+    unicodedata = None
+
+
+# Acentos mais comuns, usados quando unicodedata não está disponível
+_SEM_ACENTO = dict(zip(
+    u'áàâãäéèêëíìîïóòôõöúùûüçñ',
+    u'aaaaaeeeeiiiiooooouuuucn'
+))
+
+_SEPARADORES = re.compile(r'[^0-9a-z]+')
+
+# Último caractere possível, usado para fechar a faixa de um prefixo
+_FIM = u'\uffff'
+
+# Separador das palavras no texto de cada entrada (não aparece nas palavras)
+_SEP = u'\x00'
+
+# Máximo de listas de uma faixa percorridas por saltos; acima disso a faixa
+# é unida de uma vez (se for a menor da consulta) ou apenas conferida
+MAX_INTERCALADAS = 32
+
+
+
+def normalizar(texto):
+    """Converte o texto para minúsculas e remove os acentos."""
+    texto = texto.lower()
+    if unicodedata is not None:
+        decomposto = unicodedata.normalize('NFKD', texto)
+        return u''.join(c for c in decomposto if not unicodedata.combining(c))
+    return u''.join(_SEM_ACENTO.get(c, c) for c in texto)
+
+
+def tokenizar(texto):
+    """Quebra o texto normalizado em palavras."""
+    return [t for t in _SEPARADORES.split(normalizar(texto)) if t]
+
+
+class IndiceBusca(object):
+    """Índice de prefixos sobre uma lista de nomes.
+
+    A ordem da lista recebida é a ordem de exibição (normalmente alfabética);
+    os nomes usados recentemente sempre aparecem primeiro nos resultados.
+    """
+
+    def __init__(self, nomes, recentes=None, max_recentes=20):
+        self.nomes = list(nomes)
+        self._posicao = dict((nome, i) for i, nome in enumerate(self.nomes))
+        # Texto de cada entrada: as palavras, cada uma precedida pelo separador
+        self._texto_entrada = []
+
+        postings = {}
+        for i, nome in enumerate(self.nomes):
+            tokens = sorted(set(tokenizar(nome)))
+            self._texto_entrada.append(u''.join(_SEP + t for t in tokens))
+            for token in tokens:
+                postings.setdefault(token, []).append(i)
+
+        # Palavras ordenadas, suas entradas e o total acumulado de entradas
+        self._tokens = sorted(postings)
+        self._postings = [postings[t] for t in self._tokens]
+        self._acumulado = [0]
+        for lista in self._postings:
+            self._acumulado.append(self._acumulado[-1] + len(lista))
+
+        self._ultima_consulta = None
+        self._ultimo_resultado = None
+
+        self.max_recentes = max_recentes
+        self._recentes = []
+        for nome in recentes or []:
+            if nome in self._posicao and len(self._recentes) < max_recentes:
+                self._recentes.append(self._posicao[nome])
+
+    def __len__(self):
+        return len(self.nomes)
+
+    @property
+    def recentes(self):
+        """Nomes usados recentemente, do mais recente para o mais antigo."""
+        return [self.nomes[i] for i in self._recentes]
+
+    def registrar_uso(self, nome):
+        """Move o nome para o topo da lista de usados recentemente."""
+        i = self._posicao.get(nome)
+        if i is None:
+            return
+        if i in self._recentes:
+            self._recentes.remove(i)
+        self._recentes.insert(0, i)
+        del self._recentes[self.max_recentes:]
+
+    def _faixa(self, prefixo):
+        """Retorna a faixa de palavras que começam com o prefixo."""
+        inicio = bisect_left(self._tokens, prefixo)
+        fim = bisect_left(self._tokens, prefixo + _FIM, inicio)
+        return inicio, fim
+
+    def _cursor(self, inicio, fim):
+        """Cursor sobre as entradas das palavras da faixa."""
+        if fim - inicio > MAX_INTERCALADAS:
+            unidas = set()
+            for lista in self._postings[inicio:fim]:
+                unidas.update(lista)
+            return _Cursor([sorted(unidas)])
+        return _Cursor(self._postings[inicio:fim])
+
+    def _intersecao(self, cursores, restantes):
+        """Gera, em ordem, as entradas comuns a todos os cursores e às palavras restantes."""
+        atual = 0
+        while True:
+            alterada = False
+            for cursor in cursores:
+                proxima = cursor.proxima(atual)
+                if proxima is None:
+                    return
+                if proxima != atual:
+                    atual = proxima
+                    alterada = True
+            if not alterada:
+                if not restantes or self._corresponde(atual, restantes):
+                    yield atual
+                atual += 1
+
+    def _corresponde(self, i, consulta):
+        """Verifica se todas as palavras da consulta são prefixos de palavras da entrada."""
+        texto = self._texto_entrada[i]
+        for q in consulta:
+            if _SEP + q not in texto:
+                return False
+        return True
+
+    def _faixas(self, consulta):
+        """(entradas, início, fim, prefixo) de cada palavra da consulta, da menor para a maior."""
+        faixas = []
+        for q in consulta:
+            inicio, fim = self._faixa(q)
+            faixas.append((self._acumulado[fim] - self._acumulado[inicio], inicio, fim, q))
+        faixas.sort()
+        return faixas
+
+    def _correspondencias(self, consulta, limite=None):
+        """Gera, em ordem, as entradas que correspondem à consulta.
+
+        A busca parte da fonte menor: a palavra mais seletiva da consulta ou o
+        resultado anterior, quando a consulta apenas o refina. O gerador pode
+        ser interrompido ao atingir o limite; se for percorrido até o fim, o
+        resultado fica guardado para refinar a próxima tecla.
+        """
+        faixas = self._faixas(consulta)
+        tamanho, inicio, fim, mais_seletiva = faixas[0]
+        total = len(self.nomes)
+
+        # Entradas lidas até encher a página (seletividades independentes)
+        if limite is None or not tamanho:
+            necessarias = total
+        else:
+            seletividade = 1.0
+            for entradas, _, _, _ in faixas:
+                seletividade *= entradas / float(total)
+            necessarias = limite / seletividade
+        custo_direto = min(total, necessarias)
+        montagem = fim - inicio if fim - inicio <= MAX_INTERCALADAS else tamanho
+        custo_faixa = montagem + min(tamanho, necessarias * tamanho / float(total))
+
+        anterior = self._ultima_consulta
+        if (anterior is not None and _refina(consulta, anterior)
+                and len(self._ultimo_resultado) <= tamanho):
+            base = self._ultimo_resultado
+            restantes = consulta
+        elif custo_direto < custo_faixa:
+            base = range(total)
+            restantes = consulta
+        else:
+            # A menor faixa e as demais faixas estreitas são percorridas por saltos
+            cursores = [self._cursor(inicio, fim)]
+            restantes = []
+            for _, outro_inicio, outro_fim, q in faixas[1:]:
+                if outro_fim - outro_inicio <= MAX_INTERCALADAS:
+                    cursores.append(self._cursor(outro_inicio, outro_fim))
+                else:
+                    restantes.append(q)
+            base = self._intersecao(cursores, restantes)
+            restantes = []
+
+        encontrados = []
+        for i in base:
+            if not restantes or self._corresponde(i, restantes):
+                encontrados.append(i)
+                yield i
+
+        self._ultima_consulta = consulta
+        self._ultimo_resultado = encontrados
+
+    def buscar_indices(self, texto, limite=None):
+        """Retorna os índices das entradas que correspondem ao texto digitado.
+
+        Os usados recentemente vêm primeiro; com limite, a busca para assim
+        que encontra entradas suficientes.
+        """
+        consulta = tokenizar(texto)
+        if consulta:
+            correspondencias = self._correspondencias(consulta, limite)
+            recentes = [i for i in self._recentes if self._corresponde(i, consulta)]
+        else:
+            correspondencias = iter(range(len(self.nomes)))
+            recentes = list(self._recentes)
+
+        if limite is not None:
+            recentes = recentes[:limite]
+            faltam = limite - len(recentes)
+        else:
+            faltam = None
+
+        vistos = set(recentes)
+        demais = islice((i for i in correspondencias if i not in vistos), faltam)
+        return recentes + list(demais)
+
+    def buscar(self, texto, limite=None):
+        """Retorna os nomes que correspondem ao texto digitado."""
+        return [self.nomes[i] for i in self.buscar_indices(texto, limite)]
+
+
+def _refina(consulta, anterior):
+    """Verifica se a consulta apenas estende a consulta anterior."""
+    if len(consulta) < len(anterior):
+        return False
+    for q, a in zip(consulta, anterior):
+        if not q.startswith(a):
+            return False
+    return True
+
+
+class _Cursor(object):
+    """Posição em um conjunto de listas ordenadas de entradas (avança apenas)."""
+
+    __slots__ = ('listas', 'posicoes')
+
+    def __init__(self, listas):
+        self.listas = listas
+        self.posicoes = [0] * len(listas)
+
+    def proxima(self, entrada):
+        """Menor entrada das listas maior ou igual à informada, ou None."""
+        menor = None
+        posicoes = self.posicoes
+        for k, lista in enumerate(self.listas):
+            p = bisect_left(lista, entrada, posicoes[k])
+            posicoes[k] = p
+            if p < len(lista) and (menor is None or lista[p] < menor):
+                menor = lista[p]
+        return menor
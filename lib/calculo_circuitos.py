@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Dimensionamento dos condutores dos circuitos do modelo.
+
+Cada circuito é lido uma única vez (carga aparente, tensão, polos e
+comprimento) e dimensionado por uma TabelaCondutores montada antes do laço
+(ver dimensionamento_condutores). Os resultados (corrente de projeto, seção
+e queda de tensão) são gravados nos parâmetros do circuito em lotes de
+transações (ver executor_transacoes), resolvidos uma única vez pelo
+ResolvedorParametros.
+
+O comprimento é, de preferência, a rota pelas paredes do painel até o
+elemento mais distante (ver rotas_paredes); depois, o calculado pelo Revit
+para o circuito conectado a um painel; sem nenhum dos dois, é estimado pela
+distância ortogonal do painel até o elemento mais distante do circuito.
+"""
+from collections import namedtuple
+
+from Autodesk.Revit.DB import FilteredElementCollector
+from Autodesk.Revit.DB.Electrical import ElectricalSystem, ElectricalSystemType
+
+import dimensionamento_condutores
+import executor_transacoes
+import parametros_familia
+import unidades_revit
+
+
+# Dados de um circuito para o dimensionamento: carga (VA), tensão (V),
+# polos e comprimento (m)
+DadosCircuito = namedtuple('DadosCircuito', ['carga', 'tensao', 'polos', 'comprimento'])
+
+
+def _ponto(elemento):
+    """Ponto de inserção do elemento, ou None."""
+    return getattr(elemento.Location, 'Point', None)
+
+
+def _comprimento_estimado(circuito):
+    """Distância ortogonal (pés) do painel ao elemento mais distante do circuito."""
+    painel = circuito.BaseEquipment
+    origem = _ponto(painel) if painel is not None else None
+    if origem is None:
+        return 0.0
+    distancias = [
+        abs(p.X - origem.X) + abs(p.Y - origem.Y) + abs(p.Z - origem.Z)
+        for p in (_ponto(elemento) for elemento in circuito.Elements)
+        if p is not None
+    ]
+    return max(distancias) if distancias else 0.0
+
+
+def dados_circuito(circuito, rotas=None):
+    """Lê os dados de um circuito para o dimensionamento.
+
+    rotas, se informado, é um RotasParedes usado para medir o comprimento.
+    """
+    comprimento = rotas.comprimento_circuito(circuito) if rotas is not None else None
+    if comprimento is None:
+        comprimento = circuito.Length or _comprimento_estimado(circuito)
+    return DadosCircuito(
+        carga=unidades_revit.de_internas(circuito.ApparentLoad, 'VoltAmperes'),
+        tensao=unidades_revit.de_internas(circuito.Voltage, 'Volts'),
+        polos=circuito.PolesNumber,
+        comprimento=unidades_revit.de_internas(comprimento, 'Meters'),
+    )
+
+
+def circuitos_de_forca(doc):
+    """Todos os circuitos de força do documento."""
+    return [
+        circuito for circuito in FilteredElementCollector(doc).OfClass(ElectricalSystem)
+        if circuito.SystemType == ElectricalSystemType.PowerCircuit
+    ]
+
+
+def dimensionar_circuitos(doc, circuitos, tabela=None, rotas=None):
+    """Dimensiona os circuitos e grava os resultados em lotes.
+
+    Retorna a lista de (circuito, DadosCircuito, Dimensionamento), o número
+    de circuitos que receberam os resultados e os relatórios dos lotes.
+    """
+    tabela = tabela or dimensionamento_condutores.TabelaCondutores()
+    resultados = []
+    for circuito in circuitos:
+        dados = dados_circuito(circuito, rotas)
+        resultados.append((circuito, dados, tabela.dimensionar(*dados)))
+
+    resolvedor = parametros_familia.ResolvedorParametros()
+
+    def gravar_lote(lote, erros):
+        gravados = []
+        for circuito, _, dimensionamento in lote:
+            if dimensionamento.secao is None:
+                continue
+            valores = (
+                ('corrente_projeto', dimensionamento.corrente),
+                ('secao_condutor', float(dimensionamento.secao)),
+                ('queda_tensao', dimensionamento.queda),
+            )
+            # Avaliar todos os valores (sem parar no primeiro que falhar)
+            if any([resolvedor.definir(circuito, chave, valor) for chave, valor in valores]):
+                gravados.append(circuito.Id)
+        return gravados
+
+    gravados, relatorios = executor_transacoes.executar_em_lotes(
+        doc, "Dimensionar Condutores", resultados, gravar_lote
+    )
+    return resultados, len(gravados), relatorios
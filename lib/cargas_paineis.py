@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""Cargas por circuito e por painel, atualizadas por um IUpdater.
+
+O AgregadoCargas (ver agregado_cargas) de cada documento é montado na
+primeira leitura, com uma única passada pelos circuitos e pelos seus
+elementos, e fica guardado no AppDomain do pyRevit. Depois disso, o
+atualizador (registrado na mesma primeira leitura) aplica apenas as
+diferenças dos elementos e circuitos adicionados, removidos ou alterados em
+cada transação; qualquer botão lê os totais em O(1).
+
+O atualizador só é acionado pela adição ou remoção de circuitos e elementos
+e pela mudança dos parâmetros de carga e de circuito/painel (ver
+registrar_atualizador); a edição de qualquer outro parâmetro não o executa.
+
+Desfazer e refazer não disparam atualizadores: nesses casos (e em grupos de
+transações desfeitos) o evento DocumentChanged descarta o agregado, que é
+montado de novo na próxima leitura.
+"""
+from System import Guid
+
+from Autodesk.Revit.DB import (
+    BuiltInCategory,
+    BuiltInParameter,
+    ChangePriority,
+    Element,
+    ElementClassFilter,
+    ElementId,
+    ElementMulticategoryFilter,
+    FilteredElementCollector,
+    SharedParameterElement,
+    IUpdater,
+    UpdaterId,
+    UpdaterRegistry,
+)
+from Autodesk.Revit.DB.Events import UndoOperation
+from Autodesk.Revit.DB.Electrical import ElectricalSystem
+from System.Collections.Generic import List
+
+from pyrevit import HOST_APP
+from pyrevit.coreutils import envvars, logger
+
+from agregado_cargas import AgregadoCargas
+from catalogo_familias import chave_documento
+import parametros_familia
+import unidades_revit
+
+
+mlogger = logger.get_logger(__name__)
+
+# Chaves usadas para guardar o estado no AppDomain do pyRevit
+CHAVE_AGREGADOS = 'TOMADAS_AGREGADOS_CARGAS'
+CHAVE_ATUALIZADOR = 'TOMADAS_ATUALIZADOR_CARGAS'
+CHAVE_GATILHOS = 'TOMADAS_GATILHOS_CARGAS'
+
+# Identificador fixo do atualizador (o mesmo em todas as sessões)
+GUID_ATUALIZADOR = '5d0f7a2e-3c41-4e8b-9a57-1f6b2c8d4e90'
+
+# Categorias dos elementos que declaram a potência aparente
+CATEGORIAS_CARGA = (
+    BuiltInCategory.OST_ElectricalFixtures,
+    BuiltInCategory.OST_LightingFixtures,
+    BuiltInCategory.OST_LightingDevices,
+)
+
+# Parâmetros dos circuitos que alteram as cargas ou o painel
+PARAMETROS_CIRCUITO = (
+    BuiltInParameter.RBS_ELEC_APPARENT_LOAD,
+    BuiltInParameter.RBS_ELEC_CIRCUIT_PANEL_PARAM,
+)
+
+# Parâmetros dos elementos que indicam a troca de circuito ou de painel
+PARAMETROS_ELEMENTO = (
+    BuiltInParameter.RBS_ELEC_CIRCUIT_NUMBER,
+    BuiltInParameter.RBS_ELEC_CIRCUIT_PANEL_PARAM,
+)
+
+
+def _agregados():
+    """Dicionário documento -> AgregadoCargas guardado no AppDomain."""
+    agregados = envvars.get_pyrevit_env_var(CHAVE_AGREGADOS)
+    if agregados is None:
+        agregados = {}
+        envvars.set_pyrevit_env_var(CHAVE_AGREGADOS, agregados)
+    return agregados
+
+
+def invalidar(doc):
+    """Descarta o agregado do documento (montado de novo na próxima leitura)."""
+    _agregados().pop(chave_documento(doc), None)
+
+
+class LeitorCargas(object):
+    """Lê as cargas dos elementos e dos circuitos para o agregado."""
+
+    def __init__(self):
+        self.resolvedor = parametros_familia.ResolvedorParametros()
+
+    def carga_elemento(self, elemento):
+        """Potência aparente declarada pelo elemento (VA), ou None."""
+        return self.resolvedor.ler(elemento, 'potencia_aparente')
+
+    def atualizar_circuito(self, agregado, circuito):
+        """Lê o painel, os elementos (e as suas cargas) e a carga calculada de um circuito."""
+        elementos = []
+        for elemento in circuito.Elements:
+            chave = elemento.Id.IntegerValue
+            agregado.definir_elemento(chave, self.carga_elemento(elemento))
+            elementos.append(chave)
+        painel = circuito.BaseEquipment
+        parametro = circuito.get_Parameter(BuiltInParameter.RBS_ELEC_APPARENT_LOAD)
+        propria = 0.0
+        if parametro is not None and parametro.HasValue:
+            propria = unidades_revit.de_internas(parametro.AsDouble(), 'VoltAmperes')
+        agregado.definir_circuito(
+            circuito.Id.IntegerValue,
+            painel.Id.IntegerValue if painel is not None else None,
+            elementos,
+            propria,
+        )
+
+
+def _montar_agregado(doc):
+    """Monta o agregado com uma única passada pelos circuitos."""
+    agregado = AgregadoCargas()
+    leitor = LeitorCargas()
+    for circuito in FilteredElementCollector(doc).OfClass(ElectricalSystem):
+        try:
+            leitor.atualizar_circuito(agregado, circuito)
+        except Exception as erro:
+            mlogger.debug('Circuito ignorado no agregado de cargas: %s', erro)
+    return agregado
+
+
+def obter_agregado(doc):
+    """Retorna o agregado de cargas do documento, montando-o se necessário."""
+    registrar_atualizador()
+    chave = chave_documento(doc)
+    agregado = _agregados().get(chave)
+    if agregado is None:
+        _adicionar_gatilhos_documento(doc)
+        agregado = _montar_agregado(doc)
+        _agregados()[chave] = agregado
+    return agregado
+
+
+def carga_painel(doc, painel_id):
+    """Carga atual (VA) do painel (id inteiro)."""
+    return obter_agregado(doc).painel(painel_id)
+
+
+def carga_circuito(doc, circuito_id):
+    """Carga atual (VA) do circuito (id inteiro)."""
+    return obter_agregado(doc).circuito(circuito_id)
+
+
+def _filtro_elementos():
+    """Filtro dos elementos que declaram a potência aparente."""
+    return ElementMulticategoryFilter(List[BuiltInCategory](CATEGORIAS_CARGA))
+
+
+class AtualizadorCargas(IUpdater):
+    """Aplica ao agregado as diferenças de cada transação."""
+
+    def __init__(self, addin_id):
+        self._id = UpdaterId(addin_id, Guid(GUID_ATUALIZADOR))
+
+    def GetUpdaterId(self):
+        return self._id
+
+    def GetUpdaterName(self):
+        return "Cargas dos Painéis"
+
+    def GetAdditionalInformation(self):
+        return "Mantém os totais de carga por circuito e por painel."
+
+    def GetChangePriority(self):
+        return ChangePriority.MEPSystems
+
+    def Execute(self, dados):
+        doc = dados.GetDocument()
+        agregado = _agregados().get(chave_documento(doc))
+        if agregado is None:
+            # Ainda não foi lido: será montado na primeira leitura
+            return
+        try:
+            for elem_id in dados.GetDeletedElementIds():
+                agregado.remover(elem_id.IntegerValue)
+
+            leitor = LeitorCargas()
+            circuitos = []
+            for elem_id in list(dados.GetAddedElementIds()) + list(dados.GetModifiedElementIds()):
+                elemento = doc.GetElement(elem_id)
+                if elemento is None:
+                    continue
+                if isinstance(elemento, ElectricalSystem):
+                    circuitos.append(elemento)
+                else:
+                    agregado.definir_elemento(elem_id.IntegerValue, leitor.carga_elemento(elemento))
+            # Circuitos depois dos elementos, já com as cargas atualizadas
+            for circuito in circuitos:
+                leitor.atualizar_circuito(agregado, circuito)
+        except Exception as erro:
+            # Na dúvida, montar de novo na próxima leitura
+            mlogger.debug('Falha ao atualizar o agregado de cargas: %s', erro)
+            invalidar(doc)
+
+
+def _ao_alterar_documento(sender, args):
+    """Descarta o agregado quando o documento muda sem passar pelo atualizador."""
+    try:
+        if args.Operation != UndoOperation.TransactionCommitted:
+            invalidar(args.GetDocument())
+    except Exception:
+        # Um erro aqui não pode interromper a edição do modelo
+        pass
+
+
+def _ao_fechar_documento(sender, args):
+    """Esquece o documento fechado (o Revit remove os gatilhos dele)."""
+    try:
+        doc = args.Document
+        invalidar(doc)
+        parametros_familia.invalidar(doc)
+        _documentos_com_gatilhos().discard(chave_documento(doc))
+    except Exception:
+        pass
+
+
+def _documentos_com_gatilhos():
+    """Conjunto dos documentos que já têm os gatilhos dos parâmetros compartilhados."""
+    documentos = envvars.get_pyrevit_env_var(CHAVE_GATILHOS)
+    if documentos is None:
+        documentos = set()
+        envvars.set_pyrevit_env_var(CHAVE_GATILHOS, documentos)
+    return documentos
+
+
+def _mudanca_parametro(bip):
+    return Element.GetChangeTypeParameter(ElementId(bip))
+
+
+def _adicionar_gatilhos_documento(doc):
+    """Gatilhos da potência aparente declarada, se for parâmetro compartilhado.
+
+    Os parâmetros compartilhados só têm id dentro de cada documento; os de
+    família não têm id e são cobertos pela carga recalculada do circuito.
+    """
+    chave = chave_documento(doc)
+    documentos = _documentos_com_gatilhos()
+    if chave in documentos:
+        return
+    updater_id = UpdaterId(HOST_APP.addin_id, Guid(GUID_ATUALIZADOR))
+    nomes = set(parametros_familia.PARAMETROS_PADRAO['potencia_aparente'])
+    for compartilhado in FilteredElementCollector(doc).OfClass(SharedParameterElement):
+        if compartilhado.Name in nomes:
+            UpdaterRegistry.AddTrigger(
+                updater_id, doc, _filtro_elementos(),
+                Element.GetChangeTypeParameter(compartilhado.Id))
+    documentos.add(chave)
+
+
+def registrar_atualizador():
+    """Registra o atualizador e os seus gatilhos uma única vez por sessão do Revit."""
+    if envvars.get_pyrevit_env_var(CHAVE_ATUALIZADOR):
+        return
+    atualizador = AtualizadorCargas(HOST_APP.addin_id)
+    updater_id = atualizador.GetUpdaterId()
+    # Um registro anterior (outra carga do pyRevit) aponta para código antigo
+    if UpdaterRegistry.IsUpdaterRegistered(updater_id):
+        UpdaterRegistry.UnregisterUpdater(updater_id)
+    # Opcional: modelos abertos sem a extensão não mostram avisos
+    UpdaterRegistry.RegisterUpdater(atualizador, True)
+
+    adicao = Element.GetChangeTypeElementAddition()
+    remocao = Element.GetChangeTypeElementDeletion()
+    gatilhos = (
+        (ElementClassFilter(ElectricalSystem),
+         [adicao, remocao] + [_mudanca_parametro(bip) for bip in PARAMETROS_CIRCUITO]),
+        (_filtro_elementos(),
+         [adicao, remocao] + [_mudanca_parametro(bip) for bip in PARAMETROS_ELEMENTO]),
+    )
+    for filtro, mudancas in gatilhos:
+        for mudanca in mudancas:
+            UpdaterRegistry.AddTrigger(updater_id, filtro, mudanca)
+
+    HOST_APP.app.DocumentChanged += _ao_alterar_documento
+    HOST_APP.app.DocumentClosing += _ao_fechar_documento
+    envvars.set_pyrevit_env_var(CHAVE_ATUALIZADOR, True)
@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+"""Catálogo de símbolos de família compartilhado pelos botões de tomadas.
+
+O catálogo é montado uma única vez por documento e fica guardado no AppDomain
+do pyRevit, de modo que todos os botões (e as execuções seguintes) reaproveitam
+o mesmo resultado. O evento DocumentChanged invalida o catálogo apenas quando
+símbolos de família são adicionados, removidos ou renomeados.
+
+O filtro por palavras-chave ("tomada", "outlet", ...) é feito pelo próprio
+coletor do Revit, de modo que apenas os símbolos encontrados chegam ao Python.
+Várias categorias são coletadas em uma única passada pelo modelo.
+
+Além do cache em memória, o catálogo é gravado em disco (um arquivo por
+modelo) junto com a versão do documento; ao abrir o modelo novamente, o
+catálogo é lido do arquivo se a versão ainda for a mesma.
+
+O seletor de famílias (ver seletor_busca) usa um índice de busca (ver
+busca_familias) montado junto com o catálogo, e mostra primeiro os tipos
+usados recentemente.
+"""
+import hashlib
+import os
+import pickle
+from collections import namedtuple
+
+from System.Collections.Generic import List
+
+from Autodesk.Revit.DB import (
+    BuiltInCategory,
+    BuiltInParameter,
+    ElementClassFilter,
+    ElementFilter,
+    ElementId,
+    ElementMulticategoryFilter,
+    ElementParameterFilter,
+    FamilySymbol,
+    FilteredElementCollector,
+    Document,
+    LogicalOrFilter,
+    ModelPathUtils,
+    ParameterFilterRuleFactory,
+)
+
+from pyrevit import HOST_APP, revit, forms, script
+from pyrevit.coreutils import appdata, envvars, logger
+
+import busca_familias
+import seletor_busca
+
+
+mlogger = logger.get_logger(__name__)
+
+
+# Registro leve de um símbolo de família (sem referência ao elemento do Revit)
+RegistroFamilia = namedtuple(
+    'RegistroFamilia', ['familia', 'tipo', 'symbol_id', 'categoria', 'ativo']
+)
+
+# Chaves usadas para guardar o estado no AppDomain do pyRevit
+CHAVE_CATALOGO = 'TOMADAS_CATALOGO_FAMILIAS'
+CHAVE_MONITORAMENTO = 'TOMADAS_CATALOGO_MONITORADO'
+CHAVE_INDICES = 'TOMADAS_CATALOGO_INDICES'
+
+# Versão do formato do arquivo do catálogo em disco
+VERSAO_ARQUIVO = 1
+
+# Seção da configuração do usuário onde ficam os tipos usados recentemente
+SECAO_CONFIG = 'catalogo_familias'
+
+# Quantidade máxima de itens exibidos a cada tecla no seletor
+LIMITE_SELETOR = 500
+
+# Palavras usadas por padrão para reconhecer famílias de tomadas
+PALAVRAS_TOMADA = ('tomada',)
+
+
+def _obter_nome(symbol, parametro, padrao):
+    """Lê um parâmetro de texto do símbolo, retornando o padrão se vazio."""
+    param = symbol.get_Parameter(parametro)
+    if param and param.HasValue:
+        return param.AsString()
+    return padrao
+
+
+def _criar_registro(symbol):
+    """Cria o registro do catálogo a partir de um FamilySymbol."""
+    categoria = symbol.Category
+    return RegistroFamilia(
+        familia=_obter_nome(symbol, BuiltInParameter.ALL_MODEL_FAMILY_NAME, "Sem Família"),
+        tipo=_obter_nome(symbol, BuiltInParameter.ALL_MODEL_TYPE_NAME, "Sem Nome"),
+        symbol_id=symbol.Id,
+        categoria=categoria.Id.IntegerValue if categoria else None,
+        ativo=symbol.IsActive,
+    )
+
+
+def chave_documento(doc):
+    """Retorna a chave usada para identificar o documento no catálogo."""
+    return doc.PathName or doc.Title
+
+
+def _estado(chave):
+    """Retorna um dicionário guardado no AppDomain, criando-o se necessário."""
+    estado = envvars.get_pyrevit_env_var(chave)
+    if estado is None:
+        estado = {}
+        envvars.set_pyrevit_env_var(chave, estado)
+    return estado
+
+
+def _catalogos():
+    """Retorna o dicionário de catálogos guardado no AppDomain."""
+    return _estado(CHAVE_CATALOGO)
+
+
+def invalidar(doc):
+    """Descarta o catálogo (e os índices de busca) do documento."""
+    _catalogos().pop(chave_documento(doc), None)
+    _estado(CHAVE_INDICES).pop(chave_documento(doc), None)
+
+
+def _chave_consulta(categoria, palavras_chave):
+    """Retorna a chave de uma consulta do catálogo (categoria, palavras)."""
+    if palavras_chave:
+        palavras = tuple(sorted(set(p.lower() for p in palavras_chave)))
+    else:
+        palavras = ()
+    return int(categoria), palavras
+
+
+def _corresponde(registro, consulta):
+    """Verifica se o registro seria retornado pela consulta."""
+    categoria, palavras = consulta
+    if registro.categoria != categoria:
+        return False
+    if not palavras:
+        return True
+    familia = registro.familia.lower()
+    tipo = registro.tipo.lower()
+    return any(p in familia or p in tipo for p in palavras)
+
+
+def _afeta_catalogo(catalogo, registro):
+    """Verifica se um símbolo novo ou renomeado entraria em alguma consulta."""
+    return any(_corresponde(registro, consulta) for consulta in catalogo)
+
+
+def _ao_alterar_documento(sender, args):
+    """Invalida o catálogo quando símbolos de família mudam no documento."""
+    try:
+        doc = args.GetDocument()
+        catalogo = _catalogos().get(chave_documento(doc))
+        if not catalogo:
+            return
+
+        filtro = ElementClassFilter(FamilySymbol)
+
+        # Nomes conhecidos de todos os símbolos catalogados
+        nomes_conhecidos = {}
+        for registros in catalogo.values():
+            for registro in registros:
+                nomes_conhecidos[registro.symbol_id.IntegerValue] = (registro.familia, registro.tipo)
+
+        # Símbolos adicionados que entrariam em alguma consulta já catalogada
+        for elem_id in args.GetAddedElementIds(filtro):
+            symbol = doc.GetElement(elem_id)
+            if symbol and _afeta_catalogo(catalogo, _criar_registro(symbol)):
+                invalidar(doc)
+                return
+
+        # Símbolos removidos que estavam no catálogo
+        for elem_id in args.GetDeletedElementIds():
+            if elem_id.IntegerValue in nomes_conhecidos:
+                invalidar(doc)
+                return
+
+        # Símbolos renomeados (família ou tipo)
+        for elem_id in args.GetModifiedElementIds(filtro):
+            symbol = doc.GetElement(elem_id)
+            if not symbol:
+                continue
+            novo = _criar_registro(symbol)
+            nomes = nomes_conhecidos.get(elem_id.IntegerValue)
+            if nomes is None:
+                # Um símbolo fora do catálogo pode ter passado a corresponder
+                if _afeta_catalogo(catalogo, novo):
+                    invalidar(doc)
+                    return
+            elif nomes != (novo.familia, novo.tipo):
+                invalidar(doc)
+                return
+    except Exception:
+        # Um erro aqui não pode interromper a edição do modelo
+        pass
+
+
+def garantir_monitoramento():
+    """Registra o evento DocumentChanged uma única vez por sessão do Revit."""
+    if envvars.get_pyrevit_env_var(CHAVE_MONITORAMENTO):
+        return
+    HOST_APP.app.DocumentChanged += _ao_alterar_documento
+    envvars.set_pyrevit_env_var(CHAVE_MONITORAMENTO, True)
+
+
+def _regra_contem(parametro, palavra):
+    """Cria uma regra "contém" (sem diferenciar maiúsculas) para o parâmetro."""
+    param_id = ElementId(parametro)
+    try:
+        # Revit 2023+: as regras de texto não diferenciam maiúsculas
+        return ParameterFilterRuleFactory.CreateContainsRule(param_id, palavra)
+    except TypeError:
+        # Versões anteriores exigem o argumento caseSensitive
+        return ParameterFilterRuleFactory.CreateContainsRule(param_id, palavra, False)
+
+
+def criar_filtro_nomes(palavras_chave):
+    """Cria um filtro nativo para famílias ou tipos que contenham as palavras."""
+    filtros = List[ElementFilter]()
+    for palavra in palavras_chave:
+        for parametro in (BuiltInParameter.ALL_MODEL_FAMILY_NAME,
+                          BuiltInParameter.ALL_MODEL_TYPE_NAME):
+            filtros.Add(ElementParameterFilter(_regra_contem(parametro, palavra)))
+    return LogicalOrFilter(filtros)
+
+
+def iterar_registros(collector):
+    """Percorre o coletor uma única vez, gerando os registros do catálogo."""
+    for symbol in collector:
+        yield _criar_registro(symbol)
+
+
+def caminho_modelo(doc):
+    """Retorna o caminho do modelo central (ou do arquivo, se não compartilhado)."""
+    if doc.IsWorkshared:
+        central = doc.GetWorksharingCentralModelPath()
+        if central:
+            return ModelPathUtils.ConvertModelPathToUserVisiblePath(central)
+    return doc.PathName
+
+
+def versao_documento(doc):
+    """Retorna (GUID do episódio, número de gravações) da versão do documento."""
+    versao = Document.GetDocumentVersion(doc)
+    return str(versao.VersionGUID), versao.NumberOfSaves
+
+
+def _arquivo_catalogo(caminho):
+    """Retorna o arquivo do catálogo em disco para o modelo informado."""
+    file_id = 'catalogo_familias_' + hashlib.md5(caminho.encode('utf-8')).hexdigest()
+    return appdata.get_data_file(file_id, 'pkl')
+
+
+def carregar_arquivo(doc):
+    """Lê o catálogo gravado em disco, se a versão do documento for a mesma.
+
+    Retorna None quando não há arquivo ou ele não corresponde ao documento.
+    """
+    # Alterações ainda não salvas não estão refletidas na versão do documento
+    caminho = caminho_modelo(doc)
+    if not caminho or doc.IsModified:
+        return None
+    try:
+        arquivo = _arquivo_catalogo(caminho)
+        if not os.path.exists(arquivo):
+            return None
+        with open(arquivo, 'rb') as f:
+            dados = pickle.load(f)
+        if (dados.get('formato') != VERSAO_ARQUIVO
+                or dados.get('modelo') != caminho
+                or tuple(dados.get('versao')) != versao_documento(doc)):
+            return None
+        catalogo = {}
+        for consulta, linhas in dados['consultas'].items():
+            catalogo[consulta] = [
+                RegistroFamilia(familia, tipo, ElementId(symbol_id), categoria, ativo)
+                for familia, tipo, symbol_id, categoria, ativo in linhas
+            ]
+        return catalogo
+    except Exception as e:
+        mlogger.debug("Catálogo em disco ignorado: %s", e)
+        return None
+
+
+def salvar_arquivo(doc, catalogo):
+    """Grava o catálogo em disco, associado à versão atual do documento."""
+    caminho = caminho_modelo(doc)
+    if not caminho or doc.IsModified:
+        return
+    try:
+        dados = {
+            'formato': VERSAO_ARQUIVO,
+            'modelo': caminho,
+            'versao': versao_documento(doc),
+            'consultas': dict(
+                (consulta, [(r.familia, r.tipo, r.symbol_id.IntegerValue, r.categoria, r.ativo)
+                            for r in registros])
+                for consulta, registros in catalogo.items()
+            ),
+        }
+        with open(_arquivo_catalogo(caminho), 'wb') as f:
+            pickle.dump(dados, f, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        mlogger.debug("Não foi possível gravar o catálogo em disco: %s", e)
+
+
+def obter_registros(doc, categoria, palavras_chave=None):
+    """Retorna os registros dos símbolos de uma categoria, usando o cache.
+
+    Se palavras_chave for informado, apenas os símbolos cujo nome de família
+    ou de tipo contenha uma das palavras são coletados (filtro nativo).
+    """
+    return obter_registros_categorias(doc, [categoria], palavras_chave)
+
+
+def obter_registros_categorias(doc, categorias, palavras_chave=None):
+    """Retorna os registros de várias categorias, coletados em uma só passada.
+
+    As categorias que ainda não estão no cache são coletadas juntas com um
+    ElementMulticategoryFilter; os registros são distribuídos por categoria
+    à medida que o coletor é percorrido.
+    """
+    garantir_monitoramento()
+    catalogo = _catalogos().setdefault(chave_documento(doc), {})
+    consultas = [_chave_consulta(categoria, palavras_chave) for categoria in categorias]
+    pendentes = [consulta for consulta in consultas if consulta not in catalogo]
+
+    if pendentes and not catalogo:
+        # Primeira consulta da sessão: tentar o catálogo gravado em disco
+        catalogo.update(carregar_arquivo(doc) or {})
+        pendentes = [consulta for consulta in consultas if consulta not in catalogo]
+
+    if pendentes:
+        palavras = pendentes[0][1]
+        lista_categorias = List[BuiltInCategory]()
+        for categoria in categorias:
+            if _chave_consulta(categoria, palavras_chave) in pendentes:
+                lista_categorias.Add(categoria)
+
+        collector = FilteredElementCollector(doc) \
+            .OfClass(FamilySymbol) \
+            .WherePasses(ElementMulticategoryFilter(lista_categorias))
+        if palavras:
+            collector = collector.WherePasses(criar_filtro_nomes(palavras))
+
+        novos = dict((consulta, []) for consulta in pendentes)
+        for registro in iterar_registros(collector):
+            consulta = (registro.categoria, palavras)
+            if consulta in novos:
+                novos[consulta].append(registro)
+        catalogo.update(novos)
+
+        for consulta in pendentes:
+            mlogger.debug("Categoria %s: %s símbolos coletados.", consulta[0], len(novos[consulta]))
+
+        salvar_arquivo(doc, catalogo)
+
+    registros = []
+    for consulta in consultas:
+        registros.extend(catalogo[consulta])
+    return registros
+
+
+def _ler_recentes():
+    """Lê da configuração do usuário os tipos usados recentemente."""
+    config = script.get_config(SECAO_CONFIG)
+    return list(config.get_option('tipos_recentes', []))
+
+
+def _salvar_recentes(recentes):
+    """Grava na configuração do usuário os tipos usados recentemente."""
+    config = script.get_config(SECAO_CONFIG)
+    config.tipos_recentes = list(recentes)
+    script.save_config()
+
+
+def obter_indice(doc, chave, nomes):
+    """Retorna o índice de busca dos nomes, montado uma vez por catálogo."""
+    indices = _estado(CHAVE_INDICES).setdefault(chave_documento(doc), {})
+    indice = indices.get(chave)
+    if indice is None:
+        indice = busca_familias.IndiceBusca(sorted(nomes), recentes=_ler_recentes())
+        indices[chave] = indice
+    return indice
+
+
+def selecionar_familia(doc,
+                       categorias=(BuiltInCategory.OST_ElectricalFixtures,),
+                       palavras_chave=PALAVRAS_TOMADA,
+                       titulo='Selecione uma Tomada'):
+    """Permite que o usuário selecione um símbolo de família do catálogo."""
+    registros = obter_registros_categorias(doc, categorias, palavras_chave)
+
+    if not registros:
+        forms.alert("Nenhuma família de tomadas encontrada no projeto.", exitscript=True)
+
+    # Criar um dicionário de opções
+    opcoes = {}
+    for registro in registros:
+        opcoes["{} : {}".format(registro.familia, registro.tipo)] = registro
+
+    # Índice de busca (usados recentemente primeiro, depois em ordem alfabética)
+    chave_indice = (tuple(int(c) for c in categorias), tuple(palavras_chave or ()))
+    indice = obter_indice(doc, chave_indice, opcoes.keys())
+
+    nome_selecionado = seletor_busca.selecionar(indice, titulo, LIMITE_SELETOR)
+
+    if not nome_selecionado:
+        forms.alert("Nenhuma tomada selecionada.", exitscript=True)
+
+    indice.registrar_uso(nome_selecionado)
+    try:
+        _salvar_recentes(indice.recentes)
+    except Exception as e:
+        mlogger.debug("Não foi possível salvar os tipos recentes: %s", e)
+
+    symbol = doc.GetElement(opcoes[nome_selecionado].symbol_id)
+    if symbol is None:
+        # O catálogo ficou desatualizado; montar novamente na próxima execução
+        invalidar(doc)
+        forms.alert("A família selecionada não existe mais no projeto.", exitscript=True)
+
+    # Ativar o símbolo da família, se necessário
+    if not symbol.IsActive:
+        with revit.Transaction("Ativar Família", doc=doc):
+            symbol.Activate()
+            doc.Regenerate()
+
+    return symbol
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Divisão das tomadas em circuitos por limite de carga.
+
+As tomadas são ordenadas pela curva de Hilbert das suas posições: tomadas
+vizinhas na ordem também são vizinhas no espaço, então cortar a sequência em
+trechos contínuos gera circuitos compactos. O número de circuitos é o menor
+possível para trechos contínuos (preenchimento guloso até o limite) e, com
+esse número fixo, os cortes são refeitos por busca binária na capacidade
+para equilibrar a carga entre os circuitos.
+
+Este módulo não depende do Revit.
+"""
+from math import sqrt
+
+
+# Ordem da curva de Hilbert (grade de 2**ORDEM_HILBERT células por eixo)
+ORDEM_HILBERT = 16
+
+
+def limite_por_corrente(corrente, tensao, fases=1):
+    """Potência aparente (VA) correspondente a uma corrente máxima.
+
+    Para circuitos trifásicos a tensão é a de linha (S = √3·V·I); nos demais,
+    S = V·I.
+    """
+    if corrente <= 0 or tensao <= 0:
+        raise ValueError("Corrente e tensão do circuito devem ser positivas.")
+    if fases == 3:
+        return sqrt(3.0) * tensao * corrente
+    return tensao * corrente
+
+
+def indice_hilbert(x, y, ordem=ORDEM_HILBERT):
+    """Posição da célula inteira (x, y) ao longo da curva de Hilbert."""
+    n = 1 << ordem
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotacionar o quadrante
+        if ry == 0:
+            if rx == 1:
+                x = s - 1 - x
+                y = s - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+
+def ordem_hilbert(pontos, ordem=ORDEM_HILBERT):
+    """Índices dos pontos (x, y) ordenados pela curva de Hilbert."""
+    if not pontos:
+        return []
+    xs = [p[0] for p in pontos]
+    ys = [p[1] for p in pontos]
+    x0 = min(xs)
+    y0 = min(ys)
+    extensao = max(max(xs) - x0, max(ys) - y0) or 1.0
+    escala = ((1 << ordem) - 1) / extensao
+    chaves = [
+        indice_hilbert(int((x - x0) * escala), int((y - y0) * escala), ordem)
+        for x, y in zip(xs, ys)
+    ]
+    return sorted(range(len(pontos)), key=chaves.__getitem__)
+
+
+def _cortar(cargas, capacidade, max_tomadas=None):
+    """Corta a sequência de cargas em trechos contínuos de até capacidade."""
+    trechos = []
+    atual = []
+    soma = 0.0
+    for i, carga in enumerate(cargas):
+        cheio = max_tomadas is not None and len(atual) >= max_tomadas
+        if atual and (soma + carga > capacidade or cheio):
+            trechos.append(atual)
+            atual = []
+            soma = 0.0
+        atual.append(i)
+        soma += carga
+    if atual:
+        trechos.append(atual)
+    return trechos
+
+
+def particionar(cargas, pontos, limite, max_tomadas=None, tolerancia=1e-6):
+    """Divide as tomadas em circuitos de carga até o limite.
+
+    cargas são as potências aparentes (VA) e pontos as posições (x, y) de
+    cada tomada. Retorna uma lista de circuitos, cada um com os índices das
+    suas tomadas. Uma tomada com carga acima do limite fica sozinha.
+    """
+    if limite <= 0:
+        raise ValueError("O limite de carga por circuito deve ser positivo.")
+    if not cargas:
+        return []
+    ordem = ordem_hilbert(pontos)
+    sequencia = [cargas[i] for i in ordem]
+
+    # Menor número de trechos contínuos com o limite
+    numero = len(_cortar(sequencia, limite, max_tomadas))
+
+    # Menor capacidade que mantém esse número: circuitos equilibrados. A busca
+    # não passa do limite; tomadas acima dele ficam sozinhas em qualquer corte
+    cabem = [carga for carga in sequencia if carga <= limite]
+    baixo = max(cabem) if cabem else limite
+    alto = limite
+    while alto - baixo > tolerancia * max(1.0, alto):
+        meio = (baixo + alto) / 2.0
+        if len(_cortar(sequencia, meio, max_tomadas)) <= numero:
+            alto = meio
+        else:
+            baixo = meio
+
+    return [[ordem[i] for i in trecho] for trecho in _cortar(sequencia, alto, max_tomadas)]
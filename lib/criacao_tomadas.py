@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Criação das instâncias de tomadas em lote.
+
+Todas as tomadas de uma transação são descritas por FamilyInstanceCreationData,
+já com a rotação (eixo vertical e ângulo) definida, e criadas com uma única
+chamada a NewFamilyInstances2. Famílias que recusam a criação em lote são
+inseridas uma a uma (NewFamilyInstance seguido de RotateElement).
+
+criar_tomadas deve ser chamada dentro de uma transação aberta; inserir_em_lotes
+abre as suas próprias transações, em lotes (ver executor_transacoes).
+"""
+from System.Collections.Generic import List
+
+from Autodesk.Revit.DB import ElementTransformUtils, Line, XYZ
+from Autodesk.Revit.DB.Structure import StructuralType
+from Autodesk.Revit.Creation import FamilyInstanceCreationData
+
+from pyrevit import coreutils
+
+import executor_transacoes
+
+
+mlogger = coreutils.logger.get_logger(__name__)
+
+
+def _eixo_vertical(ponto):
+    """Eixo de rotação vertical passando pelo ponto."""
+    return Line.CreateBound(ponto, ponto + XYZ.BasisZ)
+
+
+def _criar_em_lote(doc, simbolo, pontos, angulos, hospedeiros):
+    """Cria todas as instâncias com uma única chamada a NewFamilyInstances2."""
+    dados = List[FamilyInstanceCreationData]()
+    for ponto, angulo, hospedeiro in zip(pontos, angulos, hospedeiros):
+        item = FamilyInstanceCreationData(ponto, simbolo, hospedeiro, StructuralType.NonStructural)
+        item.Axis = _eixo_vertical(ponto)
+        item.RotateAngle = angulo
+        dados.Add(item)
+    ids = doc.Create.NewFamilyInstances2(dados)
+    return [doc.GetElement(elem_id) for elem_id in ids]
+
+
+def _criar_uma_a_uma(doc, simbolo, pontos, angulos, hospedeiros):
+    """Cria as instâncias uma a uma, ignorando as que falharem."""
+    instancias = []
+    for ponto, angulo, hospedeiro in zip(pontos, angulos, hospedeiros):
+        try:
+            instancia = doc.Create.NewFamilyInstance(
+                ponto, simbolo, hospedeiro, StructuralType.NonStructural
+            )
+            ElementTransformUtils.RotateElement(doc, instancia.Id, _eixo_vertical(ponto), angulo)
+            instancias.append(instancia)
+        except Exception as erro:
+            mlogger.debug('Falha ao inserir tomada em %s: %s', ponto, erro)
+    return instancias
+
+
+def criar_tomadas(doc, simbolo, pontos, angulos, hospedeiros):
+    """Cria as tomadas nos pontos, com a rotação e a parede hospedeira de cada uma.
+
+    Retorna a lista das instâncias criadas.
+    """
+    pontos = list(pontos)
+    if not pontos:
+        return []
+    try:
+        return _criar_em_lote(doc, simbolo, pontos, angulos, hospedeiros)
+    except Exception as erro:
+        # A família não aceita a criação em lote: inserir uma a uma
+        mlogger.debug('Criação em lote recusada (%s); inserindo uma a uma.', erro)
+        return _criar_uma_a_uma(doc, simbolo, pontos, angulos, hospedeiros)
+
+
+def inserir_em_lotes(doc, nome, simbolo, pontos, angulos, hospedeiros, ajustar=None,
+                     tamanho_lote=executor_transacoes.TAMANHO_LOTE):
+    """Cria as tomadas em lotes de transações dentro de um único grupo.
+
+    ajustar(instancias, erros), se informado, é chamado dentro da transação de
+    cada lote (por exemplo, para definir parâmetros) e pode anotar em erros as
+    falhas que devem aparecer no relatório do lote. Retorna os ids das tomadas
+    criadas e os relatórios dos lotes.
+    """
+    def inserir_lote(lote, erros):
+        pontos_lote, angulos_lote, hospedeiros_lote = zip(*lote)
+        instancias = criar_tomadas(doc, simbolo, pontos_lote, angulos_lote, hospedeiros_lote)
+        if ajustar is not None:
+            ajustar(instancias, erros)
+        return [instancia.Id for instancia in instancias]
+
+    itens = zip(pontos, angulos, hospedeiros)
+    return executor_transacoes.executar_em_lotes(doc, nome, itens, inserir_lote, tamanho_lote)
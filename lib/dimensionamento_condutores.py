@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Dimensionamento dos condutores e cálculo da queda de tensão.
+
+As tabelas são as da NBR 5410 para condutores de cobre com isolação de PVC
+(70 °C) no método de referência B1 (eletroduto embutido em alvenaria):
+capacidade de condução de corrente (tabela 36), fatores de correção de
+temperatura ambiente (tabela 40) e de agrupamento de circuitos (tabela 42).
+
+TabelaCondutores aplica os fatores de correção uma única vez e guarda as
+capacidades corrigidas em ordem crescente; a seção de cada circuito é então
+encontrada por busca binária, tanto pelo critério da capacidade quanto pelo
+da queda de tensão.
+
+Este módulo não depende do Revit.
+"""
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from math import sqrt
+
+
+# Seções nominais (mm²)
+SECOES = (1.5, 2.5, 4, 6, 10, 16, 25, 35, 50, 70, 95, 120, 150, 185, 240, 300)
+
+# Capacidade de condução (A) por número de condutores carregados (B1, PVC, cobre)
+AMPACIDADE = {
+    2: (17.5, 24, 32, 41, 57, 76, 101, 125, 151, 192, 232, 269, 309, 353, 415, 477),
+    3: (15.5, 21, 28, 36, 50, 68, 89, 110, 134, 171, 207, 239, 275, 314, 370, 426),
+}
+
+# Temperatura ambiente (°C) e fator de correção (PVC)
+TEMPERATURAS = (10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60)
+FATORES_TEMPERATURA = (1.22, 1.17, 1.12, 1.06, 1.00, 0.94, 0.87, 0.79, 0.71, 0.61, 0.50)
+
+# Número de circuitos agrupados (a partir de) e fator de correção
+AGRUPAMENTOS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 12, 16, 20)
+FATORES_AGRUPAMENTO = (1.00, 0.80, 0.70, 0.65, 0.60, 0.57, 0.54, 0.52, 0.50, 0.45, 0.41, 0.38)
+
+# Resistividade do cobre (Ω·mm²/m)
+RESISTIVIDADE_COBRE = 1 / 56.0
+
+# Queda de tensão máxima dos circuitos terminais (%)
+QUEDA_MAXIMA = 4.0
+
+# Seção mínima dos circuitos de força (mm²)
+SECAO_MINIMA = 2.5
+
+# Resultado de um circuito: corrente de projeto (A), seção (mm², None se
+# nenhuma seção da tabela atende), capacidade corrigida (A) e queda (%)
+Dimensionamento = namedtuple(
+    'Dimensionamento', ['corrente', 'secao', 'capacidade', 'queda']
+)
+
+
+def corrente_projeto(carga, tensao, polos=1):
+    """Corrente (A) de uma carga aparente (VA).
+
+    Para um polo a tensão é a de fase; para dois ou três polos, a de linha.
+    """
+    if tensao <= 0:
+        return 0.0
+    if polos == 3:
+        return carga / (sqrt(3.0) * tensao)
+    return carga / float(tensao)
+
+
+def condutores_carregados(polos):
+    """Condutores carregados do circuito (fase e neutro ou fases)."""
+    return 3 if polos == 3 else 2
+
+
+def fator_temperatura(temperatura):
+    """Fator de correção da temperatura ambiente (a tabulada igual ou acima)."""
+    indice = min(bisect_left(TEMPERATURAS, temperatura), len(TEMPERATURAS) - 1)
+    return FATORES_TEMPERATURA[indice]
+
+
+def fator_agrupamento(circuitos):
+    """Fator de correção para o número de circuitos agrupados."""
+    indice = max(bisect_right(AGRUPAMENTOS, circuitos) - 1, 0)
+    return FATORES_AGRUPAMENTO[indice]
+
+
+def queda_tensao(corrente, comprimento, secao, tensao, polos=1):
+    """Queda de tensão (%) de um circuito de comprimento (m) e seção (mm²)."""
+    if tensao <= 0 or secao <= 0:
+        return 0.0
+    k = sqrt(3.0) if polos == 3 else 2.0
+    return 100.0 * k * RESISTIVIDADE_COBRE * comprimento * corrente / (secao * tensao)
+
+
+class TabelaCondutores(object):
+    """Capacidades corrigidas para uma temperatura e um agrupamento."""
+
+    def __init__(self, temperatura=30, agrupamento=1, queda_maxima=QUEDA_MAXIMA,
+                 secao_minima=SECAO_MINIMA):
+        fator = fator_temperatura(temperatura) * fator_agrupamento(agrupamento)
+        self.capacidades = dict(
+            (n, [a * fator for a in ampacidades]) for n, ampacidades in AMPACIDADE.items()
+        )
+        self.queda_maxima = queda_maxima
+        self._indice_minimo = bisect_left(SECOES, secao_minima)
+
+    def dimensionar(self, carga, tensao, polos=1, comprimento=0.0):
+        """Seção que atende à capacidade de condução e à queda de tensão."""
+        corrente = corrente_projeto(carga, tensao, polos)
+        capacidades = self.capacidades[condutores_carregados(polos)]
+
+        # Menor seção com capacidade corrigida >= corrente
+        indice = max(self._indice_minimo, bisect_left(capacidades, corrente))
+
+        # Menor seção com queda <= máxima (a queda é inversamente proporcional à seção)
+        if comprimento > 0 and tensao > 0:
+            secao_queda = queda_tensao(corrente, comprimento, 1.0, tensao, polos) / self.queda_maxima
+            indice = max(indice, bisect_left(SECOES, secao_queda))
+
+        if indice >= len(SECOES):
+            return Dimensionamento(corrente, None, None, None)
+        secao = SECOES[indice]
+        return Dimensionamento(
+            corrente, secao, capacidades[indice],
+            queda_tensao(corrente, comprimento, secao, tensao, polos),
+        )
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Exportação de linhas em CSV ou JSON Lines, gravadas em blocos de tamanho fixo.
+
+As linhas chegam de um iterável (normalmente um gerador que percorre o modelo
+aos poucos) e são formatadas uma a uma. O texto formatado se acumula em um
+buffer até atingir o tamanho do bloco e só então é gravado no arquivo, de
+modo que a memória usada não depende do número de linhas exportadas.
+
+O progresso (linhas exportadas e linhas por segundo) é informado por uma
+função de retorno a cada intervalo de linhas.
+
+Este módulo não depende do Revit.
+"""
+import csv
+import io
+import json
+import time
+
+
+# Tamanho do bloco gravado de uma vez no arquivo (caracteres)
+TAMANHO_BLOCO = 1 << 16
+
+# Linhas entre dois relatórios de progresso
+INTERVALO_RELATORIO = 20000
+
+FORMATOS = ('csv', 'jsonl')
+
+
+class EscritorEmBlocos(object):
+    """Acumula o texto e grava no destino em blocos de tamanho fixo."""
+
+    def __init__(self, destino, tamanho_bloco=TAMANHO_BLOCO):
+        self.destino = destino
+        self.tamanho_bloco = tamanho_bloco
+        self._partes = []
+        self._tamanho = 0
+
+    def write(self, texto):
+        self._partes.append(texto)
+        self._tamanho += len(texto)
+        if self._tamanho >= self.tamanho_bloco:
+            self.flush()
+
+    def flush(self):
+        if self._partes:
+            self.destino.write(u''.join(self._partes))
+            self._partes = []
+            self._tamanho = 0
+
+
+def _formatador(formato, escritor, colunas):
+    """Função que grava uma linha no formato escolhido (e o cabeçalho, se houver)."""
+    if formato == 'csv':
+        gravador = csv.writer(escritor, lineterminator='\n')
+        gravador.writerow(colunas)
+        return gravador.writerow
+    if formato == 'jsonl':
+        def gravar(linha):
+            escritor.write(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False) + u'\n')
+        return gravar
+    raise ValueError("Formato desconhecido: {}".format(formato))
+
+
+def exportar(linhas, caminho, colunas, formato='csv', tamanho_bloco=TAMANHO_BLOCO,
+             relatar=None, intervalo=INTERVALO_RELATORIO):
+    """Grava as linhas no arquivo em UTF-8 e retorna (linhas exportadas, segundos).
+
+    relatar, se informado, recebe (linhas exportadas, linhas por segundo) a
+    cada intervalo de linhas e ao final.
+    """
+    inicio = time.time()
+    total = 0
+    with io.open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        escritor = EscritorEmBlocos(arquivo, tamanho_bloco)
+        gravar = _formatador(formato, escritor, colunas)
+        for linha in linhas:
+            gravar(linha)
+            total += 1
+            if relatar is not None and total % intervalo == 0:
+                relatar(total, total / max(time.time() - inicio, 1e-6))
+        escritor.flush()
+    segundos = time.time() - inicio
+    if relatar is not None:
+        relatar(total, total / max(segundos, 1e-6))
+    return total, segundos
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Execução de grandes inserções em lotes de transações.
+
+Os itens são processados em lotes de tamanho fixo; cada lote tem a sua
+própria transação e todas ficam dentro de um TransactionGroup, assimilado no
+final (uma única entrada de desfazer). A regeneração e a memória de cada
+commit ficam limitadas ao lote.
+
+Um IFailuresPreprocessor remove os avisos (instâncias idênticas, elementos
+sobrepostos etc.) e resolve os erros que têm resolução padrão, sem abrir
+caixas de diálogo; o que não puder ser resolvido desfaz apenas o lote. Cada
+lote gera um RelatorioLote com os avisos e erros encontrados.
+
+sessao agrupa uma execução inteira de um botão (pré-visualização, inserção e
+circuitos) em um TransactionGroup assimilado, ou seja, em uma única entrada
+de desfazer.
+"""
+from collections import namedtuple
+from contextlib import contextmanager
+
+from Autodesk.Revit.DB import (
+    FailureProcessingResult, FailureSeverity, IFailuresPreprocessor, Transaction,
+    TransactionGroup, TransactionStatus,
+)
+
+from pyrevit import coreutils, script
+
+
+mlogger = coreutils.logger.get_logger(__name__)
+
+# Quantidade padrão de itens por transação
+TAMANHO_LOTE = 500
+
+# Resultado de um lote: número (a partir de 1), itens enviados, elementos
+# criados, descrições dos avisos removidos e dos erros, e situação final
+RelatorioLote = namedtuple(
+    'RelatorioLote', ['numero', 'quantidade', 'criados', 'avisos', 'erros', 'situacao']
+)
+
+
+class PreprocessadorFalhas(IFailuresPreprocessor):
+    """Trata as falhas de uma transação sem interface com o usuário."""
+
+    def __init__(self):
+        self.avisos = []
+        self.erros = []
+
+    def limpar(self):
+        """Esvazia as falhas registradas (antes de cada lote)."""
+        self.avisos = []
+        self.erros = []
+
+    def PreprocessFailures(self, acessor):
+        resolvidas = False
+        for falha in acessor.GetFailureMessages():
+            descricao = falha.GetDescriptionText()
+            if falha.GetSeverity() == FailureSeverity.Warning:
+                self.avisos.append(descricao)
+                acessor.DeleteWarning(falha)
+            elif falha.HasResolutions():
+                self.erros.append(descricao)
+                acessor.ResolveFailure(falha)
+                resolvidas = True
+            else:
+                # Erro sem resolução: desfazer apenas este lote
+                self.erros.append(descricao)
+                return FailureProcessingResult.ProceedWithRollBack
+        if resolvidas:
+            return FailureProcessingResult.ProceedWithCommit
+        return FailureProcessingResult.Continue
+
+
+@contextmanager
+def sessao(doc, nome):
+    """Agrupa todas as transações do bloco em uma única entrada de desfazer.
+
+    O grupo é assimilado ao final do bloco e desfeito se o bloco for
+    interrompido (erro ou saída do script).
+    """
+    grupo = TransactionGroup(doc, nome)
+    grupo.Start()
+    try:
+        yield grupo
+    except BaseException:
+        if grupo.HasStarted() and not grupo.HasEnded():
+            grupo.RollBack()
+        raise
+    grupo.Assimilate()
+
+
+def _transacao(doc, nome, preprocessador):
+    """Cria a transação do lote com o tratamento de falhas configurado."""
+    transacao = Transaction(doc, nome)
+    opcoes = transacao.GetFailureHandlingOptions()
+    opcoes.SetFailuresPreprocessor(preprocessador)
+    opcoes.SetClearAfterRollback(True)
+    transacao.SetFailureHandlingOptions(opcoes)
+    return transacao
+
+
+def executar_em_lotes(doc, nome, itens, acao, tamanho_lote=TAMANHO_LOTE):
+    """Executa acao(lote, erros) para cada lote de itens, em transações separadas.
+
+    acao recebe a lista de itens do lote e a lista de erros do relatório do
+    lote, em que pode anotar falhas que não impedem o commit, e retorna os
+    ids dos elementos criados. Retorna a lista de todos os ids criados (dos lotes confirmados)
+    e a lista de RelatorioLote.
+    """
+    itens = list(itens)
+    total_lotes = (len(itens) + tamanho_lote - 1) // tamanho_lote
+    preprocessador = PreprocessadorFalhas()
+    criados = []
+    relatorios = []
+
+    grupo = TransactionGroup(doc, nome)
+    grupo.Start()
+    try:
+        for numero in range(1, total_lotes + 1):
+            lote = itens[(numero - 1) * tamanho_lote:numero * tamanho_lote]
+            preprocessador.limpar()
+            transacao = _transacao(
+                doc, "{} ({}/{})".format(nome, numero, total_lotes), preprocessador
+            )
+            transacao.Start()
+            try:
+                ids = list(acao(lote, preprocessador.erros))
+                situacao = transacao.Commit()
+            except Exception as erro:
+                mlogger.debug('Falha no lote %s: %s', numero, erro)
+                if transacao.HasStarted() and not transacao.HasEnded():
+                    transacao.RollBack()
+                preprocessador.erros.append(str(erro))
+                ids = []
+                situacao = TransactionStatus.RolledBack
+
+            if situacao != TransactionStatus.Committed:
+                ids = []
+            criados.extend(ids)
+            relatorios.append(RelatorioLote(
+                numero, len(lote), len(ids),
+                list(preprocessador.avisos), list(preprocessador.erros), str(situacao),
+            ))
+        grupo.Assimilate()
+    except Exception:
+        if grupo.HasStarted() and not grupo.HasEnded():
+            grupo.RollBack()
+        raise
+
+    return criados, relatorios
+
+
+def imprimir_relatorio(relatorios, titulo="Relatório da Inserção"):
+    """Mostra o relatório dos lotes na janela de saída do pyRevit.
+
+    Só há saída quando algum lote teve avisos, erros ou não foi confirmado.
+    """
+    problemas = [
+        r for r in relatorios
+        if r.avisos or r.erros or r.situacao != str(TransactionStatus.Committed)
+    ]
+    if not problemas:
+        return
+    output = script.get_output()
+    output.print_table(
+        table_data=[
+            [r.numero, r.quantidade, r.criados, r.situacao,
+             len(r.avisos), "; ".join(sorted(set(r.erros)))]
+            for r in relatorios
+        ],
+        title=titulo,
+        columns=["Lote", "Itens", "Criados", "Situação", "Avisos", "Erros"],
+    )
+    for relatorio in problemas:
+        for aviso in sorted(set(relatorio.avisos)):
+            output.print_md("- Lote {}: {}".format(relatorio.numero, aviso))
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Leitura e regravação das fases dos circuitos de um painel.
+
+No Revit a fase de um circuito é a da posição (slot) que ele ocupa na
+tabela do painel (PanelScheduleView): cada linha de slots do corpo da tabela
+corresponde a uma fase, em sequência A, B, C. A tabela é percorrida uma
+única vez para descobrir o slot, as células e os circuitos de cada posição.
+
+Os circuitos de um polo são redistribuídos por balanceamento_fases; os de
+dois ou três polos ficam no lugar e as suas cargas entram como base das
+fases que ocupam. A regravação move os circuitos de slot (MoveSlotTo) em uma
+única transação.
+"""
+from collections import namedtuple
+
+from Autodesk.Revit.DB import ElementId, FilteredElementCollector, SectionType
+from Autodesk.Revit.DB.Electrical import PanelScheduleView
+
+from pyrevit import revit
+
+import balanceamento_fases
+import unidades_revit
+
+
+# Circuito lido da tabela: id inteiro, número, carga aparente (VA), polos,
+# primeiro slot e slots ocupados
+CircuitoPainel = namedtuple(
+    'CircuitoPainel', ['circuito_id', 'numero', 'carga', 'polos', 'slot', 'slots']
+)
+
+
+class QuadroFases(object):
+    """Slots, fases e circuitos de um painel, lidos da sua tabela."""
+
+    def __init__(self, vista, numero_fases=3):
+        self.vista = vista
+        self.numero_fases = numero_fases
+        # slot -> (linha, coluna) da primeira célula do slot
+        self.celulas = {}
+        # slot -> fase (0 a numero_fases - 1)
+        self.fase_do_slot = {}
+        # slots sem circuito, reserva ou espaço
+        self.livres = []
+        self.circuitos = []
+        self._ler()
+
+    def _ler(self):
+        vista = self.vista
+        secao = vista.GetTableData().GetSectionData(SectionType.Body)
+        slots_circuito = {}
+        linhas_slot = []
+        for linha in range(secao.FirstRowNumber, secao.LastRowNumber + 1):
+            linha_tem_slot = False
+            for coluna in range(secao.FirstColumnNumber, secao.LastColumnNumber + 1):
+                slot = vista.GetSlotNumberByCell(linha, coluna)
+                if slot <= 0 or slot in self.celulas:
+                    continue
+                linha_tem_slot = True
+                self.celulas[slot] = (linha, coluna)
+                self.fase_do_slot[slot] = len(linhas_slot) % self.numero_fases
+                circuito_id = vista.GetCircuitIdByCell(linha, coluna)
+                if circuito_id is not None and circuito_id != ElementId.InvalidElementId:
+                    slots_circuito.setdefault(circuito_id.IntegerValue, []).append(slot)
+                elif not (vista.IsSpare(linha, coluna) or vista.IsSpace(linha, coluna)):
+                    self.livres.append(slot)
+            if linha_tem_slot:
+                linhas_slot.append(linha)
+
+        doc = vista.Document
+        for circuito_id, slots in sorted(slots_circuito.items(), key=lambda item: min(item[1])):
+            circuito = doc.GetElement(ElementId(circuito_id))
+            if circuito is None:
+                continue
+            self.circuitos.append(CircuitoPainel(
+                circuito_id=circuito_id,
+                numero=circuito.CircuitNumber,
+                carga=unidades_revit.de_internas(circuito.ApparentLoad, 'VoltAmperes'),
+                polos=circuito.PolesNumber,
+                slot=min(slots),
+                slots=sorted(slots),
+            ))
+
+    def monofasicos(self):
+        """Circuitos de um polo (os que podem mudar de fase)."""
+        return [c for c in self.circuitos if c.polos == 1]
+
+    def base(self):
+        """Carga fixa de cada fase: circuitos de vários polos, divididos entre os slots."""
+        base = [0.0] * self.numero_fases
+        for circuito in self.circuitos:
+            if circuito.polos == 1:
+                continue
+            for slot in circuito.slots:
+                base[self.fase_do_slot[slot]] += circuito.carga / len(circuito.slots)
+        return base
+
+    def capacidades(self):
+        """Número de circuitos de um polo que cada fase pode receber."""
+        capacidades = [0] * self.numero_fases
+        for slot in self.livres:
+            capacidades[self.fase_do_slot[slot]] += 1
+        for circuito in self.monofasicos():
+            capacidades[self.fase_do_slot[circuito.slot]] += 1
+        return capacidades
+
+    def balancear(self):
+        """Balanceia os circuitos de um polo; retorna (circuitos, resultado, movimentos, pendentes).
+
+        O resultado é o que os movimentos planejados alcançam com as posições
+        livres do painel; se houver pendentes, ele pode ser pior que o ideal.
+        Se nem isso melhorar a distribuição atual, nenhum movimento é proposto.
+        """
+        circuitos = self.monofasicos()
+        cargas = [c.carga for c in circuitos]
+        slots = [c.slot for c in circuitos]
+        base = self.base()
+        atuais = [self.fase_do_slot[slot] for slot in slots]
+        ideal = balanceamento_fases.balancear(cargas, base, self.capacidades(), atuais)
+        movimentos, pendentes = balanceamento_fases.planejar_movimentos(
+            slots, ideal.fases, self.fase_do_slot, self.livres
+        )
+        resultado = balanceamento_fases.resultado_alcancavel(
+            cargas, slots, movimentos, self.fase_do_slot, base
+        )
+        totais_atuais = balanceamento_fases.totais_por_fase(cargas, atuais, base)
+        if pendentes and not balanceamento_fases.melhora(resultado.totais, totais_atuais):
+            movimentos = []
+            resultado = balanceamento_fases.ResultadoBalanceamento(
+                atuais, totais_atuais, balanceamento_fases.desequilibrio(totais_atuais)
+            )
+        return circuitos, resultado, movimentos, pendentes
+
+    def aplicar(self, movimentos, nome="Balancear Fases"):
+        """Move os circuitos de slot, na ordem planejada, em uma única transação."""
+        vista = self.vista
+        with revit.Transaction(nome, doc=vista.Document):
+            for _, origem, destino in movimentos:
+                linha, coluna = self.celulas[origem]
+                nova_linha, nova_coluna = self.celulas[destino]
+                if not vista.CanMoveSlotTo(linha, coluna, nova_linha, nova_coluna):
+                    raise ValueError(
+                        "Não foi possível mover o slot {} para o slot {}.".format(origem, destino)
+                    )
+                vista.MoveSlotTo(linha, coluna, nova_linha, nova_coluna)
+
+
+def vista_do_painel(doc, painel):
+    """Tabela (PanelScheduleView) do painel, ou None se não houver."""
+    for vista in FilteredElementCollector(doc).OfClass(PanelScheduleView):
+        if not vista.IsPanelScheduleTemplate() and vista.GetPanel() == painel.Id:
+            return vista
+    return None
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""Leitura da geometria das paredes do Revit para o planejamento das tomadas.
+
+O quadro de cada parede (direção, normal, ângulo, largura, nível e
+comprimento) é calculado uma única vez e fica em cache, identificado pelo id
+da parede e por uma assinatura da geometria; é recalculado quando a curva, o
+tipo ou o nível mudam. Paredes curvas são discretizadas uma única vez e a
+tabela de comprimento de arco segue a mesma regra; a tabela guarda apenas
+números (nenhuma referência à curva do Revit).
+
+As aberturas hospedadas (portas, janelas, aberturas retangulares e paredes
+embutidas) são lidas com Wall.FindInserts e reduzidas a pares de pontos
+extremos, projetados depois no quadro de cada parede ou trecho.
+
+As paredes selecionadas que se unem pelas extremidades
+(LocationCurve.get_ElementsAtJoin) formam cadeias ordenadas, percorridas em
+um único sentido, para espaçar as tomadas ao longo do comprimento total.
+
+O contorno dos cômodos também é lido aqui: cada trecho com parede hospedeira
+vira um QuadroParede de largura zero, já posicionado na face da parede.
+"""
+from math import atan2
+
+from Autodesk.Revit.DB import (
+    Arc, BuiltInParameter, FamilyInstance, Line, LocationCurve, LocationPoint, Opening,
+    SpatialElementBoundaryLocation, SpatialElementBoundaryOptions, Wall, WallKind,
+)
+
+import layout_tomadas
+
+
+# Cache das tabelas de comprimento de arco: id da parede -> (assinatura, tabela)
+_TABELAS = {}
+
+# Cache dos quadros (sem aberturas): id da parede -> (assinatura, quadro)
+_QUADROS = {}
+
+
+def assinatura_curva(curva):
+    """Assinatura leve da curva (tipo, extremidades e ponto médio)."""
+    pontos = (curva.GetEndPoint(0), curva.GetEndPoint(1), curva.Evaluate(0.5, True))
+    return (type(curva).__name__,) + tuple(
+        (round(p.X, 6), round(p.Y, 6), round(p.Z, 6)) for p in pontos
+    )
+
+
+def tabela_da_curva(curva):
+    """Tabela de comprimento de arco da curva, montada uma única vez.
+
+    Arcos guardam o centro, o raio, o ângulo inicial e o sentido e são
+    avaliados exatamente. Nas demais curvas, a tangente é amostrada em cada
+    vértice de Curve.Tessellate na montagem; depois disso a tabela não chama
+    mais a API do Revit.
+    """
+    vertices = list(curva.Tessellate())
+    pontos = [(p.X, p.Y, p.Z) for p in vertices]
+    if isinstance(curva, Arc):
+        centro = curva.Center
+        inicio = curva.GetEndPoint(0)
+        arco = (
+            centro.X, centro.Y, curva.Radius,
+            atan2(inicio.Y - centro.Y, inicio.X - centro.X),
+            1.0 if curva.Normal.Z > 0 else -1.0,
+        )
+        return layout_tomadas.TabelaComprimentoArco(pontos, arco=arco, comprimento=curva.Length)
+    tangentes = []
+    for p in vertices:
+        derivada = curva.ComputeDerivatives(curva.Project(p).Parameter, False).BasisX
+        norma = (derivada.X ** 2 + derivada.Y ** 2) ** 0.5 or 1.0
+        tangentes.append((derivada.X / norma, derivada.Y / norma))
+    return layout_tomadas.TabelaComprimentoArco(pontos, tangentes, comprimento=curva.Length)
+
+
+def tabela_comprimento_arco(parede, curva):
+    """Retorna a tabela de comprimento de arco da curva da parede (em cache)."""
+    chave = parede.Id.IntegerValue
+    assinatura = assinatura_curva(curva)
+    em_cache = _TABELAS.get(chave)
+    if em_cache is not None and em_cache[0] == assinatura:
+        return em_cache[1]
+    tabela = tabela_da_curva(curva)
+    _TABELAS[chave] = (assinatura, tabela)
+    return tabela
+
+
+# Parâmetros de largura das portas e janelas, na ordem de preferência
+_PARAMETROS_LARGURA = (
+    BuiltInParameter.FAMILY_WIDTH_PARAM,
+    BuiltInParameter.DOOR_WIDTH,
+    BuiltInParameter.WINDOW_WIDTH,
+)
+
+
+def _largura_insert(insert):
+    """Largura da porta ou janela (parâmetro da instância ou do tipo)."""
+    for elemento in (insert, insert.Symbol):
+        for bip in _PARAMETROS_LARGURA:
+            parametro = elemento.get_Parameter(bip)
+            if parametro is not None and parametro.HasValue and parametro.AsDouble() > 0:
+                return parametro.AsDouble()
+    return None
+
+
+def _extremos_insert(insert):
+    """Par de pontos (x, y) que limita a abertura ao longo da parede."""
+    if isinstance(insert, Opening) and insert.IsRectBoundary:
+        pontos = list(insert.BoundaryRect)
+    elif isinstance(insert, Wall) and isinstance(insert.Location, LocationCurve):
+        curva = insert.Location.Curve
+        pontos = [curva.GetEndPoint(0), curva.GetEndPoint(1)]
+    elif isinstance(insert, FamilyInstance) and isinstance(insert.Location, LocationPoint):
+        largura = _largura_insert(insert)
+        if largura is None:
+            return _extremos_caixa(insert)
+        centro = insert.Location.Point
+        meio = insert.HandOrientation * (largura / 2.0)
+        pontos = [centro - meio, centro + meio]
+    else:
+        return _extremos_caixa(insert)
+    return tuple((p.X, p.Y) for p in pontos)
+
+
+def _extremos_caixa(insert):
+    """Pontos extremos pela caixa envolvente (quando não há outra informação)."""
+    caixa = insert.get_BoundingBox(None)
+    if caixa is None:
+        return None
+    return (caixa.Min.X, caixa.Min.Y), (caixa.Max.X, caixa.Max.Y)
+
+
+def extremos_aberturas(parede, cache=None):
+    """Pares de pontos extremos das aberturas hospedadas na parede.
+
+    Com cache (um dicionário válido durante uma execução), cada parede é
+    consultada uma única vez, mesmo que apareça em vários trechos.
+    """
+    chave = parede.Id.IntegerValue
+    if cache is not None and chave in cache:
+        return cache[chave]
+    doc = parede.Document
+    extremos = []
+    # Aberturas retangulares e paredes embutidas também interrompem a parede
+    for insert_id in parede.FindInserts(True, False, True, True):
+        par = _extremos_insert(doc.GetElement(insert_id))
+        if par is not None:
+            extremos.append(par)
+    if cache is not None:
+        cache[chave] = extremos
+    return extremos
+
+
+def com_aberturas(quadro, parede, cache=None):
+    """Retorna o quadro com o índice das aberturas da parede."""
+    extremos = extremos_aberturas(parede, cache)
+    if not extremos:
+        return quadro
+    return quadro._replace(aberturas=layout_tomadas.indice_aberturas(quadro, extremos))
+
+
+def assinatura_parede(parede, curva):
+    """Assinatura da geometria da parede: curva, largura do tipo e nível."""
+    largura = round(parede.WallType.Width, 6)
+    return assinatura_curva(curva) + (largura, parede.LevelId.IntegerValue)
+
+
+def _quadro_base(parede, curva):
+    """Quadro da parede sem aberturas, reaproveitado enquanto a geometria não muda."""
+    chave = parede.Id.IntegerValue
+    assinatura = assinatura_parede(parede, curva)
+    em_cache = _QUADROS.get(chave)
+    if em_cache is not None and em_cache[0] == assinatura:
+        return em_cache[1]
+
+    largura = parede.WallType.Width  # Em pés
+    if not isinstance(curva, Line):
+        # Parede curva: posição e tangente pela tabela de comprimento de arco
+        tabela = tabela_comprimento_arco(parede, curva)
+        quadro = layout_tomadas.criar_quadro_curvo(tabela, largura)
+    else:
+        quadro = quadro_linha(curva, largura)
+    quadro = quadro._replace(nivel=parede.LevelId.IntegerValue)
+
+    _QUADROS[chave] = (assinatura, quadro)
+    return quadro
+
+
+def quadro_parede(parede, aberturas=True):
+    """Retorna o QuadroParede de uma parede a partir da sua linha de locação.
+
+    O quadro vem do cache enquanto a geometria da parede não muda. Por padrão
+    inclui o índice das aberturas, lido a cada chamada (portas e janelas
+    mudam sem alterar a parede). Retorna None se a parede não tiver uma
+    LocationCurve.
+    """
+    loc_curve = parede.Location
+    if not isinstance(loc_curve, LocationCurve):
+        return None
+    quadro = _quadro_base(parede, loc_curve.Curve)
+    if aberturas:
+        quadro = com_aberturas(quadro, parede)
+    return quadro
+
+
+def quadro_linha(curva, largura):
+    """Cria o QuadroParede de uma curva reta."""
+    inicio = curva.GetEndPoint(0)
+    fim = curva.GetEndPoint(1)
+    return layout_tomadas.criar_quadro(
+        (inicio.X, inicio.Y, inicio.Z),
+        (fim.X, fim.Y, fim.Z),
+        largura,
+    )
+
+
+def _unioes(parede, ids):
+    """Ids das paredes (entre ids) unidas em cada extremidade (0 e 1)."""
+    propria = parede.Id.IntegerValue
+    unioes = []
+    for extremidade in (0, 1):
+        try:
+            elementos = parede.Location.get_ElementsAtJoin(extremidade)
+        except Exception:
+            elementos = []
+        unioes.append(set(
+            e.Id.IntegerValue for e in elementos
+            if e.Id.IntegerValue in ids and e.Id.IntegerValue != propria
+        ))
+    return unioes
+
+
+def cadeias_paredes(paredes):
+    """Agrupa as paredes unidas pelas extremidades em cadeias ordenadas.
+
+    Duas paredes só se ligam quando cada uma é a única parede da seleção
+    unida à extremidade da outra (encontros em T ou em cruz encerram a
+    cadeia). Retorna uma lista de cadeias; cada cadeia é uma lista de pares
+    (parede, invertida), em que invertida indica que a parede é percorrida
+    do fim para o início. O sentido de cada cadeia é o da maioria das suas
+    paredes.
+    """
+    por_id = dict(
+        (p.Id.IntegerValue, p) for p in paredes if isinstance(p.Location, LocationCurve)
+    )
+    unioes = dict((i, _unioes(p, por_id)) for i, p in por_id.items())
+
+    # (parede, extremidade) -> (parede vizinha, extremidade da vizinha)
+    ligacoes = {}
+    for i, extremos in unioes.items():
+        for extremidade, outras in enumerate(extremos):
+            if len(outras) != 1:
+                continue
+            j = next(iter(outras))
+            volta = [f for f in (0, 1) if unioes[j][f] == set([i])]
+            if len(volta) == 1:
+                ligacoes[(i, extremidade)] = (j, volta[0])
+
+    # Começar pelas paredes com uma extremidade livre; as restantes são laços
+    ordem = [p.Id.IntegerValue for p in paredes if p.Id.IntegerValue in por_id]
+    livres = [i for i in ordem if (i, 0) not in ligacoes or (i, 1) not in ligacoes]
+    visitadas = set()
+    cadeias = []
+    for inicio in livres + ordem:
+        if inicio in visitadas:
+            continue
+        atual = inicio
+        entrada = 1 if (inicio, 0) in ligacoes and (inicio, 1) not in ligacoes else 0
+        cadeia = []
+        while atual not in visitadas:
+            visitadas.add(atual)
+            cadeia.append((por_id[atual], entrada == 1))
+            proxima = ligacoes.get((atual, 1 - entrada))
+            if proxima is None:
+                break
+            atual, entrada = proxima
+        if sum(1 for _, invertida in cadeia if invertida) * 2 > len(cadeia):
+            cadeia = [(parede, not invertida) for parede, invertida in reversed(cadeia)]
+        cadeias.append(cadeia)
+    return cadeias
+
+
+def quadros_cadeias(paredes):
+    """Quadros (com aberturas) das cadeias de paredes unidas.
+
+    Retorna a lista de cadeias de quadros, já no sentido de cada cadeia, e
+    a lista das paredes na mesma ordem dos quadros (todas as cadeias).
+    """
+    cadeias = []
+    paredes_ordenadas = []
+    for cadeia in cadeias_paredes(paredes):
+        quadros = []
+        for parede, invertida in cadeia:
+            quadro = quadro_parede(parede)
+            if quadro is None:
+                continue
+            quadros.append(layout_tomadas.inverter_quadro(quadro) if invertida else quadro)
+            paredes_ordenadas.append(parede)
+        if quadros:
+            cadeias.append(quadros)
+    return cadeias, paredes_ordenadas
+
+
+def opcoes_contorno():
+    """Opções de leitura do contorno dos cômodos, na face de acabamento."""
+    opcoes = SpatialElementBoundaryOptions()
+    opcoes.SpatialElementBoundaryLocation = SpatialElementBoundaryLocation.Finish
+    return opcoes
+
+
+def parede_hospedeira(elemento):
+    """Verifica se o elemento é uma parede que pode hospedar tomadas."""
+    return isinstance(elemento, Wall) and elemento.WallType.Kind != WallKind.Curtain
+
+
+def trechos_comodo(comodo, opcoes=None, cache_aberturas=None):
+    """Lê o contorno do cômodo uma única vez.
+
+    Retorna o perímetro total (em pés) e a lista de pares (parede, quadro) dos
+    trechos que têm parede hospedeira, na ordem do contorno, já com o índice
+    das aberturas da parede. Trechos sem parede (linhas de separação,
+    vínculos, paredes cortina) contam no perímetro, mas não recebem tomadas.
+    """
+    doc = comodo.Document
+    perimetro = 0.0
+    trechos = []
+    for laco in comodo.GetBoundarySegments(opcoes or opcoes_contorno()):
+        for segmento in laco:
+            curva = segmento.GetCurve()
+            perimetro += curva.Length
+            parede = doc.GetElement(segmento.ElementId)
+            if not parede_hospedeira(parede) or curva.Length <= 0:
+                continue
+            if isinstance(curva, Line):
+                quadro = quadro_linha(curva, 0.0)
+            else:
+                quadro = layout_tomadas.criar_quadro_curvo(tabela_da_curva(curva), 0.0)
+            trechos.append((parede, com_aberturas(quadro, parede, cache_aberturas)))
+    return perimetro, trechos
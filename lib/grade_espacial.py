@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Grade espacial (hash de células) para consultas de vizinhança.
+
+Cada ponto é guardado na célula cúbica que o contém, identificada pelos
+índices inteiros (i, j, k). Com células do tamanho da tolerância, um ponto
+próximo só pode estar na própria célula ou nas 26 vizinhas; a consulta custa
+O(1) independentemente do número de pontos guardados.
+
+Este módulo não depende do Revit.
+"""
+from math import floor
+
+
+class GradeEspacial(object):
+    """Pontos (x, y, z) agrupados em células cúbicas de tamanho fixo."""
+
+    def __init__(self, tamanho_celula, pontos=None):
+        if tamanho_celula <= 0:
+            raise ValueError("O tamanho da célula deve ser positivo.")
+        self.tamanho_celula = float(tamanho_celula)
+        self._celulas = {}
+        self._total = 0
+        for ponto in pontos or []:
+            self.adicionar(ponto)
+
+    def __len__(self):
+        return self._total
+
+    def _celula(self, ponto):
+        t = self.tamanho_celula
+        return (int(floor(ponto[0] / t)), int(floor(ponto[1] / t)), int(floor(ponto[2] / t)))
+
+    def adicionar(self, ponto, valor=None):
+        """Guarda o ponto (e um valor associado, como o id do elemento)."""
+        self._celulas.setdefault(self._celula(ponto), []).append((tuple(ponto), valor))
+        self._total += 1
+
+    def vizinhos(self, ponto, tolerancia):
+        """Gera os pares (ponto, valor) a até tolerancia do ponto."""
+        alcance = max(1, int(-(-tolerancia // self.tamanho_celula)))
+        i, j, k = self._celula(ponto)
+        limite = tolerancia * tolerancia
+        for di in range(-alcance, alcance + 1):
+            for dj in range(-alcance, alcance + 1):
+                for dk in range(-alcance, alcance + 1):
+                    for outro, valor in self._celulas.get((i + di, j + dj, k + dk), ()):
+                        dx = outro[0] - ponto[0]
+                        dy = outro[1] - ponto[1]
+                        dz = outro[2] - ponto[2]
+                        if dx * dx + dy * dy + dz * dz <= limite:
+                            yield outro, valor
+
+    def existe_proximo(self, ponto, tolerancia):
+        """Verifica se há algum ponto guardado a até tolerancia do ponto."""
+        for _ in self.vizinhos(ponto, tolerancia):
+            return True
+        return False
+
+
+def indices_livres(grade, pontos, tolerancia):
+    """Índices dos pontos sem vizinho na grade, na ordem recebida.
+
+    Cada ponto aceito é guardado na grade, de modo que pontos repetidos na
+    própria lista também são descartados.
+    """
+    livres = []
+    for i, ponto in enumerate(pontos):
+        if not grade.existe_proximo(ponto, tolerancia):
+            grade.adicionar(ponto, i)
+            livres.append(i)
+    return livres
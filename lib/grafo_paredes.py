@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""Grafo de adjacência das paredes para medir rotas ao longo delas.
+
+Os trechos (eixos das paredes, em planta) viram arestas de um grafo. As
+extremidades próximas são unidas por uma grade espacial (ver grade_espacial),
+e uma extremidade que encosta no meio de outra parede (encontro em T) divide
+essa parede em duas arestas. Os segmentos ficam também em uma grade de
+células, usada para ancorar qualquer ponto (tomada, painel) no trecho mais
+próximo.
+
+A distância de rota entre dois pontos é a soma do afastamento de cada ponto
+até a sua parede com o menor caminho entre as âncoras pelo grafo: A* para
+um par de pontos, ou Dijkstra a partir de uma origem para medir vários
+destinos com uma única busca.
+
+Este módulo não depende do Revit.
+"""
+from bisect import bisect_right
+from heapq import heappop, heappush
+from math import floor, sqrt
+
+from grade_espacial import GradeEspacial
+
+
+# Distância (pés) abaixo da qual duas extremidades são o mesmo nó (~0,30 m)
+TOLERANCIA_UNIAO = 1.0
+
+# Afastamento máximo (pés) de um ponto até a parede em que ele é ancorado (~3 m)
+AFASTAMENTO_MAXIMO = 10.0
+
+
+def _projetar(ponto, a, b):
+    """Parâmetro (0 a 1) e distância da projeção do ponto no segmento ab."""
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    comprimento2 = dx * dx + dy * dy
+    if comprimento2 <= 0:
+        t = 0.0
+    else:
+        t = ((ponto[0] - a[0]) * dx + (ponto[1] - a[1]) * dy) / comprimento2
+        t = min(1.0, max(0.0, t))
+    px = a[0] + t * dx - ponto[0]
+    py = a[1] + t * dy - ponto[1]
+    return t, sqrt(px * px + py * py)
+
+
+class Ancora(object):
+    """Ponto preso a um segmento: nós vizinhos e custo até cada um."""
+
+    __slots__ = ('segmento', 't', 'afastamento', 'ligacoes', 'ponto')
+
+    def __init__(self, segmento, t, afastamento, ligacoes, ponto):
+        self.segmento = segmento
+        self.t = t
+        self.afastamento = afastamento
+        # [(nó, distância ao longo da parede)]
+        self.ligacoes = ligacoes
+        self.ponto = ponto
+
+
+class GrafoParedes(object):
+    """Grafo das paredes de um nível, com consultas de distância de rota."""
+
+    def __init__(self, trechos, tolerancia=TOLERANCIA_UNIAO):
+        """trechos são polilinhas [(x, y), ...] (uma por parede)."""
+        self.tolerancia = float(tolerancia)
+        self.tamanho_celula = max(4.0 * self.tolerancia, 5.0)
+        self.nos = []
+        self.segmentos = []
+        # Por segmento: parâmetros (0 a 1) ordenados e os nós correspondentes
+        self._parametros = []
+        self._nos_segmento = []
+        self._celulas = {}
+        self.vizinhos = {}
+        self._montar(trechos)
+
+    def __len__(self):
+        return len(self.nos)
+
+    # Montagem
+
+    def _no(self, grade, ponto):
+        """Nó da extremidade, unindo-a a um nó existente dentro da tolerância."""
+        for _, no in grade.vizinhos((ponto[0], ponto[1], 0.0), self.tolerancia):
+            return no
+        no = len(self.nos)
+        self.nos.append((float(ponto[0]), float(ponto[1])))
+        grade.adicionar((ponto[0], ponto[1], 0.0), no)
+        return no
+
+    def _celulas_caixa(self, x0, y0, x1, y1):
+        """Células da grade de segmentos que cobrem a caixa."""
+        t = self.tamanho_celula
+        for i in range(int(floor(x0 / t)), int(floor(x1 / t)) + 1):
+            for j in range(int(floor(y0 / t)), int(floor(y1 / t)) + 1):
+                yield (i, j)
+
+    def _segmentos_proximos(self, ponto, raio):
+        """Índices dos segmentos cuja caixa passa a até raio do ponto."""
+        encontrados = set()
+        for celula in self._celulas_caixa(ponto[0] - raio, ponto[1] - raio,
+                                          ponto[0] + raio, ponto[1] + raio):
+            encontrados.update(self._celulas.get(celula, ()))
+        return encontrados
+
+    def _montar(self, trechos):
+        grade = GradeEspacial(self.tolerancia)
+        extremos = []
+        for trecho in trechos:
+            for a, b in zip(trecho[:-1], trecho[1:]):
+                if a[0] == b[0] and a[1] == b[1]:
+                    continue
+                indice = len(self.segmentos)
+                self.segmentos.append(((float(a[0]), float(a[1])), (float(b[0]), float(b[1]))))
+                extremos.append((self._no(grade, a), self._no(grade, b)))
+                tol = self.tolerancia
+                for celula in self._celulas_caixa(min(a[0], b[0]) - tol, min(a[1], b[1]) - tol,
+                                                  max(a[0], b[0]) + tol, max(a[1], b[1]) + tol):
+                    self._celulas.setdefault(celula, []).append(indice)
+
+        # Divisões de cada segmento: as extremidades e os encontros em T
+        divisoes = [{0.0: inicio, 1.0: fim} for inicio, fim in extremos]
+        for no, ponto in enumerate(self.nos):
+            for indice in self._segmentos_proximos(ponto, self.tolerancia):
+                if no in extremos[indice]:
+                    continue
+                a, b = self.segmentos[indice]
+                t, distancia = _projetar(ponto, a, b)
+                if distancia <= self.tolerancia and 0.0 < t < 1.0:
+                    divisoes[indice][t] = no
+
+        for indice, divisao in enumerate(divisoes):
+            parametros = sorted(divisao)
+            nos = [divisao[t] for t in parametros]
+            self._parametros.append(parametros)
+            self._nos_segmento.append(nos)
+            comprimento = self._comprimento(indice)
+            for k in range(len(nos) - 1):
+                peso = (parametros[k + 1] - parametros[k]) * comprimento
+                self._ligar(nos[k], nos[k + 1], peso)
+
+    def _comprimento(self, indice):
+        a, b = self.segmentos[indice]
+        return sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2)
+
+    def _ligar(self, u, v, peso):
+        if u == v:
+            return
+        self.vizinhos.setdefault(u, []).append((v, peso))
+        self.vizinhos.setdefault(v, []).append((u, peso))
+
+    # Consultas
+
+    def ancorar(self, ponto, afastamento_maximo=AFASTAMENTO_MAXIMO):
+        """Âncora do ponto (x, y) no segmento mais próximo, ou None."""
+        raio = self.tamanho_celula
+        while True:
+            melhor = None
+            for indice in self._segmentos_proximos(ponto, raio):
+                a, b = self.segmentos[indice]
+                t, distancia = _projetar(ponto, a, b)
+                if melhor is None or distancia < melhor[2]:
+                    melhor = (indice, t, distancia)
+            # Só é o mais próximo se estiver dentro do raio já pesquisado
+            if melhor is not None and melhor[2] <= raio:
+                break
+            if raio >= afastamento_maximo:
+                break
+            raio = min(2 * raio, afastamento_maximo)
+        if melhor is None or melhor[2] > afastamento_maximo:
+            return None
+
+        indice, t, afastamento = melhor
+        parametros = self._parametros[indice]
+        nos = self._nos_segmento[indice]
+        comprimento = self._comprimento(indice)
+        k = min(max(bisect_right(parametros, t) - 1, 0), len(parametros) - 2)
+        ligacoes = [
+            (nos[k], (t - parametros[k]) * comprimento),
+            (nos[k + 1], (parametros[k + 1] - t) * comprimento),
+        ]
+        a, b = self.segmentos[indice]
+        projecao = (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1]))
+        return Ancora((indice, k), t, afastamento, ligacoes, projecao)
+
+    def _trecho_direto(self, origem, destino):
+        """Distância entre duas âncoras no mesmo trecho entre nós, ou None."""
+        if origem.segmento != destino.segmento:
+            return None
+        return abs(origem.t - destino.t) * self._comprimento(origem.segmento[0])
+
+    def distancia(self, origem, destino):
+        """Distância de rota (A*) entre dois pontos (x, y), ou None."""
+        inicio = self.ancorar(origem)
+        fim = self.ancorar(destino)
+        if inicio is None or fim is None:
+            return None
+        extra = inicio.afastamento + fim.afastamento
+        melhor = self._trecho_direto(inicio, fim)
+
+        saidas = dict(fim.ligacoes)
+        alvo = fim.ponto
+
+        def estimativa(no):
+            x, y = self.nos[no]
+            return sqrt((x - alvo[0]) ** 2 + (y - alvo[1]) ** 2)
+
+        custos = {}
+        fila = []
+        for no, custo in inicio.ligacoes:
+            if custo < custos.get(no, float('inf')):
+                custos[no] = custo
+                heappush(fila, (custo + estimativa(no), custo, no))
+        while fila:
+            previsto, custo, no = heappop(fila)
+            if melhor is not None and previsto >= melhor:
+                break
+            if custo > custos.get(no, float('inf')):
+                continue
+            if no in saidas:
+                total = custo + saidas[no]
+                if melhor is None or total < melhor:
+                    melhor = total
+            for vizinho, peso in self.vizinhos.get(no, ()):
+                novo = custo + peso
+                if novo < custos.get(vizinho, float('inf')):
+                    custos[vizinho] = novo
+                    heappush(fila, (novo + estimativa(vizinho), novo, vizinho))
+
+        if melhor is None:
+            return None
+        return melhor + extra
+
+    def a_partir_de(self, origem):
+        """Mapa de distâncias (Dijkstra) a partir de um ponto, ou None."""
+        inicio = self.ancorar(origem)
+        if inicio is None:
+            return None
+        custos = {}
+        fila = []
+        for no, custo in inicio.ligacoes:
+            if custo < custos.get(no, float('inf')):
+                custos[no] = custo
+                heappush(fila, (custo, no))
+        while fila:
+            custo, no = heappop(fila)
+            if custo > custos.get(no, float('inf')):
+                continue
+            for vizinho, peso in self.vizinhos.get(no, ()):
+                novo = custo + peso
+                if novo < custos.get(vizinho, float('inf')):
+                    custos[vizinho] = novo
+                    heappush(fila, (novo, vizinho))
+        return MapaDistancias(self, inicio, custos)
+
+
+class MapaDistancias(object):
+    """Distâncias de rota de uma origem fixa até qualquer ponto."""
+
+    def __init__(self, grafo, origem, custos):
+        self.grafo = grafo
+        self.origem = origem
+        self.custos = custos
+
+    def ate(self, destino):
+        """Distância de rota da origem até o ponto (x, y), ou None."""
+        fim = self.grafo.ancorar(destino)
+        if fim is None:
+            return None
+        melhor = self.grafo._trecho_direto(self.origem, fim)
+        for no, custo in fim.ligacoes:
+            if no in self.custos:
+                total = self.custos[no] + custo
+                if melhor is None or total < melhor:
+                    melhor = total
+        if melhor is None:
+            return None
+        return melhor + self.origem.afastamento + fim.afastamento
@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+"""Planejamento dos pontos de inserção das tomadas ao longo de paredes.
+
+Cada parede é descrita por um quadro simples (origem, direção, normal,
+largura e comprimento) e as regras de espaçamento são aplicadas a várias
+paredes de uma só vez. O resultado são listas planas de coordenadas (em pés);
+os objetos XYZ do Revit só são criados no momento da inserção.
+
+Paredes curvas carregam uma tabela de comprimento de arco, montada uma vez
+a partir da curva discretizada (com a tangente de cada vértice); a posição e
+a tangente em qualquer distância são obtidas por busca binária nessa tabela
+e interpolação no segmento. Arcos de circunferência são avaliados
+exatamente pelo centro, raio e ângulo inicial.
+
+Portas e janelas hospedadas na parede formam um índice de intervalos
+ordenados ao longo do quadro; os pontos que caem dentro de uma abertura são
+deslocados para a borda livre mais próxima (ou descartados) com busca
+binária.
+
+Paredes unidas podem formar uma cadeia (um corredor, por exemplo): as
+tomadas são espaçadas ao longo do comprimento desenvolvido da cadeia e cada
+distância é levada à sua parede por um vetor de comprimentos acumulados,
+com busca binária. Os quadros das paredes percorridas no sentido contrário
+ao da cadeia são invertidos, de modo que a face escolhida é sempre o mesmo
+lado da cadeia.
+
+Este módulo não depende do Revit. Quando o NumPy está disponível (CPython,
+testes e medições), o mapeamento dos pontos é vetorizado.
+"""
+from bisect import bisect_right
+from collections import namedtuple
+from math import atan2, cos, sin
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Quadro de uma parede: origem (x, y, z) no início da linha de locação,
+# direção e normal unitárias (x, y), largura/comprimento em pés, para
+# paredes curvas a tabela de comprimento de arco da linha de locação, se
+# conhecido o índice das aberturas (IndiceAberturas) da parede, o ângulo da
+# direção com o eixo X (radianos) e o id do nível. Os quadros são imutáveis
+# e podem ser compartilhados entre o cálculo, a pré-visualização e a inserção.
+QuadroParede = namedtuple(
+    'QuadroParede',
+    ['origem', 'direcao', 'normal', 'largura', 'comprimento', 'tabela', 'aberturas',
+     'angulo', 'nivel']
+)
+QuadroParede.__new__.__defaults__ = (None, None, None, None)
+
+# Regras de espaçamento: número de tomadas, comprimento do intervalo (None para
+# usar a parede inteira), altura e face ('Frontal', 'Traseira' ou None), em pés
+RegraEspacamento = namedtuple(
+    'RegraEspacamento', ['numero', 'intervalo', 'altura', 'face']
+)
+
+# Folga mínima entre uma tomada e a borda de uma abertura (pés, ~0,15 m)
+MARGEM_ABERTURA = 0.5
+
+# Folga mínima entre uma tomada e os cantos de uma cadeia de paredes (pés)
+MARGEM_CANTO = 0.5
+
+# Pontos planejados: coordenadas planas, índice da parede de cada ponto,
+# distância do ponto ao início da parede, direção da parede no ponto e
+# ângulo da direção com o eixo X (para a rotação das tomadas)
+PlanoPontos = namedtuple(
+    'PlanoPontos', ['xs', 'ys', 'zs', 'paredes', 'distancias', 'dxs', 'dys', 'angulos']
+)
+
+
+class TabelaComprimentoArco(object):
+    """Tabela de comprimento de arco de uma curva discretizada.
+
+    Guarda os vértices da curva e o comprimento acumulado até cada um; o
+    segmento que contém uma distância s é obtido por busca binária (O(log n)).
+
+    Com a tangente unitária (x, y) de cada vértice (amostrada uma vez, na
+    montagem), a posição e a tangente são interpoladas no segmento por uma
+    cúbica de Hermite, que passa pelos vértices com as tangentes da curva;
+    sem elas, pela corda do segmento. Arcos de circunferência (arco =
+    (centro x, centro y, raio, ângulo inicial, sentido +1/-1)) são avaliados
+    exatamente, sem busca. Se o comprimento real da curva for informado, o
+    acumulado é ajustado a ele. Nenhuma avaliação chama a API do Revit.
+    """
+
+    def __init__(self, pontos, tangentes=None, arco=None, comprimento=None):
+        if len(pontos) < 2:
+            raise ValueError("A curva precisa de pelo menos dois pontos.")
+        if tangentes is not None and len(tangentes) != len(pontos):
+            raise ValueError("É preciso uma tangente por vértice.")
+        self.pontos = [tuple(p) for p in pontos]
+        self.tangentes = [tuple(t) for t in tangentes] if tangentes is not None else None
+        self.arco = tuple(arco) if arco is not None else None
+        self.acumulado = [0.0]
+        for a, b in zip(self.pontos, self.pontos[1:]):
+            passo = ((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2 + (b[2] - a[2]) ** 2) ** 0.5
+            self.acumulado.append(self.acumulado[-1] + passo)
+        if comprimento and self.acumulado[-1]:
+            escala = comprimento / self.acumulado[-1]
+            self.acumulado = [a * escala for a in self.acumulado]
+
+    @property
+    def comprimento(self):
+        """Comprimento total da curva."""
+        return self.acumulado[-1]
+
+    def _segmento(self, s):
+        """Índice do segmento que contém a distância s."""
+        i = bisect_right(self.acumulado, s) - 1
+        return min(max(i, 0), len(self.pontos) - 2)
+
+    def avaliar(self, s):
+        """Retorna o ponto (x, y, z) e a tangente unitária (x, y) na distância s."""
+        s = min(max(s, 0.0), self.comprimento)
+        if self.arco is not None:
+            cx, cy, raio, inicio, sentido = self.arco
+            angulo = inicio + sentido * s / raio
+            c = cos(angulo)
+            n = sin(angulo)
+            return (cx + raio * c, cy + raio * n, self.pontos[0][2]), (-n * sentido, c * sentido)
+        i = self._segmento(s)
+        passo = self.acumulado[i + 1] - self.acumulado[i]
+        t = (s - self.acumulado[i]) / passo if passo else 0.0
+        a = self.pontos[i]
+        b = self.pontos[i + 1]
+        z = a[2] + (b[2] - a[2]) * t
+        if self.tangentes is None:
+            dx = b[0] - a[0]
+            dy = b[1] - a[1]
+            ponto = (a[0] + dx * t, a[1] + dy * t, z)
+        else:
+            # Hermite cúbica com as tangentes dos vértices (escaladas pela corda)
+            corda = ((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2) ** 0.5
+            ta = self.tangentes[i]
+            tb = self.tangentes[i + 1]
+            t2 = t * t
+            t3 = t2 * t
+            h00, h10, h01, h11 = 2 * t3 - 3 * t2 + 1, t3 - 2 * t2 + t, 3 * t2 - 2 * t3, t3 - t2
+            d00, d10, d01, d11 = 6 * t2 - 6 * t, 3 * t2 - 4 * t + 1, 6 * t - 6 * t2, 3 * t2 - 2 * t
+            ponto = tuple(
+                h00 * a[k] + h10 * corda * ta[k] + h01 * b[k] + h11 * corda * tb[k]
+                for k in (0, 1)
+            ) + (z,)
+            dx, dy = (
+                d00 * a[k] + d10 * corda * ta[k] + d01 * b[k] + d11 * corda * tb[k]
+                for k in (0, 1)
+            )
+        norma = (dx * dx + dy * dy) ** 0.5 or 1.0
+        return ponto, (dx / norma, dy / norma)
+
+    def invertida(self):
+        """Tabela da mesma curva percorrida do fim para o início."""
+        tangentes = None
+        if self.tangentes is not None:
+            tangentes = [(-tx, -ty) for tx, ty in reversed(self.tangentes)]
+        arco = None
+        if self.arco is not None:
+            cx, cy, raio, inicio, sentido = self.arco
+            arco = (cx, cy, raio, inicio + sentido * self.comprimento / raio, -sentido)
+        return TabelaComprimentoArco(self.pontos[::-1], tangentes, arco, self.comprimento)
+
+    def projetar(self, ponto):
+        """Retorna a distância, ao longo da curva, do ponto (x, y) mais próximo."""
+        melhor = None
+        for i, (a, b) in enumerate(zip(self.pontos, self.pontos[1:])):
+            dx = b[0] - a[0]
+            dy = b[1] - a[1]
+            norma2 = dx * dx + dy * dy
+            t = ((ponto[0] - a[0]) * dx + (ponto[1] - a[1]) * dy) / norma2 if norma2 else 0.0
+            t = min(max(t, 0.0), 1.0)
+            ex = a[0] + dx * t - ponto[0]
+            ey = a[1] + dy * t - ponto[1]
+            distancia2 = ex * ex + ey * ey
+            if melhor is None or distancia2 < melhor[0]:
+                passo = self.acumulado[i + 1] - self.acumulado[i]
+                melhor = (distancia2, self.acumulado[i] + passo * t)
+        return melhor[1]
+
+
+class IndiceAberturas(object):
+    """Intervalos ocupados pelas aberturas de uma parede, ordenados.
+
+    Os intervalos são ampliados pela margem e unidos na construção; assim
+    ficam disjuntos e a abertura que contém uma distância é encontrada por
+    busca binária (O(log n)) sobre os inícios.
+    """
+
+    def __init__(self, intervalos, margem=MARGEM_ABERTURA):
+        unidos = []
+        for inicio, fim in sorted((min(a, b) - margem, max(a, b) + margem) for a, b in intervalos):
+            if unidos and inicio <= unidos[-1][1]:
+                unidos[-1][1] = max(unidos[-1][1], fim)
+            else:
+                unidos.append([inicio, fim])
+        self.inicios = [inicio for inicio, _ in unidos]
+        self.fins = [fim for _, fim in unidos]
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def abertura_em(self, s):
+        """Retorna o intervalo (início, fim) que contém s, ou None."""
+        i = bisect_right(self.inicios, s) - 1
+        if i >= 0 and self.inicios[i] < s < self.fins[i]:
+            return self.inicios[i], self.fins[i]
+        return None
+
+    def ajustar(self, s, comprimento):
+        """Desloca s para a borda livre mais próxima, dentro da parede.
+
+        Retorna s se ele já estiver livre e None se não houver borda livre.
+        """
+        abertura = self.abertura_em(s)
+        if abertura is None:
+            return s
+        candidatos = [b for b in abertura if 0.0 <= b <= comprimento]
+        if not candidatos:
+            return None
+        return min(candidatos, key=lambda b: abs(b - s))
+
+    def ajustar_distancias(self, distancias, comprimento):
+        """Ajusta as distâncias de uma parede, descartando as repetidas."""
+        ajustadas = []
+        for s in distancias:
+            s = self.ajustar(s, comprimento)
+            # As distâncias chegam em ordem; basta comparar com a anterior
+            if s is None or (ajustadas and abs(s - ajustadas[-1]) < 1e-6):
+                continue
+            ajustadas.append(s)
+        return ajustadas
+
+
+def criar_quadro(inicio, fim, largura):
+    """Cria o quadro de uma parede reta a partir dos pontos inicial e final."""
+    dx = fim[0] - inicio[0]
+    dy = fim[1] - inicio[1]
+    comprimento = (dx * dx + dy * dy) ** 0.5
+    if comprimento == 0:
+        raise ValueError("A parede não tem comprimento.")
+    direcao = (dx / comprimento, dy / comprimento)
+    normal = (-direcao[1], direcao[0])
+    return QuadroParede(
+        tuple(inicio), direcao, normal, largura, comprimento,
+        angulo=atan2(direcao[1], direcao[0]),
+    )
+
+
+def criar_quadro_curvo(tabela, largura):
+    """Cria o quadro de uma parede curva a partir da tabela de comprimento de arco.
+
+    A direção e a normal do quadro são as do início da curva; nos pontos
+    planejados valem a tangente e a normal locais, obtidas pela tabela.
+    """
+    origem, direcao = tabela.avaliar(0.0)
+    normal = (-direcao[1], direcao[0])
+    return QuadroParede(
+        origem, direcao, normal, largura, tabela.comprimento, tabela,
+        angulo=atan2(direcao[1], direcao[0]),
+    )
+
+
+def inverter_quadro(quadro):
+    """Quadro da mesma parede percorrida do fim para o início.
+
+    A direção, a normal, a tabela de comprimento de arco e as aberturas são
+    invertidas; a face frontal do quadro invertido é a traseira da parede.
+    """
+    comprimento = quadro.comprimento
+    aberturas = quadro.aberturas
+    if aberturas is not None:
+        # Os intervalos já estão ampliados pela margem e unidos
+        aberturas = IndiceAberturas(
+            [(comprimento - fim, comprimento - inicio)
+             for inicio, fim in zip(aberturas.inicios, aberturas.fins)],
+            margem=0.0,
+        )
+    if quadro.tabela is not None:
+        invertido = criar_quadro_curvo(
+            quadro.tabela.invertida(), quadro.largura
+        )
+    else:
+        (ox, oy, oz), (dx, dy) = quadro.origem, quadro.direcao
+        direcao = (-dx, -dy)
+        invertido = QuadroParede(
+            (ox + dx * comprimento, oy + dy * comprimento, oz), direcao, (dy, -dx),
+            quadro.largura, comprimento, angulo=atan2(direcao[1], direcao[0]),
+        )
+    return invertido._replace(aberturas=aberturas, nivel=quadro.nivel)
+
+
+def posicao_e_direcao(quadro, s):
+    """Retorna o ponto (x, y, z) e a direção (x, y) da parede na distância s."""
+    if quadro.tabela is not None:
+        return quadro.tabela.avaliar(s)
+    (ox, oy, oz), (dx, dy) = quadro.origem, quadro.direcao
+    return (ox + dx * s, oy + dy * s, oz), (dx, dy)
+
+
+def angulo_no_ponto(quadro, direcao):
+    """Ângulo da parede no ponto: o do quadro, ou o da tangente se for curva."""
+    if quadro.tabela is None and quadro.angulo is not None:
+        return quadro.angulo
+    return atan2(direcao[1], direcao[0])
+
+
+def projetar_no_quadro(quadro, ponto):
+    """Distância, ao longo do quadro, da projeção do ponto (x, y)."""
+    if quadro.tabela is not None:
+        return quadro.tabela.projetar(ponto)
+    (ox, oy, _), (dx, dy) = quadro.origem, quadro.direcao
+    return (ponto[0] - ox) * dx + (ponto[1] - oy) * dy
+
+
+def indice_aberturas(quadro, extremos, margem=MARGEM_ABERTURA):
+    """Cria o IndiceAberturas do quadro a partir dos pares de pontos extremos."""
+    intervalos = [
+        (projetar_no_quadro(quadro, p1), projetar_no_quadro(quadro, p2))
+        for p1, p2 in extremos
+    ]
+    return IndiceAberturas(intervalos, margem)
+
+
+def sinal_face(face):
+    """Retorna +1 para a face frontal, -1 para a traseira e 0 para o eixo."""
+    if face == 'Frontal':
+        return 1.0
+    if face == 'Traseira':
+        return -1.0
+    return 0.0
+
+
+def distancias_ao_longo(comprimento, numero, intervalo=None):
+    """Distâncias (a partir do início da parede) das tomadas no intervalo.
+
+    O intervalo é centralizado na parede e limitado ao comprimento dela; as
+    tomadas são distribuídas igualmente a partir do início do intervalo.
+    """
+    if intervalo is None or intervalo > comprimento:
+        intervalo = comprimento
+    inicio = (comprimento - intervalo) / 2.0
+    if numero == 1:
+        return [inicio]
+    espacamento = intervalo / float(numero - 1)
+    return [inicio + espacamento * i for i in range(numero)]
+
+
+def planejar_pontos(quadros, regras):
+    """Calcula os pontos de inserção para várias paredes de uma só vez.
+
+    regras pode ser uma única RegraEspacamento (aplicada a todas as paredes)
+    ou uma lista com uma regra por parede.
+    """
+    if isinstance(regras, RegraEspacamento):
+        regras = [regras] * len(quadros)
+
+    paredes = []
+    distancias = []
+    for indice, (quadro, regra) in enumerate(zip(quadros, regras)):
+        ds = distancias_ao_longo(quadro.comprimento, regra.numero, regra.intervalo)
+        if quadro.aberturas:
+            ds = quadro.aberturas.ajustar_distancias(ds, quadro.comprimento)
+        distancias.extend(ds)
+        paredes.extend([indice] * len(ds))
+
+    deslocamentos = [
+        sinal_face(regra.face) * quadro.largura / 2.0
+        for quadro, regra in zip(quadros, regras)
+    ]
+    alturas = [regra.altura for regra in regras]
+
+    if numpy is not None:
+        return _mapear_numpy(quadros, deslocamentos, alturas, paredes, distancias)
+    return _mapear_python(quadros, deslocamentos, alturas, paredes, distancias)
+
+
+def planejar_cadeias(cadeias, regra, margem=MARGEM_CANTO):
+    """Calcula os pontos de várias cadeias de paredes unidas de uma só vez.
+
+    cadeias é uma lista de listas de quadros, na ordem e no sentido de cada
+    cadeia (ver inverter_quadro). A regra vale para a cadeia inteira: o
+    número de tomadas e o intervalo são medidos no comprimento desenvolvido.
+    O índice de parede de cada ponto é o índice global do quadro (contando
+    os quadros de todas as cadeias, na ordem recebida).
+    """
+    quadros = []
+    paredes = []
+    distancias = []
+    for cadeia in cadeias:
+        base = len(quadros)
+        quadros.extend(cadeia)
+        # Comprimento acumulado: busca binária da parede de cada ponto
+        acumulado = [0.0]
+        for quadro in cadeia:
+            acumulado.append(acumulado[-1] + quadro.comprimento)
+
+        for s in distancias_ao_longo(acumulado[-1], regra.numero, regra.intervalo):
+            i = min(bisect_right(acumulado, s) - 1, len(cadeia) - 1)
+            quadro = cadeia[i]
+            local = s - acumulado[i]
+            # Afastar dos cantos (encontros das paredes e extremidades)
+            folga = min(margem, quadro.comprimento / 2.0)
+            local = min(max(local, folga), quadro.comprimento - folga)
+            if quadro.aberturas:
+                local = quadro.aberturas.ajustar(local, quadro.comprimento)
+                if local is None:
+                    continue
+            # Pontos levados à mesma posição (por uma abertura ou canto) contam uma vez
+            if paredes and paredes[-1] == base + i and abs(distancias[-1] - local) < 1e-6:
+                continue
+            paredes.append(base + i)
+            distancias.append(local)
+
+    deslocamentos = [sinal_face(regra.face) * quadro.largura / 2.0 for quadro in quadros]
+    alturas = [regra.altura] * len(quadros)
+
+    if numpy is not None:
+        return _mapear_numpy(quadros, deslocamentos, alturas, paredes, distancias)
+    return _mapear_python(quadros, deslocamentos, alturas, paredes, distancias)
+
+
+def _mapear_python(quadros, deslocamentos, alturas, paredes, distancias):
+    """Converte as distâncias em coordenadas (Python puro)."""
+    xs = []
+    ys = []
+    zs = []
+    dxs = []
+    dys = []
+    angulos = []
+    for indice, s in zip(paredes, distancias):
+        quadro = quadros[indice]
+        (px, py, pz), (dx, dy) = posicao_e_direcao(quadro, s)
+        deslocamento = deslocamentos[indice]
+        # A normal é sempre a perpendicular à direção local da parede
+        xs.append(px - dy * deslocamento)
+        ys.append(py + dx * deslocamento)
+        zs.append(pz + alturas[indice])
+        dxs.append(dx)
+        dys.append(dy)
+        angulos.append(angulo_no_ponto(quadro, (dx, dy)))
+    return PlanoPontos(xs, ys, zs, paredes, distancias, dxs, dys, angulos)
+
+
+def _mapear_numpy(quadros, deslocamentos, alturas, paredes, distancias):
+    """Converte as distâncias em coordenadas (vetorizado com NumPy)."""
+    indices = numpy.asarray(paredes, dtype=numpy.intp)
+    s = numpy.asarray(distancias, dtype=float)
+    origens = numpy.asarray([q.origem for q in quadros], dtype=float).reshape(-1, 3)
+    direcoes = numpy.asarray([q.direcao for q in quadros], dtype=float).reshape(-1, 2)
+
+    px = origens[indices, 0] + direcoes[indices, 0] * s
+    py = origens[indices, 1] + direcoes[indices, 1] * s
+    pz = origens[indices, 2].copy()
+    dxs = direcoes[indices, 0].copy()
+    dys = direcoes[indices, 1].copy()
+
+    # Paredes curvas: posição e tangente pela tabela de comprimento de arco
+    curvas = [i for i, q in enumerate(quadros) if q.tabela is not None]
+    if curvas:
+        for k in numpy.nonzero(numpy.isin(indices, curvas))[0]:
+            (px[k], py[k], pz[k]), (dxs[k], dys[k]) = quadros[indices[k]].tabela.avaliar(s[k])
+
+    deslocamento = numpy.asarray(deslocamentos, dtype=float)[indices]
+    xs = px - dys * deslocamento
+    ys = py + dxs * deslocamento
+    zs = pz + numpy.asarray(alturas, dtype=float)[indices]
+    angulos = numpy.arctan2(dys, dxs)
+    return PlanoPontos(xs, ys, zs, indices, s, dxs, dys, angulos)
+
+
+def iterar_pontos(plano):
+    """Gera as tuplas (x, y, z) do plano, com NumPy ou listas."""
+    return zip(_como_lista(plano.xs), _como_lista(plano.ys), _como_lista(plano.zs))
+
+
+def iterar_direcoes(plano):
+    """Gera as direções (x, y) da parede em cada ponto do plano."""
+    return zip(_como_lista(plano.dxs), _como_lista(plano.dys))
+
+
+def iterar_angulos(plano):
+    """Gera o ângulo (radianos) da parede em cada ponto do plano."""
+    return iter(_como_lista(plano.angulos))
+
+
+def indices_paredes(plano):
+    """Retorna o índice da parede de cada ponto do plano, como lista."""
+    return _como_lista(plano.paredes)
+
+
+def _como_lista(valores):
+    """Converte um array do NumPy em lista, se necessário."""
+    if numpy is not None and isinstance(valores, numpy.ndarray):
+        return valores.tolist()
+    return valores
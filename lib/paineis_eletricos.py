@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Índice dos painéis elétricos do documento para atribuição automática.
+
+Cada painel vira um RegistroPainel (id, nome, nível, tensões do sistema de
+distribuição, fases e polos livres) e as posições vão para uma árvore k-d
+(ver arvore_kd). O painel compatível mais próximo de um circuito é então uma
+consulta O(log n), sem caixas de diálogo.
+
+Os circuitos existentes são lidos em uma única passada (ElectricalSystem e o
+seu BaseEquipment) para calcular os polos ocupados de cada painel.
+
+O índice fica guardado no AppDomain do pyRevit, como o catálogo de famílias,
+e é descartado pelo evento DocumentChanged quando painéis ou circuitos são
+adicionados, removidos ou alterados.
+"""
+from collections import namedtuple
+
+from Autodesk.Revit.DB import (
+    BuiltInCategory,
+    BuiltInParameter,
+    ElementCategoryFilter,
+    ElementClassFilter,
+    FamilyInstance,
+    FilteredElementCollector,
+    LogicalOrFilter,
+)
+from Autodesk.Revit.DB.Electrical import ElectricalPhase, ElectricalSystem
+
+from pyrevit import HOST_APP
+from pyrevit.coreutils import envvars
+
+from arvore_kd import ArvoreKD
+from catalogo_familias import chave_documento
+import unidades_revit
+
+
+# Chaves usadas para guardar o estado no AppDomain do pyRevit
+CHAVE_INDICE = 'TOMADAS_INDICE_PAINEIS'
+CHAVE_MONITORAMENTO = 'TOMADAS_INDICE_PAINEIS_MONITORADO'
+
+# Diferença relativa aceita entre a tensão do circuito e a do painel
+TOLERANCIA_TENSAO = 0.05
+
+# Registro leve de um painel (sem referência ao elemento do Revit)
+RegistroPainel = namedtuple(
+    'RegistroPainel', ['painel_id', 'nome', 'nivel_id', 'tensoes', 'fases', 'polos_livres']
+)
+
+
+def _sistema_distribuicao(doc, painel):
+    """Tensões (V) e número de fases do sistema de distribuição do painel."""
+    parametro = painel.get_Parameter(BuiltInParameter.RBS_FAMILY_CONTENT_DISTRIBUTION_SYSTEM)
+    sistema = doc.GetElement(parametro.AsElementId()) if parametro and parametro.HasValue else None
+    if sistema is None:
+        return (), None
+    tensoes = []
+    for tensao_id in (sistema.VoltageLineToGround, sistema.VoltageLineToLine):
+        tensao = doc.GetElement(tensao_id)
+        if tensao is not None:
+            tensoes.append(round(unidades_revit.de_internas(tensao.ActualValue, 'Volts'), 1))
+    fases = 3 if sistema.ElectricalPhase == ElectricalPhase.ThreePhase else 1
+    return tuple(tensoes), fases
+
+
+def _polos_ocupados(doc):
+    """Polos ocupados por painel (id inteiro), em uma única passada pelos circuitos."""
+    ocupados = {}
+    for circuito in FilteredElementCollector(doc).OfClass(ElectricalSystem):
+        try:
+            painel = circuito.BaseEquipment
+            if painel is None:
+                continue
+            chave = painel.Id.IntegerValue
+            ocupados[chave] = ocupados.get(chave, 0) + (circuito.PolesNumber or 0)
+        except Exception:
+            pass
+    return ocupados
+
+
+def _criar_registro(doc, painel, ocupados):
+    """Cria o registro do índice a partir de um painel."""
+    tensoes, fases = _sistema_distribuicao(doc, painel)
+    maximo = painel.get_Parameter(BuiltInParameter.RBS_ELEC_MAX_POLE_BREAKERS)
+    polos_livres = None
+    if maximo and maximo.HasValue and maximo.AsInteger() > 0:
+        polos_livres = maximo.AsInteger() - ocupados.get(painel.Id.IntegerValue, 0)
+    return RegistroPainel(
+        painel_id=painel.Id.IntegerValue,
+        nome=painel.Name,
+        nivel_id=painel.LevelId.IntegerValue,
+        tensoes=tensoes,
+        fases=fases,
+        polos_livres=polos_livres,
+    )
+
+
+class IndicePaineis(object):
+    """Painéis do documento por id, com árvore k-d das posições."""
+
+    def __init__(self, registros, pontos):
+        self.registros = dict((r.painel_id, r) for r in registros)
+        self._arvore = ArvoreKD(pontos, [r.painel_id for r in registros])
+        # Polos reservados nesta execução, ainda não refletidos no modelo
+        self._reservados = {}
+
+    def __len__(self):
+        return len(self.registros)
+
+    def polos_livres(self, painel_id):
+        """Polos livres do painel (None se o painel não informa o máximo)."""
+        livres = self.registros[painel_id].polos_livres
+        if livres is None:
+            return None
+        return livres - self._reservados.get(painel_id, 0)
+
+    def compativel(self, painel_id, tensao=None, fases=1, nivel_id=None):
+        """Verifica se o painel atende a tensão, as fases, o nível e tem polos livres."""
+        registro = self.registros[painel_id]
+        if nivel_id is not None and registro.nivel_id != nivel_id:
+            return False
+        if tensao and registro.tensoes and not any(
+            abs(t - tensao) <= TOLERANCIA_TENSAO * tensao for t in registro.tensoes
+        ):
+            return False
+        if fases == 3 and registro.fases == 1:
+            return False
+        livres = self.polos_livres(painel_id)
+        return livres is None or livres >= fases
+
+    def mais_proximo(self, ponto, tensao=None, fases=1, nivel_id=None):
+        """Id do painel compatível mais próximo do ponto (x, y, z), ou None.
+
+        Os painéis do mesmo nível têm preferência; se nenhum for compatível,
+        os demais níveis são considerados.
+        """
+        niveis = (nivel_id, None) if nivel_id is not None else (None,)
+        for nivel in niveis:
+            encontrado = self._arvore.mais_proximo(
+                ponto, lambda painel_id: self.compativel(painel_id, tensao, fases, nivel)
+            )
+            if encontrado is not None:
+                return encontrado[0]
+        return None
+
+    def reservar(self, painel_id, polos):
+        """Desconta os polos de um circuito atribuído ao painel."""
+        self._reservados[painel_id] = self._reservados.get(painel_id, 0) + polos
+
+
+def _montar_indice(doc):
+    """Lê todos os painéis e os circuitos existentes do documento."""
+    ocupados = _polos_ocupados(doc)
+    registros = []
+    pontos = []
+    coletor = FilteredElementCollector(doc)\
+        .OfCategory(BuiltInCategory.OST_ElectricalEquipment)\
+        .OfClass(FamilyInstance)
+    for painel in coletor:
+        localizacao = getattr(painel.Location, 'Point', None)
+        if localizacao is None:
+            continue
+        try:
+            registros.append(_criar_registro(doc, painel, ocupados))
+        except Exception:
+            continue
+        pontos.append((localizacao.X, localizacao.Y, localizacao.Z))
+    return IndicePaineis(registros, pontos)
+
+
+def _indices():
+    """Retorna o dicionário de índices guardado no AppDomain."""
+    indices = envvars.get_pyrevit_env_var(CHAVE_INDICE)
+    if indices is None:
+        indices = {}
+        envvars.set_pyrevit_env_var(CHAVE_INDICE, indices)
+    return indices
+
+
+def invalidar(doc):
+    """Descarta o índice de painéis do documento."""
+    _indices().pop(chave_documento(doc), None)
+
+
+def _filtro_eletrico():
+    """Filtro dos elementos que alteram o índice: painéis e circuitos."""
+    return LogicalOrFilter(
+        ElementCategoryFilter(BuiltInCategory.OST_ElectricalEquipment),
+        ElementClassFilter(ElectricalSystem),
+    )
+
+
+def _ao_alterar_documento(sender, args):
+    """Descarta o índice quando painéis ou circuitos mudam no documento."""
+    try:
+        doc = args.GetDocument()
+        if chave_documento(doc) not in _indices():
+            return
+        filtro = _filtro_eletrico()
+        if args.GetAddedElementIds(filtro).Count or args.GetModifiedElementIds(filtro).Count:
+            invalidar(doc)
+            return
+        # Elementos removidos não podem mais ser classificados (um circuito
+        # removido libera polos): qualquer remoção descarta o índice
+        if args.GetDeletedElementIds().Count:
+            invalidar(doc)
+    except Exception:
+        # Um erro aqui não pode interromper a edição do modelo
+        pass
+
+
+def garantir_monitoramento():
+    """Registra o evento DocumentChanged uma única vez por sessão do Revit."""
+    if envvars.get_pyrevit_env_var(CHAVE_MONITORAMENTO):
+        return
+    HOST_APP.app.DocumentChanged += _ao_alterar_documento
+    envvars.set_pyrevit_env_var(CHAVE_MONITORAMENTO, True)
+
+
+def obter_indice(doc):
+    """Retorna o índice de painéis do documento, montando-o se necessário."""
+    garantir_monitoramento()
+    chave = chave_documento(doc)
+    indice = _indices().get(chave)
+    if indice is None:
+        indice = _montar_indice(doc)
+        _indices()[chave] = indice
+    return indice
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Parâmetros de todas as instâncias de uma categoria, lidos sob demanda.
+
+linhas_categoria é um gerador: o coletor é percorrido elemento a elemento e
+cada parâmetro vira uma linha no momento em que é pedida, sem montar listas
+do modelo inteiro. Os parâmetros de tipo são emitidos uma única vez por tipo
+(na primeira instância encontrada), com o id do tipo, em vez de repetidos em
+cada instância.
+
+Os números reais são convertidos, parâmetro a parâmetro, das unidades
+internas para a unidade em que o projeto exibe cada um (comprimentos,
+áreas, potências, ângulos etc.; ver unidades_revit) e arredondados; os do
+tipo Número ficam como estão. Ids saem como inteiros.
+"""
+from Autodesk.Revit.DB import (
+    BuiltInParameter,
+    CategoryType,
+    ElementId,
+    FilteredElementCollector,
+    StorageType,
+)
+
+import unidades_revit
+
+
+# Colunas das linhas geradas por linhas_categoria
+COLUNAS = ["ElementId", "Família", "Tipo", "Origem", "Nome", "Armazenamento", "Valor"]
+
+
+def valor_parametro(parametro):
+    """Valor do parâmetro para exportação."""
+    if parametro.StorageType == StorageType.Double:
+        # Cada parâmetro na sua unidade de exibição (não apenas pés -> metros)
+        return round(unidades_revit.valor_exibicao(parametro), 3)
+    if parametro.StorageType == StorageType.Integer:
+        return parametro.AsInteger()
+    if parametro.StorageType == StorageType.String:
+        return parametro.AsString()
+    if parametro.StorageType == StorageType.ElementId:
+        return parametro.AsElementId().IntegerValue
+    return "Desconhecido"
+
+
+def _texto(elemento, bip, padrao):
+    parametro = elemento.get_Parameter(bip) if elemento is not None else None
+    if parametro is not None and parametro.HasValue:
+        return parametro.AsString() or padrao
+    return padrao
+
+
+def _linhas_parametros(ident, familia, tipo, origem, parametros):
+    for parametro in parametros:
+        try:
+            yield (ident, familia, tipo, origem, parametro.Definition.Name,
+                   parametro.StorageType.ToString(), valor_parametro(parametro))
+        except Exception as e:
+            yield (ident, familia, tipo, origem, "Erro ao obter parâmetro", "Erro", str(e))
+
+
+def coletor_categoria(doc, categoria_id):
+    """Coletor (ainda não percorrido) das instâncias da categoria."""
+    return (FilteredElementCollector(doc)
+            .OfCategoryId(categoria_id)
+            .WhereElementIsNotElementType())
+
+
+def linhas_categoria(doc, categoria_id):
+    """Gera uma linha (ver COLUNAS) por parâmetro das instâncias da categoria."""
+    # id do tipo -> (família, tipo); pequeno, mesmo em modelos grandes
+    nomes_tipos = {}
+    for elemento in coletor_categoria(doc, categoria_id):
+        tipo_id = elemento.GetTypeId()
+        chave_tipo = tipo_id.IntegerValue
+        novo_tipo = chave_tipo not in nomes_tipos
+        if novo_tipo:
+            simbolo = doc.GetElement(tipo_id) if tipo_id != ElementId.InvalidElementId else None
+            nomes_tipos[chave_tipo] = (
+                _texto(simbolo, BuiltInParameter.ALL_MODEL_FAMILY_NAME, "Sem Família"),
+                _texto(simbolo, BuiltInParameter.ALL_MODEL_TYPE_NAME, "Sem Tipo"),
+            )
+        familia, tipo = nomes_tipos[chave_tipo]
+
+        for linha in _linhas_parametros(
+                elemento.Id.IntegerValue, familia, tipo, "Instância", elemento.Parameters):
+            yield linha
+        if novo_tipo and simbolo is not None:
+            for linha in _linhas_parametros(chave_tipo, familia, tipo, "Tipo", simbolo.Parameters):
+                yield linha
+
+
+def categorias_modelo(doc):
+    """Categorias de modelo do documento: id inteiro -> (nome, ElementId).
+
+    O id é a chave porque nomes podem se repetir (subcategorias de famílias
+    carregadas ou categorias de vínculos com o mesmo nome, por exemplo).
+    """
+    return dict(
+        (categoria.Id.IntegerValue, (categoria.Name, categoria.Id))
+        for categoria in doc.Settings.Categories
+        if categoria.CategoryType == CategoryType.Model
+    )
+
+
+def rotulos_categorias(categorias):
+    """Rótulo único de cada categoria (ver categorias_modelo) -> id inteiro.
+
+    Nomes repetidos recebem o id entre colchetes para se distinguirem.
+    """
+    contagem = {}
+    for nome, _ in categorias.values():
+        contagem[nome] = contagem.get(nome, 0) + 1
+    return dict(
+        (nome if contagem[nome] == 1 else "{} [{}]".format(nome, chave), chave)
+        for chave, (nome, _) in categorias.items()
+    )
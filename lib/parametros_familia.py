@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Resolução dos parâmetros de altura e elétricos das famílias de tomadas.
+
+Os nomes candidatos de cada valor (altura, potência aparente, fator de
+potência etc.) são procurados com LookupParameter apenas na primeira
+instância de cada tipo de família. A definição que controla o valor (GUID do
+parâmetro compartilhado, BuiltInParameter ou a própria definição) fica em um
+cache do módulo, por documento e tipo de família, compartilhado por todos os
+resolvedores (de cada execução de botão e de cada Execute do atualizador de
+cargas); as demais instâncias usam get_Parameter diretamente.
+
+A leitura e a escrita são resolvidas separadamente: para ler, vale o primeiro
+candidato existente, mesmo somente leitura (um parâmetro calculado, por
+exemplo); para gravar, o primeiro que aceita escrita. Se a gravação no
+parâmetro resolvido falhar em uma instância, os demais candidatos são
+tentados nela, na ordem, até um aceitar o valor.
+
+Os valores com unidade (ver UNIDADES_VALOR) são sempre lidos e gravados na
+unidade usual (VA, W, V) por ler e definir, que convertem de e para as
+unidades internas quando o parâmetro tem unidade (ver unidades_revit).
+"""
+from Autodesk.Revit.DB import BuiltInParameter, StorageType
+
+from catalogo_familias import chave_documento
+import unidades_revit
+
+
+# Nomes possíveis dos parâmetros que controlam a altura da tomada
+NOMES_ALTURA = (
+    "Offset",
+    "Deslocamento",
+    "Elevação",
+    "Elevação do Ponto",
+    "Sill Height",
+    "Head Height",
+    "Height",
+    "Base Offset",
+    "Top Offset",
+)
+
+# Valor -> nomes candidatos, na ordem de preferência
+PARAMETROS_PADRAO = {
+    'altura': NOMES_ALTURA,
+    'elevacao_ponto': ("Elevação do Ponto",),
+    'potencia_aparente': ("Potência Aparente (VA)",),
+    'fator_potencia': ("Fator de Potência",),
+    'tensao': ("Tensão (V)",),
+    'numero_fases': ("N° de Fases",),
+    'potencia_ativa': ("Potência Ativa (W)",),
+    # Resultados do dimensionamento, nos circuitos (parâmetros do tipo Número)
+    'corrente_projeto': ("Corrente de Projeto (A)",),
+    'secao_condutor': ("Seção do Condutor (mm²)",),
+    'queda_tensao': ("Queda de Tensão (%)",),
+}
+
+# Valor -> unidade usual (nome em unidades_revit) dos valores com unidade
+UNIDADES_VALOR = {
+    'potencia_aparente': 'VoltAmperes',
+    'potencia_ativa': 'Watts',
+    'tensao': 'Volts',
+}
+
+# (documento, id do tipo, nomes candidatos, escrita) -> identificador do
+# parâmetro, ou None se nenhum candidato servir
+_RESOLVIDOS = {}
+
+# Tipos de armazenamento aceitos para cada tipo de valor do Python
+_ARMAZENAMENTOS = {
+    float: (StorageType.Double,),
+    int: (StorageType.Integer, StorageType.Double),
+}
+
+
+def _identificador(parametro):
+    """Identificador estável do parâmetro para acesso direto."""
+    if parametro.IsShared:
+        return parametro.GUID
+    definicao = parametro.Definition
+    bip = getattr(definicao, 'BuiltInParameter', BuiltInParameter.INVALID)
+    if bip != BuiltInParameter.INVALID:
+        return bip
+    return definicao
+
+
+def invalidar(doc):
+    """Esquece os parâmetros resolvidos dos tipos de família do documento."""
+    chave = chave_documento(doc)
+    for resolvido in [r for r in _RESOLVIDOS if r[0] == chave]:
+        del _RESOLVIDOS[resolvido]
+
+
+def _sondar(instancia, nomes, escrita):
+    """Procura pelos nomes candidatos (apenas na primeira instância do tipo)."""
+    for nome in nomes:
+        parametro = instancia.LookupParameter(nome)
+        if parametro is not None and not (escrita and parametro.IsReadOnly):
+            return _identificador(parametro)
+    return None
+
+
+class ResolvedorParametros(object):
+    """Descobre, uma vez por tipo de família, qual parâmetro controla cada valor."""
+
+    def __init__(self, parametros=None):
+        self.parametros = parametros or PARAMETROS_PADRAO
+
+    def parametro(self, instancia, chave, escrita=False):
+        """Retorna o parâmetro da instância que controla o valor, ou None.
+
+        Com escrita=True, apenas parâmetros que aceitam gravação são considerados.
+        """
+        nomes = tuple(self.parametros[chave])
+        resolvido = (chave_documento(instancia.Document), instancia.GetTypeId().IntegerValue,
+                     nomes, escrita)
+        if resolvido not in _RESOLVIDOS:
+            _RESOLVIDOS[resolvido] = _sondar(instancia, nomes, escrita)
+        identificador = _RESOLVIDOS[resolvido]
+        if identificador is None:
+            return None
+        parametro = instancia.get_Parameter(identificador)
+        if parametro is None:
+            # A família foi recarregada sem o parâmetro: sondar de novo
+            _RESOLVIDOS[resolvido] = identificador = _sondar(instancia, nomes, escrita)
+            if identificador is not None:
+                parametro = instancia.get_Parameter(identificador)
+        return parametro
+
+    def ler(self, instancia, chave):
+        """Valor real (na unidade usual) do parâmetro da instância, ou None."""
+        parametro = self.parametro(instancia, chave)
+        if parametro is None or not parametro.HasValue or parametro.StorageType != StorageType.Double:
+            return None
+        unidade = UNIDADES_VALOR.get(chave)
+        if unidade is None:
+            return parametro.AsDouble()
+        return unidades_revit.ler_parametro(parametro, unidade)
+
+    def _gravar(self, parametro, chave, valor):
+        """Grava o valor (na unidade usual) no parâmetro; retorna False se não foi possível."""
+        if parametro.IsReadOnly or parametro.StorageType not in _ARMAZENAMENTOS.get(type(valor), ()):
+            return False
+        if parametro.StorageType == StorageType.Double:
+            valor = float(valor)
+            if chave in UNIDADES_VALOR:
+                valor = unidades_revit.valor_para_parametro(parametro, valor, UNIDADES_VALOR[chave])
+        try:
+            return bool(parametro.Set(valor))
+        except Exception:
+            return False
+
+    def definir(self, instancia, chave, valor):
+        """Define o valor (na unidade usual) na instância; retorna False se não foi possível."""
+        parametro = self.parametro(instancia, chave, escrita=True)
+        if parametro is None:
+            return False
+        if self._gravar(parametro, chave, valor):
+            return True
+        # Tentar os demais candidatos nesta instância, na ordem, até um aceitar o valor
+        for nome in self.parametros[chave]:
+            candidato = instancia.LookupParameter(nome)
+            if candidato is None or candidato.Id.IntegerValue == parametro.Id.IntegerValue:
+                continue
+            if self._gravar(candidato, chave, valor):
+                return True
+        return False
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Quantidade e posição das tomadas de uso geral no perímetro dos cômodos.
+
+As quantidades seguem as regras mínimas da NBR 5410 para locais de habitação:
+- cozinhas, copas, áreas de serviço e lavanderias: uma tomada a cada 3,5 m,
+  ou fração, de perímetro;
+- banheiros, lavabos e varandas: pelo menos uma tomada;
+- demais cômodos: uma tomada se a área for de até 6 m²; acima disso, uma a
+  cada 5 m, ou fração, de perímetro.
+
+As tomadas são espaçadas tão uniformemente quanto possível ao longo dos
+trechos do contorno que têm parede hospedeira; as que caem em portas ou
+janelas são deslocadas para fora da abertura. Os trechos são descritos por
+QuadroParede (largura zero, pois o contorno do cômodo já está na face da
+parede) e o resultado é um PlanoPontos, como em layout_tomadas.
+
+Este módulo não depende do Revit. Comprimentos e áreas das regras em metros;
+o planejamento dos pontos usa as unidades dos quadros (pés).
+"""
+from bisect import bisect_right
+from collections import namedtuple
+from math import ceil
+
+import layout_tomadas
+from busca_familias import tokenizar
+
+
+# Regra de um tipo de cômodo: palavras do nome, perímetro por tomada em metros
+# (None para usar apenas o mínimo) e número mínimo de tomadas
+RegraComodo = namedtuple('RegraComodo', ['palavras', 'passo', 'minimo'])
+
+REGRAS_PADRAO = (
+    RegraComodo(('cozinha', 'copa', 'servico', 'lavanderia'), 3.5, 1),
+    RegraComodo(('banheiro', 'lavabo', 'wc', 'varanda', 'sacada'), None, 1),
+)
+
+# Demais cômodos (salas, dormitórios etc.)
+REGRA_GERAL = RegraComodo((), 5.0, 1)
+
+# Área até a qual os demais cômodos recebem apenas uma tomada (m²)
+AREA_MINIMA = 6.0
+
+# Distância mínima das tomadas às extremidades de cada trecho (pés)
+MARGEM_TRECHO = 0.3
+
+
+def regra_do_comodo(nome, regras=REGRAS_PADRAO):
+    """Retorna a regra que se aplica ao cômodo, pelo nome."""
+    palavras = set(tokenizar(nome or u''))
+    for regra in regras:
+        if palavras.intersection(regra.palavras):
+            return regra
+    return REGRA_GERAL
+
+
+def numero_tomadas(nome, area, perimetro, regras=REGRAS_PADRAO):
+    """Número mínimo de tomadas do cômodo (área em m², perímetro em m)."""
+    regra = regra_do_comodo(nome, regras)
+    if regra.passo is None:
+        return regra.minimo
+    if regra is REGRA_GERAL and area <= AREA_MINIMA:
+        return regra.minimo
+    # "Uma a cada X m, ou fração": arredondar para cima
+    return max(regra.minimo, int(ceil(round(perimetro / regra.passo, 6))))
+
+
+def distancias_perimetro(comprimento, numero):
+    """Distâncias igualmente espaçadas ao longo de um contorno fechado.
+
+    Cada tomada fica no meio da sua parcela do contorno, de modo que a
+    distância entre tomadas vizinhas é sempre a mesma.
+    """
+    if numero < 1 or comprimento <= 0:
+        return []
+    passo = comprimento / float(numero)
+    return [passo * (i + 0.5) for i in range(numero)]
+
+
+def planejar_comodos(comodos, altura, margem=MARGEM_TRECHO):
+    """Calcula os pontos de inserção de vários cômodos de uma só vez.
+
+    comodos é uma lista de pares (trechos, numero), em que trechos são os
+    QuadroParede dos trechos do contorno com parede hospedeira, na ordem do
+    contorno. O índice de parede de cada ponto do plano é o índice global do
+    trecho (contando os trechos de todos os cômodos, na ordem recebida).
+    """
+    xs = []
+    ys = []
+    zs = []
+    dxs = []
+    dys = []
+    angulos = []
+    indices = []
+    distancias = []
+
+    base = 0
+    for trechos, numero in comodos:
+        # Comprimento acumulado dos trechos: busca binária do trecho de cada ponto
+        acumulado = [0.0]
+        for quadro in trechos:
+            acumulado.append(acumulado[-1] + quadro.comprimento)
+
+        for s in distancias_perimetro(acumulado[-1], numero):
+            i = min(bisect_right(acumulado, s) - 1, len(trechos) - 1)
+            quadro = trechos[i]
+            local = s - acumulado[i]
+            # Afastar das extremidades (cantos e encontros de paredes)
+            folga = min(margem, quadro.comprimento / 2.0)
+            local = min(max(local, folga), quadro.comprimento - folga)
+            if quadro.aberturas:
+                local = quadro.aberturas.ajustar(local, quadro.comprimento)
+                if local is None:
+                    continue
+
+            (px, py, pz), (dx, dy) = layout_tomadas.posicao_e_direcao(quadro, local)
+            xs.append(px)
+            ys.append(py)
+            zs.append(pz + altura)
+            dxs.append(dx)
+            dys.append(dy)
+            angulos.append(layout_tomadas.angulo_no_ponto(quadro, (dx, dy)))
+            indices.append(base + i)
+            distancias.append(local)
+
+        base += len(trechos)
+
+    return layout_tomadas.PlanoPontos(xs, ys, zs, indices, distancias, dxs, dys, angulos)
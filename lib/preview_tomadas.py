@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Pré-visualização das posições das tomadas.
+
+Os marcadores (pequenas linhas perpendiculares à parede) são desenhados como
+gráficos transitórios, por um servidor DirectContext3D do pyRevit: nada é
+criado no modelo e milhares de marcadores custam apenas um redesenho.
+
+Se o DirectContext3D não estiver disponível (versões antigas do Revit ou do
+pyRevit), os marcadores viram ModelCurves em uma única transação, com um
+SketchPlane compartilhado por elevação e a mesma sobreposição de cor para
+todos. Essa transação fica dentro de um TransactionGroup próprio, que é
+desfeito na remoção: nada precisa ser apagado e o histórico de desfazer não
+recebe entradas da pré-visualização. Por isso nenhuma outra transação deve
+ser feita entre mostrar e remover.
+"""
+from Autodesk.Revit.DB import (
+    Color, Line, OverrideGraphicSettings, Plane, SketchPlane, TransactionGroup, XYZ,
+)
+
+from pyrevit import coreutils, revit
+
+try:
+    from Autodesk.Revit.DB import ColorWithTransparency
+    from pyrevit.revit import dc3dserver
+except ImportError:
+    dc3dserver = None
+
+
+mlogger = coreutils.logger.get_logger(__name__)
+
+# Cor dos marcadores (vermelho)
+COR_MARCADOR = (255, 0, 0)
+
+
+def marcadores(pontos, direcoes, antes=0.2, depois=0.2):
+    """Segmentos (p1, p2) perpendiculares à direção da parede em cada ponto.
+
+    antes e depois são os comprimentos (em pés) para cada lado da parede;
+    o lado "depois" é o da normal (à esquerda da direção).
+    """
+    segmentos = []
+    for ponto, direcao in zip(pontos, direcoes):
+        perpendicular = XYZ(-direcao.Y, direcao.X, 0).Normalize()
+        segmentos.append((ponto - perpendicular * antes, ponto + perpendicular * depois))
+    return segmentos
+
+
+def mostrar_marcadores(doc, uidoc, pontos, direcoes, antes=0.2, depois=0.2):
+    """Cria a pré-visualização com os marcadores dos pontos e a retorna.
+
+    A pré-visualização deve ser removida (PreviewTomadas.remover) antes de
+    qualquer outra transação.
+    """
+    preview = PreviewTomadas(doc, uidoc)
+    preview.mostrar(marcadores(pontos, direcoes, antes, depois))
+    return preview
+
+
+class PreviewTomadas(object):
+    """Marcadores de pré-visualização, transitórios quando possível."""
+
+    def __init__(self, doc, uidoc):
+        self.doc = doc
+        self.uidoc = uidoc
+        self._servidor = None
+        self._grupo = None
+
+    @property
+    def transitorio(self):
+        """Indica se a pré-visualização está usando gráficos transitórios."""
+        return self._servidor is not None
+
+    def mostrar(self, segmentos):
+        """Desenha os segmentos (p1, p2) e atualiza a vista ativa."""
+        segmentos = list(segmentos)
+        if not self._mostrar_transitorio(segmentos):
+            self._mostrar_no_modelo(segmentos)
+        self.uidoc.RefreshActiveView()
+
+    def _mostrar_transitorio(self, segmentos):
+        """Desenha com DirectContext3D; retorna False se não for possível."""
+        if dc3dserver is None:
+            return False
+        servidor = None
+        try:
+            cor = ColorWithTransparency(COR_MARCADOR[0], COR_MARCADOR[1], COR_MARCADOR[2], 0)
+            servidor = dc3dserver.Server(register=False)
+            servidor.edges = [dc3dserver.Edge(p1, p2, cor) for p1, p2 in segmentos]
+            servidor.add_server()
+        except Exception as erro:
+            mlogger.debug('DirectContext3D indisponível: %s', erro)
+            if servidor is not None:
+                try:
+                    servidor.remove_server()
+                except Exception:
+                    pass
+            return False
+        self._servidor = servidor
+        return True
+
+    def _mostrar_no_modelo(self, segmentos):
+        """Desenha com ModelCurves em uma transação, dentro de um grupo a desfazer."""
+        self._grupo = TransactionGroup(self.doc, "Preview")
+        self._grupo.Start()
+        planos = {}
+        sobreposicao = OverrideGraphicSettings()
+        sobreposicao.SetProjectionLineColor(Color(*COR_MARCADOR))
+        vista = self.doc.ActiveView
+        with revit.Transaction("Criar Preview", doc=self.doc):
+            for p1, p2 in segmentos:
+                # Um SketchPlane horizontal por elevação, compartilhado
+                chave = round(p1.Z, 6)
+                plano = planos.get(chave)
+                if plano is None:
+                    plano = SketchPlane.Create(
+                        self.doc, Plane.CreateByNormalAndOrigin(XYZ.BasisZ, XYZ(0, 0, p1.Z))
+                    )
+                    planos[chave] = plano
+                try:
+                    curva = self.doc.Create.NewModelCurve(Line.CreateBound(p1, p2), plano)
+                    vista.SetElementOverrides(curva.Id, sobreposicao)
+                except Exception:
+                    # Se a ModelCurve não puder ser criada, ignorar este ponto
+                    pass
+
+    def remover(self):
+        """Remove os marcadores (servidor transitório ou grupo desfeito)."""
+        if self._servidor is not None:
+            try:
+                self._servidor.remove_server()
+            finally:
+                self._servidor = None
+                self.uidoc.RefreshActiveView()
+        if self._grupo is not None:
+            grupo = self._grupo
+            self._grupo = None
+            if grupo.HasStarted() and not grupo.HasEnded():
+                grupo.RollBack()
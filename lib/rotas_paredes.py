@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Comprimento de rota dos circuitos ao longo das paredes de cada nível.
+
+O grafo das paredes (ver grafo_paredes) é montado uma única vez por nível,
+a partir das LocationCurve das paredes, e fica guardado no AppDomain do
+pyRevit. O evento DocumentChanged descarta apenas os grafos dos níveis cujas
+paredes foram adicionadas, alteradas ou removidas.
+
+RotasParedes mede o comprimento de um circuito como a maior rota entre o
+painel e os seus elementos (trecho horizontal pelas paredes mais a diferença
+de altura). Cada painel faz uma única busca (Dijkstra) e todos os circuitos
+dele reaproveitam o mesmo mapa de distâncias.
+"""
+from Autodesk.Revit.DB import ElementClassFilter, FilteredElementCollector, Line, Wall
+
+from pyrevit import HOST_APP
+from pyrevit.coreutils import envvars
+
+from catalogo_familias import chave_documento
+from grafo_paredes import GrafoParedes
+
+
+# Chaves usadas para guardar o estado no AppDomain do pyRevit
+CHAVE_GRAFOS = 'TOMADAS_GRAFOS_PAREDES'
+CHAVE_MONITORAMENTO = 'TOMADAS_GRAFOS_PAREDES_MONITORADO'
+
+
+def _grafos():
+    """Dicionário (documento, nível) -> (ids das paredes, grafo) do AppDomain."""
+    grafos = envvars.get_pyrevit_env_var(CHAVE_GRAFOS)
+    if grafos is None:
+        grafos = {}
+        envvars.set_pyrevit_env_var(CHAVE_GRAFOS, grafos)
+    return grafos
+
+
+def _trecho(parede):
+    """Polilinha (x, y) do eixo da parede, ou None."""
+    curva = getattr(parede.Location, 'Curve', None)
+    if curva is None:
+        return None
+    if isinstance(curva, Line):
+        pontos = (curva.GetEndPoint(0), curva.GetEndPoint(1))
+    else:
+        pontos = curva.Tessellate()
+    return [(p.X, p.Y) for p in pontos]
+
+
+def _montar_grafo(doc, nivel_id):
+    """Lê as paredes do nível e monta o grafo."""
+    ids = set()
+    trechos = []
+    for parede in FilteredElementCollector(doc).OfClass(Wall):
+        if parede.LevelId.IntegerValue != nivel_id:
+            continue
+        trecho = _trecho(parede)
+        if trecho:
+            ids.add(parede.Id.IntegerValue)
+            trechos.append(trecho)
+    return ids, GrafoParedes(trechos)
+
+
+def grafo_nivel(doc, nivel_id):
+    """Grafo das paredes do nível (id inteiro), montado apenas uma vez."""
+    garantir_monitoramento()
+    chave = (chave_documento(doc), nivel_id)
+    em_cache = _grafos().get(chave)
+    if em_cache is None:
+        em_cache = _montar_grafo(doc, nivel_id)
+        _grafos()[chave] = em_cache
+    return em_cache[1]
+
+
+def _descartar(documento, niveis=(), paredes=()):
+    """Descarta os grafos do documento dos níveis ou que contêm as paredes."""
+    grafos = _grafos()
+    for chave in list(grafos):
+        if chave[0] != documento:
+            continue
+        ids, _ = grafos[chave]
+        if chave[1] in niveis or any(p in ids for p in paredes):
+            del grafos[chave]
+
+
+def _ao_alterar_documento(sender, args):
+    """Descarta os grafos dos níveis cujas paredes mudaram."""
+    try:
+        doc = args.GetDocument()
+        documento = chave_documento(doc)
+        if not any(chave[0] == documento for chave in _grafos()):
+            return
+        filtro = ElementClassFilter(Wall)
+        niveis = set()
+        paredes = set()
+        for elem_id in list(args.GetAddedElementIds(filtro)) + list(args.GetModifiedElementIds(filtro)):
+            parede = doc.GetElement(elem_id)
+            if parede is not None:
+                niveis.add(parede.LevelId.IntegerValue)
+            paredes.add(elem_id.IntegerValue)
+        # Removidos: não é possível saber o nível, apenas o id
+        paredes.update(elem_id.IntegerValue for elem_id in args.GetDeletedElementIds())
+        if niveis or paredes:
+            _descartar(documento, niveis, paredes)
+    except Exception:
+        # Um erro aqui não pode interromper a edição do modelo
+        pass
+
+
+def garantir_monitoramento():
+    """Registra o evento DocumentChanged uma única vez por sessão do Revit."""
+    if envvars.get_pyrevit_env_var(CHAVE_MONITORAMENTO):
+        return
+    HOST_APP.app.DocumentChanged += _ao_alterar_documento
+    envvars.set_pyrevit_env_var(CHAVE_MONITORAMENTO, True)
+
+
+def _ponto(elemento):
+    """Ponto de inserção do elemento, ou None."""
+    return getattr(elemento.Location, 'Point', None)
+
+
+class RotasParedes(object):
+    """Comprimentos de rota dos circuitos, com um mapa de distâncias por painel."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        # id do painel -> MapaDistancias (ou None se o painel não tem parede próxima)
+        self._mapas = {}
+
+    def _mapa(self, painel):
+        chave = painel.Id.IntegerValue
+        if chave not in self._mapas:
+            origem = _ponto(painel)
+            mapa = None
+            if origem is not None and painel.LevelId.IntegerValue > 0:
+                grafo = grafo_nivel(self.doc, painel.LevelId.IntegerValue)
+                mapa = grafo.a_partir_de((origem.X, origem.Y))
+            self._mapas[chave] = mapa
+        return self._mapas[chave]
+
+    def comprimento_circuito(self, circuito):
+        """Maior rota (pés) do painel até um elemento do circuito, ou None."""
+        painel = circuito.BaseEquipment
+        if painel is None:
+            return None
+        mapa = self._mapa(painel)
+        if mapa is None:
+            return None
+        origem = _ponto(painel)
+        maior = None
+        for elemento in circuito.Elements:
+            destino = _ponto(elemento)
+            if destino is None:
+                continue
+            horizontal = mapa.ate((destino.X, destino.Y))
+            if horizontal is None:
+                # Um elemento fora da rede de paredes invalida a rota
+                return None
+            total = horizontal + abs(destino.Z - origem.Z)
+            if maior is None or total > maior:
+                maior = total
+        return maior
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Seleção de várias paredes de uma vez (seleção atual ou PickObjects)."""
+from Autodesk.Revit.DB import Wall
+from Autodesk.Revit.UI.Selection import ISelectionFilter, ObjectType
+from Autodesk.Revit.Exceptions import InvalidOperationException, OperationCanceledException
+
+
+class FiltroParedes(ISelectionFilter):
+    """Filtro de seleção que só permite escolher paredes."""
+
+    def AllowElement(self, elemento):
+        return isinstance(elemento, Wall)
+
+    def AllowReference(self, referencia, ponto):
+        return False
+
+
+def paredes_selecionadas(uidoc):
+    """Retorna as paredes que já estão selecionadas na vista."""
+    doc = uidoc.Document
+    paredes = []
+    for elem_id in uidoc.Selection.GetElementIds():
+        elemento = doc.GetElement(elem_id)
+        if isinstance(elemento, Wall):
+            paredes.append(elemento)
+    return paredes
+
+
+def selecionar_paredes(uidoc, mensagem='Selecione as paredes e clique em Concluir.'):
+    """Retorna as paredes selecionadas ou pede ao usuário que as selecione.
+
+    Se já houver paredes na seleção atual, elas são usadas diretamente;
+    caso contrário o usuário escolhe as paredes com PickObjects. Retorna uma
+    lista vazia se a seleção for cancelada.
+    """
+    paredes = paredes_selecionadas(uidoc)
+    if paredes:
+        return paredes
+
+    doc = uidoc.Document
+    try:
+        referencias = uidoc.Selection.PickObjects(ObjectType.Element, FiltroParedes(), mensagem)
+    except (OperationCanceledException, InvalidOperationException):
+        return []
+    return [doc.GetElement(referencia.ElementId) for referencia in referencias]
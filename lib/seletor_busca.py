@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Janela de seleção com busca incremental sobre um IndiceBusca.
+
+Uma caixa de texto e uma lista (Windows Forms): a cada tecla a lista é
+preenchida com a página de resultados do índice (ver busca_familias), com os
+usados recentemente primeiro. Usa apenas controles públicos do .NET, sem
+depender da implementação interna das janelas do pyRevit.
+"""
+import clr
+clr.AddReference('System.Windows.Forms')
+clr.AddReference('System.Drawing')
+from System.Drawing import Point, Size
+from System.Windows.Forms import (
+    AnchorStyles,
+    Button,
+    DialogResult,
+    Form,
+    FormStartPosition,
+    Keys,
+    ListBox,
+    TextBox,
+)
+
+
+class FormularioBusca(Form):
+    """Caixa de busca sobre uma lista filtrada pelo índice."""
+
+    def __init__(self, indice, titulo, limite):
+        self.indice = indice
+        self.limite = limite
+        self.selecionado = None
+
+        self.Text = titulo
+        self.Width = 520
+        self.Height = 600
+        self.StartPosition = FormStartPosition.CenterScreen
+        self.KeyPreview = True
+
+        self.textbox_busca = TextBox()
+        self.textbox_busca.Location = Point(10, 10)
+        self.textbox_busca.Size = Size(480, 24)
+        self.textbox_busca.Anchor = AnchorStyles.Top | AnchorStyles.Left | AnchorStyles.Right
+        self.textbox_busca.TextChanged += self.texto_alterado
+        self.Controls.Add(self.textbox_busca)
+
+        self.listbox_opcoes = ListBox()
+        self.listbox_opcoes.Location = Point(10, 40)
+        self.listbox_opcoes.Size = Size(480, 470)
+        self.listbox_opcoes.Anchor = (AnchorStyles.Top | AnchorStyles.Bottom
+                                      | AnchorStyles.Left | AnchorStyles.Right)
+        self.listbox_opcoes.DoubleClick += self.ok_clicked
+        self.Controls.Add(self.listbox_opcoes)
+
+        self.button_ok = Button()
+        self.button_ok.Text = 'Selecionar'
+        self.button_ok.Location = Point(330, 520)
+        self.button_ok.Anchor = AnchorStyles.Bottom | AnchorStyles.Right
+        self.button_ok.Click += self.ok_clicked
+        self.Controls.Add(self.button_ok)
+
+        self.button_cancel = Button()
+        self.button_cancel.Text = 'Cancelar'
+        self.button_cancel.Location = Point(415, 520)
+        self.button_cancel.Anchor = AnchorStyles.Bottom | AnchorStyles.Right
+        self.button_cancel.Click += self.cancel_clicked
+        self.Controls.Add(self.button_cancel)
+
+        self.AcceptButton = self.button_ok
+        self.CancelButton = self.button_cancel
+        self.KeyDown += self.tecla_pressionada
+        self.atualizar_lista()
+
+    def atualizar_lista(self):
+        nomes = self.indice.buscar(self.textbox_busca.Text, limite=self.limite)
+        self.listbox_opcoes.BeginUpdate()
+        try:
+            self.listbox_opcoes.Items.Clear()
+            for nome in nomes:
+                self.listbox_opcoes.Items.Add(nome)
+            if nomes:
+                self.listbox_opcoes.SelectedIndex = 0
+        finally:
+            self.listbox_opcoes.EndUpdate()
+
+    def texto_alterado(self, sender, event):
+        self.atualizar_lista()
+
+    def tecla_pressionada(self, sender, event):
+        # Setas movem a seleção da lista sem sair da caixa de busca
+        lista = self.listbox_opcoes
+        if event.KeyCode in (Keys.Down, Keys.Up) and lista.Items.Count:
+            passo = 1 if event.KeyCode == Keys.Down else -1
+            lista.SelectedIndex = max(0, min(lista.Items.Count - 1, lista.SelectedIndex + passo))
+            event.Handled = True
+
+    def ok_clicked(self, sender, event):
+        if self.listbox_opcoes.SelectedItem is None:
+            return
+        self.selecionado = self.listbox_opcoes.SelectedItem
+        self.DialogResult = DialogResult.OK
+        self.Close()
+
+    def cancel_clicked(self, sender, event):
+        self.DialogResult = DialogResult.Cancel
+        self.Close()
+
+
+def selecionar(indice, titulo, limite):
+    """Mostra a janela de busca e retorna o nome escolhido, ou None."""
+    formulario = FormularioBusca(indice, titulo, limite)
+    if formulario.ShowDialog() != DialogResult.OK:
+        return None
+    return formulario.selecionado
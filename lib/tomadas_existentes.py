@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Tomadas já existentes no modelo, para evitar inserções duplicadas.
+
+Os pontos de inserção de todas as instâncias de dispositivos elétricos são
+lidos com um único coletor e guardados em uma grade espacial; cada ponto
+planejado é então verificado em O(1), o que torna as reexecuções idempotentes
+mesmo em modelos com dezenas de milhares de dispositivos. filtrar_livres
+aplica o mesmo filtro às listas paralelas aos pontos (direções, ângulos,
+paredes hospedeiras) usadas pelos botões de inserção.
+"""
+from Autodesk.Revit.DB import BuiltInCategory, FilteredElementCollector, LocationPoint
+
+from grade_espacial import GradeEspacial, indices_livres
+
+
+# Distância abaixo da qual duas tomadas são consideradas a mesma (pés, ~0,10 m)
+TOLERANCIA = 0.1 * 3.28084
+
+
+def grade_tomadas(doc, tolerancia=TOLERANCIA):
+    """Cria a grade espacial com os pontos das tomadas existentes."""
+    grade = GradeEspacial(tolerancia)
+    coletor = FilteredElementCollector(doc)\
+        .OfCategory(BuiltInCategory.OST_ElectricalFixtures)\
+        .WhereElementIsNotElementType()
+    for elemento in coletor:
+        local = elemento.Location
+        if isinstance(local, LocationPoint):
+            p = local.Point
+            grade.adicionar((p.X, p.Y, p.Z), elemento.Id.IntegerValue)
+    return grade
+
+
+def pontos_livres(doc, pontos_insercao, tolerancia=TOLERANCIA):
+    """Índices dos pontos (XYZ) que ainda não têm uma tomada por perto."""
+    grade = grade_tomadas(doc, tolerancia)
+    return indices_livres(grade, [(p.X, p.Y, p.Z) for p in pontos_insercao], tolerancia)
+
+
+def filtrar_livres(doc, pontos_insercao, *listas):
+    """Descarta os pontos onde já existe uma tomada (reexecuções não duplicam).
+
+    listas são listas paralelas aos pontos, filtradas da mesma forma. Retorna
+    os pontos livres, cada lista filtrada e, por último, a quantidade de
+    pontos descartados.
+    """
+    livres = pontos_livres(doc, pontos_insercao)
+    filtradas = [[lista[i] for i in livres] for lista in (pontos_insercao,) + listas]
+    return tuple(filtradas) + (len(pontos_insercao) - len(livres),)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Conversão entre as unidades internas do Revit e as unidades usuais.
+
+O Revit guarda tensões, potências e correntes em unidades internas (baseadas
+em pés). A conversão usa UnitTypeId (Revit 2021+) e, nas versões anteriores,
+o DisplayUnitType correspondente.
+
+Parâmetros de família do tipo Número guardam o valor sem unidade; apenas os
+parâmetros com unidade (potência, tensão etc.) são convertidos.
+"""
+from Autodesk.Revit.DB import UnitUtils
+
+try:
+    from Autodesk.Revit.DB import UnitTypeId
+except ImportError:
+    UnitTypeId = None
+    from Autodesk.Revit.DB import DisplayUnitType
+
+
+# Nome em UnitTypeId -> nome em DisplayUnitType
+UNIDADES = {
+    'Volts': 'DUT_VOLTS',
+    'VoltAmperes': 'DUT_VOLT_AMPERES',
+    'Amperes': 'DUT_AMPERES',
+    'Watts': 'DUT_WATTS',
+    'Meters': 'DUT_METERS',
+}
+
+
+def _unidade(nome):
+    """Identificador da unidade na API disponível."""
+    if UnitTypeId is not None:
+        return getattr(UnitTypeId, nome)
+    return getattr(DisplayUnitType, UNIDADES[nome])
+
+
+def de_internas(valor, nome):
+    """Converte um valor das unidades internas para a unidade nome."""
+    return UnitUtils.ConvertFromInternalUnits(valor, _unidade(nome))
+
+
+def para_internas(valor, nome):
+    """Converte um valor da unidade nome para as unidades internas."""
+    return UnitUtils.ConvertToInternalUnits(valor, _unidade(nome))
+
+
+def possui_unidade(parametro):
+    """Verifica se o parâmetro guarda o valor em unidades internas."""
+    definicao = parametro.Definition
+    try:
+        # Revit 2022+
+        return UnitUtils.IsMeasurableSpec(definicao.GetDataType())
+    except AttributeError:
+        from Autodesk.Revit.DB import ParameterType
+        return definicao.ParameterType != ParameterType.Number
+
+
+def unidade_exibicao(parametro):
+    """Unidade em que o projeto exibe o parâmetro, ou None se for Número."""
+    if not possui_unidade(parametro):
+        return None
+    if UnitTypeId is not None:
+        return parametro.GetUnitTypeId()
+    return parametro.DisplayUnitType
+
+
+def valor_exibicao(parametro):
+    """Valor real do parâmetro na sua própria unidade de exibição (sem conversão se for Número)."""
+    valor = parametro.AsDouble()
+    unidade = unidade_exibicao(parametro)
+    return valor if unidade is None else UnitUtils.ConvertFromInternalUnits(valor, unidade)
+
+
+def ler_parametro(parametro, nome):
+    """Valor real do parâmetro na unidade nome (sem conversão se for Número)."""
+    valor = parametro.AsDouble()
+    return de_internas(valor, nome) if possui_unidade(parametro) else valor
+
+
+def valor_para_parametro(parametro, valor, nome):
+    """Valor na unidade nome convertido para gravação no parâmetro."""
+    return para_internas(valor, nome) if possui_unidade(parametro) else valor
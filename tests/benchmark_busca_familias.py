@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Tempo por tecla do índice de busca sobre 100 mil nomes sintéticos.
+
+Uso: python tests/benchmark_busca_familias.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from busca_familias import IndiceBusca  # noqa: E402
+from nomes_sinteticos import nomes_sinteticos  # noqa: E402
+
+from test_busca_familias import CONSULTAS  # noqa: E402
+
+
+def main(quantidade=100000, limite=50, repeticoes=20):
+    nomes = nomes_sinteticos(quantidade)
+    inicio = time.time()
+    indice = IndiceBusca(nomes)
+    print(u'{} nomes, índice montado em {:.2f} s'.format(len(nomes), time.time() - inicio))
+    for texto in CONSULTAS:
+        tempos = []
+        for _ in range(repeticoes):
+            indice._ultima_consulta = None
+            inicio = time.time()
+            resultado = indice.buscar_indices(texto, limite)
+            tempos.append(time.time() - inicio)
+        tempos.sort()
+        print(u'{:<30} {:>3} resultados  mediana {:.3f} ms  máximo {:.3f} ms'.format(
+            repr(texto), len(resultado), 1000 * tempos[len(tempos) // 2], 1000 * tempos[-1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Tempo do planejamento de 10 mil pontos, com NumPy e em Python puro.
+
+Uso: python tests/benchmark_layout_tomadas.py
+"""
+import os
+import sys
+import time
+from math import cos, pi, sin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+import layout_tomadas  # noqa: E402
+from layout_tomadas import (  # noqa: E402
+    IndiceAberturas,
+    RegraEspacamento,
+    TabelaComprimentoArco,
+    criar_quadro,
+    criar_quadro_curvo,
+    planejar_cadeias,
+    planejar_pontos,
+)
+
+
+def paredes(quantidade, curvas=0.1):
+    """Paredes retas com uma abertura cada e uma fração de paredes curvas."""
+    quadros = []
+    for i in range(quantidade):
+        x = (i % 100) * 12.0
+        y = (i // 100) * 12.0
+        if i % int(1 / curvas) == 0:
+            pontos = [(x + 5 * cos(pi * k / 32.0), y + 5 * sin(pi * k / 32.0), 0.0) for k in range(33)]
+            quadros.append(criar_quadro_curvo(TabelaComprimentoArco(pontos), 0.5))
+        else:
+            quadro = criar_quadro((x, y, 0.0), (x + 10.0, y + 3.0, 0.0), 0.5)
+            quadros.append(quadro._replace(aberturas=IndiceAberturas([(4.0, 6.0)])))
+    return quadros
+
+
+def medir(nome, funcao, repeticoes=5):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.time()
+        plano = funcao()
+        tempos.append(time.time() - inicio)
+    print(u'{:<35} {:>6} pontos  {:.1f} ms'.format(nome, len(plano.xs), 1000 * min(tempos)))
+
+
+def main():
+    quadros = paredes(1000)
+    regra = RegraEspacamento(10, None, 1.0, 'Frontal')
+    cadeias = [quadros[i:i + 10] for i in range(0, len(quadros), 10)]
+    numpy = layout_tomadas.numpy
+    for caminho in ('numpy', 'python'):
+        if caminho == 'numpy' and numpy is None:
+            continue
+        layout_tomadas.numpy = numpy if caminho == 'numpy' else None
+        medir(u'paredes ({})'.format(caminho), lambda: planejar_pontos(quadros, regra))
+        medir(u'cadeias ({})'.format(caminho), lambda: planejar_cadeias(cadeias, regra))
+    layout_tomadas.numpy = numpy
+
+
+if __name__ == '__main__':
+    main()
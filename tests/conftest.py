@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Configuração dos testes: os módulos da pasta lib que não dependem do Revit."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""Lista sintética de nomes "Família : Tipo" para os testes e benchmarks."""
+import random
+
+FAMILIAS = [u'Tomada', u'Interruptor', u'Luminária', u'Plafon', u'Caixa',
+            u'Painel', u'Quadro', u'Sensor', u'Ar Condicionado', u'Chuveiro']
+MODELOS = [u'Embutir', u'Sobrepor', u'Dupla', u'Simples', u'Tripla',
+           u'Industrial', u'Piso', u'Teto', u'Elétrica', u'Média']
+
+
+def nomes_sinteticos(quantidade=100000, semente=1):
+    """Nomes distintos, em ordem alfabética (a ordem de exibição do seletor)."""
+    aleatorio = random.Random(semente)
+    return sorted(
+        u'{} {} {}V : Tipo {} - {}'.format(
+            aleatorio.choice(FAMILIAS), aleatorio.choice(MODELOS),
+            aleatorio.choice([127, 220, 380]), aleatorio.randint(1, 999), i)
+        for i in range(quantidade)
+    )
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from agregado_cargas import AgregadoCargas
+
+
+def agregado_exemplo():
+    """Painel 100 com os circuitos 10 (tomadas 1 e 2) e 20 (tomada 3)."""
+    agregado = AgregadoCargas()
+    for elemento, carga in ((1, 100.0), (2, 200.0), (3, 600.0)):
+        agregado.definir_elemento(elemento, carga)
+    agregado.definir_circuito(10, 100, [1, 2], carga_propria=999.0)
+    agregado.definir_circuito(20, 100, [3])
+    return agregado
+
+
+def totais_do_zero(agregado):
+    """Totais recalculados sem diferenças, a partir do estado do agregado."""
+    circuitos = {}
+    for circuito_id, elementos in agregado.elementos_circuito.items():
+        declaradas = [agregado.carga_elemento.get(e) for e in elementos]
+        declaradas = [c for c in declaradas if c is not None]
+        circuitos[circuito_id] = (sum(declaradas) if declaradas
+                                  else agregado.carga_propria.get(circuito_id, 0.0))
+    paineis = {}
+    for circuito_id, carga in circuitos.items():
+        painel_id = agregado.painel_do_circuito.get(circuito_id)
+        if painel_id is not None:
+            paineis[painel_id] = paineis.get(painel_id, 0.0) + carga
+    return circuitos, paineis
+
+
+def test_totais_iniciais():
+    agregado = agregado_exemplo()
+    assert agregado.circuito(10) == pytest.approx(300.0)
+    assert agregado.circuito(20) == pytest.approx(600.0)
+    assert agregado.painel(100) == pytest.approx(900.0)
+    assert agregado.painel(999) == 0.0
+
+
+def test_elemento_muda_de_circuito():
+    agregado = agregado_exemplo()
+    # A tomada 2 passa do circuito 10 para o 20
+    agregado.definir_circuito(20, 100, [3, 2])
+    assert agregado.circuito_do_elemento[2] == 20
+    assert 2 not in agregado.elementos_circuito[10]
+    assert agregado.circuito(10) == pytest.approx(100.0)
+    assert agregado.circuito(20) == pytest.approx(800.0)
+    assert agregado.painel(100) == pytest.approx(900.0)
+    # O circuito 10 relido sem a tomada 2 não altera nada
+    agregado.definir_circuito(10, 100, [1], carga_propria=999.0)
+    assert agregado.circuito(10) == pytest.approx(100.0)
+    assert agregado.painel(100) == pytest.approx(900.0)
+
+
+def test_carga_de_elemento_alterada():
+    agregado = agregado_exemplo()
+    agregado.definir_elemento(1, 150.0)
+    assert agregado.circuito(10) == pytest.approx(350.0)
+    assert agregado.painel(100) == pytest.approx(950.0)
+
+
+def test_circuito_muda_de_painel():
+    agregado = agregado_exemplo()
+    agregado.definir_circuito(20, 200, [3])
+    assert agregado.painel(100) == pytest.approx(300.0)
+    assert agregado.painel(200) == pytest.approx(600.0)
+    # Desconectado do painel
+    agregado.definir_circuito(20, None, [3])
+    assert agregado.painel(200) == pytest.approx(0.0)
+    assert agregado.circuito(20) == pytest.approx(600.0)
+
+
+def test_remover_circuito():
+    agregado = agregado_exemplo()
+    agregado.remover(10)
+    assert agregado.circuito(10) == 0.0
+    assert agregado.painel(100) == pytest.approx(600.0)
+    # Os elementos continuam conhecidos, mas sem circuito
+    assert agregado.conhece(1) and not agregado.conhece(10)
+    assert 1 not in agregado.circuito_do_elemento
+
+
+def test_remover_elemento():
+    agregado = agregado_exemplo()
+    agregado.remover(2)
+    assert not agregado.conhece(2)
+    assert agregado.circuito(10) == pytest.approx(100.0)
+    assert agregado.painel(100) == pytest.approx(700.0)
+
+
+def test_carga_propria_sem_declaracao():
+    agregado = AgregadoCargas()
+    agregado.definir_elemento(1, None)
+    agregado.definir_circuito(10, 100, [1], carga_propria=450.0)
+    assert agregado.circuito(10) == pytest.approx(450.0)
+    assert agregado.painel(100) == pytest.approx(450.0)
+    # Ao declarar, a soma declarada substitui a carga do Revit...
+    agregado.definir_elemento(1, 120.0)
+    assert agregado.circuito(10) == pytest.approx(120.0)
+    assert agregado.painel(100) == pytest.approx(120.0)
+    # ...e volta para ela quando o último elemento declarante sai
+    agregado.remover(1)
+    assert agregado.circuito(10) == pytest.approx(450.0)
+    assert agregado.painel(100) == pytest.approx(450.0)
+
+
+def test_diferencas_iguais_ao_recalculo():
+    aleatorio = random.Random(3)
+    agregado = AgregadoCargas()
+    elementos = list(range(1, 41))
+    circuitos = list(range(100, 108))
+    for _ in range(2000):
+        operacao = aleatorio.random()
+        if operacao < 0.4:
+            carga = None if aleatorio.random() < 0.2 else float(aleatorio.randint(50, 1500))
+            agregado.definir_elemento(aleatorio.choice(elementos), carga)
+        elif operacao < 0.85:
+            agregado.definir_circuito(
+                aleatorio.choice(circuitos), aleatorio.choice([None, 1, 2, 3]),
+                aleatorio.sample(elementos, aleatorio.randint(0, 6)),
+                float(aleatorio.randint(0, 500)),
+            )
+        else:
+            agregado.remover(aleatorio.choice(elementos + circuitos))
+
+        esperados, paineis = totais_do_zero(agregado)
+        for circuito_id, carga in esperados.items():
+            assert agregado.circuito(circuito_id) == pytest.approx(carga)
+        for painel_id in (1, 2, 3):
+            assert agregado.painel(painel_id) == pytest.approx(paineis.get(painel_id, 0.0), abs=1e-6)
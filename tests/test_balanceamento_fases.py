@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import random
+import time
+
+import pytest
+
+from balanceamento_fases import (
+    balancear,
+    desequilibrio,
+    fases_apos_movimentos,
+    melhora,
+    planejar_movimentos,
+    resultado_alcancavel,
+    totais_por_fase,
+)
+
+
+def painel_aleatorio(aleatorio, circuitos):
+    """Cargas, base, slots ocupados, slots livres e fase de cada slot (A, B, C alternadas)."""
+    total_slots = circuitos + aleatorio.randint(0, 6)
+    fase_do_slot = dict((slot, slot % 3) for slot in range(total_slots))
+    ocupados = aleatorio.sample(range(total_slots), circuitos)
+    livres = sorted(set(fase_do_slot) - set(ocupados))
+    cargas = [float(aleatorio.choice([aleatorio.randint(50, 300), aleatorio.randint(500, 2500)]))
+              for _ in range(circuitos)]
+    base = [float(aleatorio.choice([0, aleatorio.randint(0, 4000)])) for _ in range(3)]
+    return cargas, base, ocupados, livres, fase_do_slot
+
+
+def capacidades_do_painel(ocupados, livres, fase_do_slot):
+    capacidades = [0, 0, 0]
+    for slot in list(ocupados) + list(livres):
+        capacidades[fase_do_slot[slot]] += 1
+    return capacidades
+
+
+def test_desequilibrio_e_melhora():
+    assert desequilibrio([10.0, 5.0, 5.0]) == pytest.approx(0.5)
+    assert desequilibrio([0.0, 0.0, 0.0]) == 0.0
+    assert melhora([6.0, 6.0, 6.0], [10.0, 5.0, 3.0])
+    # Diferença menor (4,9 < 5), mas desequilíbrio maior (0,59 > 0,5): não melhora
+    assert not melhora([8.3, 8.3, 3.4], [10.0, 5.0, 5.0])
+    assert not melhora([10.0, 5.0, 5.0], [10.0, 5.0, 5.0])
+
+
+def test_distribuicao_perfeita():
+    resultado = balancear([4, 4, 4, 2, 2, 2])
+    assert resultado.totais == pytest.approx([6.0, 6.0, 6.0])
+    assert resultado.desequilibrio == pytest.approx(0.0)
+    # A base fixa de cada fase entra nos totais
+    resultado = balancear([5, 5], base=(10, 0, 0))
+    assert sorted(resultado.fases) == [1, 2]
+    assert resultado.totais == pytest.approx([10.0, 5.0, 5.0])
+
+
+def test_sem_posicoes_suficientes():
+    with pytest.raises(ValueError):
+        balancear([1, 2, 3, 4], capacidades=[1, 1, 1])
+
+
+def test_balancear_nunca_piora_e_respeita_capacidades():
+    aleatorio = random.Random(5)
+    for _ in range(3000):
+        cargas, base, ocupados, livres, fase_do_slot = painel_aleatorio(
+            aleatorio, aleatorio.randint(1, 12))
+        capacidades = capacidades_do_painel(ocupados, livres, fase_do_slot)
+        atuais = [fase_do_slot[slot] for slot in ocupados]
+        resultado = balancear(cargas, base, capacidades, atuais)
+
+        atual = desequilibrio(totais_por_fase(cargas, atuais, base))
+        assert resultado.desequilibrio <= atual + 1e-9
+        assert resultado.totais == pytest.approx(totais_por_fase(cargas, resultado.fases, base))
+        for fase in range(3):
+            assert resultado.fases.count(fase) <= capacidades[fase]
+
+
+def test_movimentos_usam_apenas_slots_livres():
+    aleatorio = random.Random(11)
+    for _ in range(3000):
+        cargas, base, ocupados, livres, fase_do_slot = painel_aleatorio(
+            aleatorio, aleatorio.randint(1, 12))
+        alvos = [aleatorio.randint(0, 2) for _ in ocupados]
+        movimentos, pendentes = planejar_movimentos(ocupados, alvos, fase_do_slot, livres)
+
+        # Reproduzir os movimentos: o destino precisa estar vazio naquele momento
+        slots = list(ocupados)
+        vazios = set(livres)
+        for i, origem, destino in movimentos:
+            assert slots[i] == origem
+            assert destino in vazios
+            vazios.remove(destino)
+            vazios.add(origem)
+            slots[i] = destino
+        assert len(set(slots)) == len(slots)
+
+        fases = fases_apos_movimentos(ocupados, movimentos, fase_do_slot)
+        assert fases == [fase_do_slot[slot] for slot in slots]
+        for i, alvo in enumerate(alvos):
+            if i not in pendentes:
+                assert fases[i] == alvo
+
+        alcancavel = resultado_alcancavel(cargas, ocupados, movimentos, fase_do_slot, base)
+        assert alcancavel.fases == fases
+        assert alcancavel.totais == pytest.approx(totais_por_fase(cargas, fases, base))
+
+
+def test_troca_em_ciclo_passa_por_outra_fase():
+    # Slot 0 (A) e slot 1 (B) trocam de fase; só há um slot livre, na fase C
+    fase_do_slot = {0: 0, 1: 1, 2: 2}
+    movimentos, pendentes = planejar_movimentos([0, 1], [1, 0], fase_do_slot, [2])
+    assert pendentes == []
+    assert fases_apos_movimentos([0, 1], movimentos, fase_do_slot) == [1, 0]
+    assert len(movimentos) == 3
+
+
+def test_sem_slots_livres_nada_se_move():
+    fase_do_slot = {0: 0, 1: 1, 2: 2}
+    movimentos, pendentes = planejar_movimentos([0, 1, 2], [1, 2, 0], fase_do_slot, [])
+    assert movimentos == []
+    assert pendentes == [0, 1, 2]
+    alcancavel = resultado_alcancavel([1.0, 2.0, 3.0], [0, 1, 2], movimentos, fase_do_slot)
+    assert alcancavel.fases == [0, 1, 2]
+
+
+def test_duzentos_circuitos_em_menos_de_um_segundo():
+    aleatorio = random.Random(1)
+    cargas, base, ocupados, livres, fase_do_slot = painel_aleatorio(aleatorio, 200)
+    capacidades = capacidades_do_painel(ocupados, livres, fase_do_slot)
+    atuais = [fase_do_slot[slot] for slot in ocupados]
+    inicio = time.time()
+    ideal = balancear(cargas, base, capacidades, atuais)
+    movimentos, _ = planejar_movimentos(ocupados, ideal.fases, fase_do_slot, livres)
+    resultado_alcancavel(cargas, ocupados, movimentos, fase_do_slot, base)
+    assert time.time() - inicio < 1.0
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from busca_familias import IndiceBusca, normalizar, tokenizar
+from nomes_sinteticos import nomes_sinteticos
+
+
+CONSULTAS = [
+    u't', u'to', u'tom', u'tomada', u'tomada m', u'tomada e', u'tipo 9', u'tipo 99',
+    u'lumi', u'LUMINÁRIA teto', u'eletrica', u'c s', u'x', u'220', u'9 t',
+    u'tomada embutir 220 tipo 99', u'ar cond', u'media piso 1',
+]
+
+
+@pytest.fixture(scope='module')
+def nomes():
+    return nomes_sinteticos()
+
+
+@pytest.fixture(scope='module')
+def indice(nomes):
+    return IndiceBusca(nomes)
+
+
+@pytest.fixture(scope='module')
+def tokens(nomes):
+    return [tokenizar(nome) for nome in nomes]
+
+
+def forca_bruta(tokens, texto):
+    consulta = tokenizar(texto)
+    return [
+        i for i, palavras in enumerate(tokens)
+        if all(any(t.startswith(q) for t in palavras) for q in consulta)
+    ]
+
+
+def test_normalizar_remove_acentos():
+    assert normalizar(u'Luminária Elétrica Ç') == u'luminaria eletrica c'
+    assert tokenizar(u'Tomada : Tipo-127V') == [u'tomada', u'tipo', u'127v']
+
+
+@pytest.mark.parametrize('texto', CONSULTAS)
+def test_resultados_iguais_a_forca_bruta(indice, tokens, texto):
+    esperado = forca_bruta(tokens, texto)
+    indice._ultima_consulta = None
+    assert indice.buscar_indices(texto, limite=50) == esperado[:50]
+    assert indice.buscar_indices(texto) == esperado
+
+
+def test_digitacao_incremental_refina_resultado(indice, tokens):
+    indice._ultima_consulta = None
+    texto = u'tomada embutir 220 tipo 99'
+    for fim in range(1, len(texto) + 1):
+        parcial = texto[:fim]
+        assert indice.buscar_indices(parcial) == forca_bruta(tokens, parcial)
+
+
+def test_recentes_primeiro(nomes):
+    indice = IndiceBusca(nomes, recentes=[nomes[-1]])
+    indice.registrar_uso(nomes[5])
+    assert indice.buscar(u'', limite=3) == [nomes[5], nomes[-1], nomes[0]]
+    resultado = indice.buscar(tokenizar(nomes[-1])[0], limite=10)
+    assert resultado[0] == nomes[-1]
+    assert len(resultado) == len(set(resultado))
+
+
+def test_tecla_abaixo_de_um_milissegundo(indice):
+    # Cada tecla pede apenas a página visível; mediana das consultas
+    tempos = []
+    for texto in CONSULTAS:
+        indice._ultima_consulta = None
+        inicio = time.time()
+        indice.buscar_indices(texto, limite=50)
+        tempos.append(time.time() - inicio)
+    tempos.sort()
+    assert tempos[len(tempos) // 2] < 0.001
+    assert tempos[-1] < 0.01
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import random
+import time
+from math import sqrt
+
+import pytest
+
+from circuitos import limite_por_corrente, ordem_hilbert, particionar
+
+
+def tomadas_aleatorias(aleatorio, quantidade, grandes=0.0):
+    """Cargas (VA) e posições (pés) de tomadas espalhadas por um pavimento."""
+    cargas = []
+    for _ in range(quantidade):
+        if aleatorio.random() < grandes:
+            cargas.append(float(aleatorio.randint(2000, 5000)))
+        else:
+            cargas.append(float(aleatorio.choice([100, 100, 100, 600, 1000])))
+    pontos = [(aleatorio.uniform(0, 200), aleatorio.uniform(0, 120)) for _ in range(quantidade)]
+    return cargas, pontos
+
+
+def verificar_circuitos(circuitos, cargas, limite, max_tomadas=None):
+    indices = sorted(i for circuito in circuitos for i in circuito)
+    assert indices == list(range(len(cargas)))
+    for circuito in circuitos:
+        assert circuito
+        if max_tomadas is not None:
+            assert len(circuito) <= max_tomadas
+        soma = sum(cargas[i] for i in circuito)
+        # Só uma tomada sozinha pode passar do limite
+        assert soma <= limite + 1e-6 or len(circuito) == 1
+
+
+def test_limite_por_corrente():
+    assert limite_por_corrente(10, 127) == pytest.approx(1270.0)
+    assert limite_por_corrente(10, 220, fases=2) == pytest.approx(2200.0)
+    assert limite_por_corrente(10, 380, fases=3) == pytest.approx(sqrt(3.0) * 3800)
+    with pytest.raises(ValueError):
+        limite_por_corrente(0, 127)
+    with pytest.raises(ValueError):
+        limite_por_corrente(10, -127)
+
+
+def test_ordem_hilbert_vizinhos():
+    # Quadrado 2 x 2: a curva percorre as células sem saltar na diagonal
+    pontos = [(0, 0), (1, 1), (0, 1), (1, 0)]
+    ordem = ordem_hilbert(pontos)
+    assert sorted(ordem) == [0, 1, 2, 3]
+    for a, b in zip(ordem, ordem[1:]):
+        dx = abs(pontos[a][0] - pontos[b][0])
+        dy = abs(pontos[a][1] - pontos[b][1])
+        assert dx + dy == 1
+    assert ordem_hilbert([]) == []
+
+
+@pytest.mark.parametrize('limite', [0, -100])
+def test_limite_invalido(limite):
+    with pytest.raises(ValueError):
+        particionar([100.0], [(0, 0)], limite)
+
+
+def test_sem_tomadas():
+    assert particionar([], [], 1270) == []
+
+
+def test_tomada_acima_do_limite_fica_sozinha():
+    cargas = [900.0, 5000.0, 600.0, 600.0, 600.0]
+    pontos = [(i, 0) for i in range(len(cargas))]
+    circuitos = particionar(cargas, pontos, 1000)
+    assert [1] in circuitos
+    verificar_circuitos(circuitos, cargas, 1000)
+    # Todas acima do limite: uma por circuito
+    assert sorted(particionar([2000.0, 3000.0], [(0, 0), (1, 0)], 1000)) == [[0], [1]]
+
+
+def test_circuitos_equilibrados():
+    # Dez tomadas de 100 VA em linha com limite de 700 VA: dois circuitos de 500
+    cargas = [100.0] * 10
+    pontos = [(i, 0) for i in range(10)]
+    circuitos = particionar(cargas, pontos, 700)
+    assert sorted(len(circuito) for circuito in circuitos) == [5, 5]
+
+
+def test_limite_respeitado():
+    aleatorio = random.Random(13)
+    for _ in range(300):
+        cargas, pontos = tomadas_aleatorias(aleatorio, aleatorio.randint(1, 60), grandes=0.1)
+        limite = float(aleatorio.choice([1270, 1500, 2540, 4000]))
+        max_tomadas = aleatorio.choice([None, 4, 8])
+        circuitos = particionar(cargas, pontos, limite, max_tomadas)
+        verificar_circuitos(circuitos, cargas, limite, max_tomadas)
+
+
+def test_oitocentas_tomadas_em_menos_de_um_segundo():
+    cargas, pontos = tomadas_aleatorias(random.Random(2), 800)
+    inicio = time.time()
+    circuitos = particionar(cargas, pontos, 1270.0, max_tomadas=10)
+    assert time.time() - inicio < 1.0
+    verificar_circuitos(circuitos, cargas, 1270.0, 10)
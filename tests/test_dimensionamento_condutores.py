@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from math import sqrt
+
+import pytest
+
+from dimensionamento_condutores import (
+    AMPACIDADE,
+    RESISTIVIDADE_COBRE,
+    TabelaCondutores,
+    corrente_projeto,
+    fator_agrupamento,
+    fator_temperatura,
+    queda_tensao,
+)
+
+
+@pytest.mark.parametrize('temperatura, fator', [
+    (30, 1.00),
+    (10, 1.22),
+    (60, 0.50),
+    # Entre valores tabelados: vale a temperatura tabelada acima
+    (32, 0.94),
+    (41, 0.79),
+    # Fora da tabela: limitado às extremidades
+    (5, 1.22),
+    (70, 0.50),
+])
+def test_fator_temperatura(temperatura, fator):
+    assert fator_temperatura(temperatura) == fator
+
+
+@pytest.mark.parametrize('circuitos, fator', [
+    (1, 1.00),
+    (3, 0.70),
+    (12, 0.45),
+    # Entre valores tabelados: vale a linha "a partir de" abaixo
+    (10, 0.50),
+    (15, 0.45),
+    # Fora da tabela
+    (0, 1.00),
+    (25, 0.38),
+])
+def test_fator_agrupamento(circuitos, fator):
+    assert fator_agrupamento(circuitos) == fator
+
+
+def test_fatores_aplicados_as_capacidades():
+    tabela = TabelaCondutores(temperatura=35, agrupamento=2)
+    assert tabela.capacidades[2] == pytest.approx([a * 0.94 * 0.80 for a in AMPACIDADE[2]])
+    assert tabela.capacidades[3] == pytest.approx([a * 0.94 * 0.80 for a in AMPACIDADE[3]])
+
+
+def test_secao_minima_prevalece_sobre_a_capacidade():
+    # 100 VA em 127 V: 1,5 mm² bastaria pela capacidade
+    assert TabelaCondutores().dimensionar(100, 127).secao == 2.5
+    assert TabelaCondutores(secao_minima=1.5).dimensionar(100, 127).secao == 1.5
+
+
+def test_secao_pela_capacidade():
+    tabela = TabelaCondutores()
+    resultado = tabela.dimensionar(3000, 127)
+    assert resultado.corrente == pytest.approx(3000 / 127.0)
+    assert (resultado.secao, resultado.capacidade) == (2.5, 24)
+    assert tabela.dimensionar(4000, 127).secao == 4
+    # Com dois circuitos agrupados a capacidade de 4 mm² (25,6 A) não basta
+    agrupada = TabelaCondutores(agrupamento=2).dimensionar(4000, 127)
+    assert agrupada.secao == 6
+    assert agrupada.capacidade == pytest.approx(41 * 0.8)
+    assert agrupada.capacidade >= agrupada.corrente
+
+
+def test_secao_pela_queda_de_tensao():
+    tabela = TabelaCondutores()
+    corrente = 1000 / 127.0
+    # Queda com 1 mm² dividida pela máxima: a menor seção que atende
+    secao_queda = queda_tensao(corrente, 50, 1.0, 127) / tabela.queda_maxima
+    assert 2.5 < secao_queda <= 4
+    resultado = tabela.dimensionar(1000, 127, comprimento=50)
+    assert resultado.secao == 4
+    assert resultado.queda <= tabela.queda_maxima
+    assert queda_tensao(corrente, 50, 2.5, 127) > tabela.queda_maxima
+    # Sem comprimento, só a capacidade e a seção mínima contam
+    assert tabela.dimensionar(1000, 127).secao == 2.5
+    assert tabela.dimensionar(1000, 127).queda == 0.0
+
+
+def test_circuito_trifasico():
+    corrente = corrente_projeto(30000, 380, polos=3)
+    assert corrente == pytest.approx(30000 / (sqrt(3.0) * 380))
+    assert queda_tensao(10, 100, 10, 380, polos=3) == pytest.approx(
+        100.0 * sqrt(3.0) * RESISTIVIDADE_COBRE * 100 * 10 / (10 * 380))
+    # Três condutores carregados: 10 mm² (50 A), e não 6 mm² (41 A da tabela de dois)
+    resultado = TabelaCondutores().dimensionar(30000, 380, polos=3)
+    assert (resultado.secao, resultado.capacidade) == (10, 50)
+
+
+def test_nenhuma_secao_atende():
+    resultado = TabelaCondutores().dimensionar(1e6, 127)
+    assert resultado.secao is None
+    assert resultado.capacidade is None and resultado.queda is None
+    assert resultado.corrente == pytest.approx(1e6 / 127)
+    # Também pela queda: comprimento muito grande
+    assert TabelaCondutores().dimensionar(1000, 127, comprimento=1e5).secao is None
+
+
+def test_tensao_invalida():
+    assert corrente_projeto(1000, 0) == 0.0
+    assert queda_tensao(10, 50, 2.5, 0) == 0.0
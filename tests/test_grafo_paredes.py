@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from grafo_paredes import GrafoParedes
+
+
+def test_extremidades_proximas_viram_um_no():
+    # "L" com uma folga de 0,5 pé no canto (abaixo da tolerância de união)
+    grafo = GrafoParedes([[(0, 0), (20, 0)], [(20, 0.5), (20, 20)]])
+    assert len(grafo) == 3
+    # 1 (afastamento) + 15 + 9,5 (de 0,5 a 10 no segundo trecho) + 1 (afastamento)
+    assert grafo.distancia((5, 1), (21, 10)) == pytest.approx(26.5)
+
+
+def test_encontro_em_t_divide_a_parede():
+    grafo = GrafoParedes([[(0, 0), (20, 0)], [(10, 0), (10, 15)]])
+    assert len(grafo) == 4
+    no_t = grafo.nos.index((10.0, 0.0))
+    assert len(grafo.vizinhos[no_t]) == 3
+    # Sem a divisão, a rota teria de passar por uma das extremidades da base
+    assert grafo.distancia((2, 0), (10, 12)) == pytest.approx(20.0)
+    assert grafo.distancia((18, 0), (10, 12)) == pytest.approx(20.0)
+
+
+def test_encontro_em_t_com_folga():
+    # A haste termina 0,5 pé antes da base: o encontro é ancorado na projeção
+    grafo = GrafoParedes([[(0, 0), (20, 0)], [(10, 0.5), (10, 15)]])
+    assert len(grafo) == 4
+    assert grafo.distancia((2, 0), (10, 12)) == pytest.approx(8.0 + 11.5)
+
+
+def test_ancoragem():
+    grafo = GrafoParedes([[(0, 0), (20, 0)], [(10, 0), (10, 15)]])
+    ancora = grafo.ancorar((4, 3))
+    assert ancora.afastamento == pytest.approx(3.0)
+    assert ancora.ponto == pytest.approx((4.0, 0.0))
+    # Ligada aos nós do trecho entre (0, 0) e o encontro em (10, 0)
+    assert sorted(custo for _, custo in ancora.ligacoes) == pytest.approx([4.0, 6.0])
+    # No mesmo trecho a distância é medida diretamente
+    assert grafo.distancia((2, 0), (6, 0)) == pytest.approx(4.0)
+
+
+def test_ponto_fora_da_rede():
+    grafo = GrafoParedes([[(0, 0), (20, 0)], [(10, 0), (10, 15)]])
+    assert grafo.ancorar((100, 100)) is None
+    assert grafo.distancia((100, 100), (5, 0)) is None
+    assert grafo.distancia((5, 0), (100, 100)) is None
+    assert grafo.a_partir_de((100, 100)) is None
+    assert grafo.a_partir_de((5, 0)).ate((100, 100)) is None
+
+
+def test_paredes_desconectadas():
+    grafo = GrafoParedes([[(0, 0), (20, 0)], [(50, 50), (60, 50)]])
+    assert grafo.distancia((5, 0), (55, 50)) is None
+    assert grafo.a_partir_de((5, 0)).ate((55, 50)) is None
+
+
+def test_a_estrela_igual_a_dijkstra():
+    # Malha de cômodos de 12 x 12 pés: cada parede é uma polilinha que passa
+    # pelos cruzamentos, mais uma divisória que encosta na malha em T
+    trechos = []
+    for k in range(6):
+        trechos.append([(12 * i, 12 * k) for i in range(6)])
+        trechos.append([(12 * k, 12 * i) for i in range(6)])
+    trechos.append([(6, 0), (6, 12)])
+    grafo = GrafoParedes(trechos)
+    aleatorio = random.Random(7)
+
+    def ponto():
+        # Perto de uma parede (afastamento até 2 pés)
+        if aleatorio.random() < 0.5:
+            return (aleatorio.uniform(0, 60), 12 * aleatorio.randint(0, 5) + aleatorio.uniform(-2, 2))
+        return (12 * aleatorio.randint(0, 5) + aleatorio.uniform(-2, 2), aleatorio.uniform(0, 60))
+
+    for _ in range(20):
+        origem = ponto()
+        mapa = grafo.a_partir_de(origem)
+        for _ in range(20):
+            destino = ponto()
+            esperado = mapa.ate(destino)
+            assert esperado is not None
+            assert grafo.distancia(origem, destino) == pytest.approx(esperado)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+from math import atan2, cos, pi, sin
+
+import pytest
+
+import layout_tomadas
+from layout_tomadas import (
+    IndiceAberturas,
+    PlanoPontos,
+    RegraEspacamento,
+    TabelaComprimentoArco,
+    angulo_no_ponto,
+    criar_quadro,
+    criar_quadro_curvo,
+    distancias_ao_longo,
+    inverter_quadro,
+    planejar_cadeias,
+    planejar_pontos,
+    posicao_e_direcao,
+)
+
+
+def arco(raio, inicio, fim, segmentos=16, centro=(0.0, 0.0), z=0.0):
+    """Vértices de um arco de circunferência (como os de Curve.Tessellate)."""
+    return [
+        (centro[0] + raio * cos(inicio + (fim - inicio) * k / float(segmentos)),
+         centro[1] + raio * sin(inicio + (fim - inicio) * k / float(segmentos)),
+         z)
+        for k in range(segmentos + 1)
+    ]
+
+
+def tabela_arco(raio, inicio, fim, segmentos=16, centro=(0.0, 0.0)):
+    """Tabela exata do arco (centro, raio, ângulo inicial e sentido)."""
+    sentido = 1.0 if fim > inicio else -1.0
+    return TabelaComprimentoArco(
+        arco(raio, inicio, fim, segmentos, centro),
+        arco=(centro[0], centro[1], raio, inicio, sentido), comprimento=raio * abs(fim - inicio),
+    )
+
+
+def tabela_tangentes(raio, inicio, fim, segmentos=16):
+    """Tabela do arco tratado como curva qualquer: vértices e tangentes amostradas."""
+    sentido = 1.0 if fim > inicio else -1.0
+    angulos = [inicio + (fim - inicio) * k / float(segmentos) for k in range(segmentos + 1)]
+    tangentes = [(-sin(a) * sentido, cos(a) * sentido) for a in angulos]
+    return TabelaComprimentoArco(arco(raio, inicio, fim, segmentos), tangentes,
+                                 comprimento=raio * abs(fim - inicio))
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def caminho(request, monkeypatch):
+    """Executa o teste pelo caminho vetorizado e pelo caminho em Python puro."""
+    if request.param == 'python':
+        monkeypatch.setattr(layout_tomadas, 'numpy', None)
+    return request.param
+
+
+def como_listas(plano):
+    return dict((campo, list(getattr(plano, campo))) for campo in PlanoPontos._fields)
+
+
+def test_distancias_centralizadas_no_intervalo():
+    assert distancias_ao_longo(10.0, 1) == [0.0]
+    assert distancias_ao_longo(10.0, 3) == [0.0, 5.0, 10.0]
+    assert distancias_ao_longo(10.0, 3, intervalo=4.0) == [3.0, 5.0, 7.0]
+    # Intervalo maior que a parede: a parede inteira
+    assert distancias_ao_longo(10.0, 2, intervalo=20.0) == [0.0, 10.0]
+
+
+def test_posicao_e_angulo_em_parede_reta():
+    quadro = criar_quadro((1.0, 2.0, 3.0), (1.0, 6.0, 3.0), largura=0.5)
+    ponto, direcao = posicao_e_direcao(quadro, 2.5)
+    assert ponto == pytest.approx((1.0, 4.5, 3.0))
+    assert direcao == pytest.approx((0.0, 1.0))
+    assert quadro.normal == pytest.approx((-1.0, 0.0))
+    assert angulo_no_ponto(quadro, direcao) == pytest.approx(pi / 2)
+
+
+def test_parede_sem_comprimento():
+    with pytest.raises(ValueError):
+        criar_quadro((0.0, 0.0, 0.0), (0.0, 0.0, 0.0), 0.5)
+
+
+def test_parede_reta_com_faces(caminho):
+    quadro = criar_quadro((0.0, 0.0, 0.0), (10.0, 0.0, 0.0), largura=1.0)
+    frontal = planejar_pontos([quadro], RegraEspacamento(3, None, 1.2, 'Frontal'))
+    traseira = planejar_pontos([quadro], RegraEspacamento(3, None, 1.2, 'Traseira'))
+    assert list(frontal.xs) == pytest.approx([0.0, 5.0, 10.0])
+    assert list(frontal.ys) == pytest.approx([0.5] * 3)
+    assert list(traseira.ys) == pytest.approx([-0.5] * 3)
+    assert list(frontal.zs) == pytest.approx([1.2] * 3)
+    assert list(frontal.angulos) == pytest.approx([0.0] * 3)
+    assert list(frontal.paredes) == [0, 0, 0]
+
+
+def test_parede_curva_segue_a_tangente(caminho):
+    raio = 10.0
+    tabela = TabelaComprimentoArco(arco(raio, 0.0, pi / 2, segmentos=64))
+    quadro = criar_quadro_curvo(tabela, largura=1.0)
+    plano = planejar_pontos([quadro], RegraEspacamento(5, None, 0.0, 'Frontal'))
+    for x, y, dx, dy, angulo in zip(plano.xs, plano.ys, plano.dxs, plano.dys, plano.angulos):
+        # A face frontal de um arco anti-horário fica do lado do centro
+        assert (x * x + y * y) ** 0.5 == pytest.approx(raio - 0.5, abs=0.01)
+        # Tangente perpendicular ao raio (a menos da corda) e ângulo coerente com ela
+        assert (x * dx + y * dy) / (raio - 0.5) == pytest.approx(0.0, abs=pi / 64)
+        assert angulo == pytest.approx(atan2(dy, dx))
+
+
+def test_arco_avaliado_exatamente(caminho):
+    # Poucos segmentos: na corda o erro seria de décimos de pé
+    raio = 10.0
+    quadro = criar_quadro_curvo(tabela_arco(raio, 0.0, pi / 2, segmentos=4), largura=1.0)
+    assert quadro.comprimento == pytest.approx(raio * pi / 2)
+    plano = planejar_pontos([quadro], RegraEspacamento(7, None, 0.0, 'Frontal'))
+    for x, y, dx, dy, s in zip(plano.xs, plano.ys, plano.dxs, plano.dys, plano.distancias):
+        assert (x * x + y * y) ** 0.5 == pytest.approx(raio - 0.5, abs=1e-9)
+        assert x * dx + y * dy == pytest.approx(0.0, abs=1e-9)
+        # Distância uniforme ao longo do arco: ângulo proporcional a s
+        assert atan2(y, x) == pytest.approx(s / raio)
+
+
+def test_tabela_invertida_na_curva_verdadeira():
+    tabela = tabela_arco(5.0, 0.0, pi, segmentos=6, centro=(1.0, 2.0))
+    invertida = tabela.invertida()
+    assert invertida.comprimento == pytest.approx(tabela.comprimento)
+    for s in (0.0, 1.3, 4.0, 7.7, tabela.comprimento):
+        ponto, (tx, ty) = invertida.avaliar(s)
+        esperado, (ex, ey) = tabela.avaliar(tabela.comprimento - s)
+        assert ponto == pytest.approx(esperado)
+        assert (tx, ty) == pytest.approx((-ex, -ey))
+    quadro = inverter_quadro(criar_quadro_curvo(tabela, 0.5))
+    assert quadro.origem == pytest.approx((-4.0, 2.0, 0.0))
+    assert quadro.direcao == pytest.approx((0.0, 1.0))
+    with pytest.raises(ValueError):
+        TabelaComprimentoArco([(0, 0, 0), (1, 0, 0)], tangentes=[(1, 0)])
+
+
+def test_tangentes_amostradas_interpolam_a_curva(caminho):
+    # Oito segmentos em 90 graus: na corda o erro radial chegaria a 0,05 pé
+    raio = 10.0
+    tabela = tabela_tangentes(raio, 0.0, pi / 2, segmentos=8)
+    for k in range(101):
+        (x, y, _), (tx, ty) = tabela.avaliar(tabela.comprimento * k / 100.0)
+        assert (x * x + y * y) ** 0.5 == pytest.approx(raio, abs=1e-3)
+        assert (x * tx + y * ty) / raio == pytest.approx(0.0, abs=1e-3)
+    invertida = tabela.invertida()
+    for s in (0.0, 3.3, 9.1, tabela.comprimento):
+        ponto, (tx, ty) = invertida.avaliar(s)
+        esperado, (ex, ey) = tabela.avaliar(tabela.comprimento - s)
+        assert ponto == pytest.approx(esperado)
+        assert (tx, ty) == pytest.approx((-ex, -ey))
+    plano = planejar_pontos([criar_quadro_curvo(tabela, 1.0)], RegraEspacamento(5, None, 0.0, 'Frontal'))
+    for x, y in zip(plano.xs, plano.ys):
+        assert (x * x + y * y) ** 0.5 == pytest.approx(raio - 0.5, abs=1e-3)
+
+
+def test_tabela_de_comprimento_de_arco():
+    tabela = TabelaComprimentoArco([(0, 0, 0), (3, 0, 0), (3, 4, 0)])
+    assert tabela.comprimento == pytest.approx(7.0)
+    assert tabela.avaliar(1.5) == (pytest.approx((1.5, 0.0, 0.0)), pytest.approx((1.0, 0.0)))
+    assert tabela.avaliar(5.0) == (pytest.approx((3.0, 2.0, 0.0)), pytest.approx((0.0, 1.0)))
+    # Fora da curva: limitado às extremidades
+    assert tabela.avaliar(-1.0)[0] == pytest.approx((0.0, 0.0, 0.0))
+    assert tabela.avaliar(99.0)[0] == pytest.approx((3.0, 4.0, 0.0))
+    assert tabela.projetar((3.5, 2.5)) == pytest.approx(5.5)
+    with pytest.raises(ValueError):
+        TabelaComprimentoArco([(0, 0, 0)])
+
+
+def test_aberturas_deslocam_e_descartam():
+    indice = IndiceAberturas([(4.0, 6.0), (5.5, 7.0)], margem=0.5)
+    # Intervalos ampliados pela margem e unidos
+    assert (indice.inicios, indice.fins) == ([3.5], [7.5])
+    assert indice.ajustar(5.0, 10.0) == 3.5
+    assert indice.ajustar(7.0, 10.0) == 7.5
+    assert indice.ajustar(1.0, 10.0) == 1.0
+    # Abertura ocupando a parede inteira: sem borda livre
+    assert IndiceAberturas([(-1.0, 11.0)]).ajustar(5.0, 10.0) is None
+    assert indice.ajustar_distancias([4.0, 4.5, 9.0], 10.0) == [3.5, 9.0]
+
+
+def test_parede_com_abertura(caminho):
+    quadro = criar_quadro((0.0, 0.0, 0.0), (10.0, 0.0, 0.0), largura=0.0)
+    quadro = quadro._replace(aberturas=IndiceAberturas([(4.0, 6.0)], margem=0.5))
+    plano = planejar_pontos([quadro], RegraEspacamento(3, None, 0.0, None))
+    assert list(plano.distancias) == pytest.approx([0.0, 3.5, 10.0])
+
+
+def test_numpy_e_python_iguais(monkeypatch):
+    pytest.importorskip('numpy')
+    quadros = [
+        criar_quadro((0.0, 0.0, 0.0), (10.0, 0.0, 0.0), 0.5),
+        criar_quadro((10.0, 0.0, 1.0), (10.0, 8.0, 1.0), 0.25)._replace(
+            aberturas=IndiceAberturas([(2.0, 3.0)])),
+        criar_quadro_curvo(TabelaComprimentoArco(arco(5.0, 0.0, pi, centro=(5.0, 8.0))), 0.3),
+    ]
+    regras = [
+        RegraEspacamento(4, None, 1.1, 'Frontal'),
+        RegraEspacamento(5, 6.0, 0.3, 'Traseira'),
+        RegraEspacamento(7, None, 2.2, None),
+    ]
+    vetorizado = como_listas(planejar_pontos(quadros, regras))
+    cadeia_vetorizada = como_listas(planejar_cadeias([quadros], regras[0]))
+    monkeypatch.setattr(layout_tomadas, 'numpy', None)
+    puro = como_listas(planejar_pontos(quadros, regras))
+    cadeia_pura = como_listas(planejar_cadeias([quadros], regras[0]))
+    for esperado, obtido in ((puro, vetorizado), (cadeia_pura, cadeia_vetorizada)):
+        for campo in PlanoPontos._fields:
+            assert obtido[campo] == pytest.approx(esperado[campo]), campo
+
+
+def test_cadeia_espaca_pelo_comprimento_total(caminho):
+    # Um "L": 10 pés em X e 10 pés em Y, percorrido como uma cadeia
+    primeira = criar_quadro((0.0, 0.0, 0.0), (10.0, 0.0, 0.0), 0.0)
+    segunda = criar_quadro((10.0, 10.0, 0.0), (10.0, 0.0, 0.0), 0.0)
+    plano = planejar_cadeias([[primeira, inverter_quadro(segunda)]],
+                             RegraEspacamento(5, None, 0.0, None), margem=0.5)
+    assert list(plano.paredes) == [0, 0, 1, 1, 1]
+    assert list(plano.distancias) == pytest.approx([0.5, 5.0, 0.5, 5.0, 9.5])
+    assert list(plano.xs) == pytest.approx([0.5, 5.0, 10.0, 10.0, 10.0])
+    assert list(plano.ys) == pytest.approx([0.0, 0.0, 0.5, 5.0, 9.5])
+
+
+def test_inverter_quadro_mantem_a_geometria():
+    quadro = criar_quadro((0.0, 0.0, 0.0), (10.0, 0.0, 0.0), 1.0)._replace(
+        aberturas=IndiceAberturas([(2.0, 3.0)], margem=0.0), nivel=7)
+    invertido = inverter_quadro(quadro)
+    assert invertido.origem == pytest.approx((10.0, 0.0, 0.0))
+    assert invertido.direcao == pytest.approx((-1.0, 0.0))
+    assert invertido.normal == pytest.approx((0.0, -1.0))
+    assert (invertido.aberturas.inicios, invertido.aberturas.fins) == ([7.0], [8.0])
+    assert invertido.nivel == 7
+    assert inverter_quadro(invertido).origem == pytest.approx(quadro.origem)